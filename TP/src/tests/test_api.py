@@ -1,7 +1,14 @@
 """Tests pour l'API Flask de triangulation."""
 
+import json
+import struct
+
 import pytest
-from src.triangulator.app import app
+from src.triangulator.app import BATCH_MAX_ITEMS, app
+from src.triangulator.protocol import invalid_batch
+from src.triangulator.triangulator import Triangulator
+
+STREAM_METHOD = "src.triangulator.triangulator.Triangulator.triangulate_stream_from_id"
 
 
 @pytest.fixture
@@ -12,18 +19,19 @@ def client():
 
 def test_valid_request_returns_200(client, mocker):
     """Cas 200 OK."""
-    # Mock de la méthode triangulate_from_id
+    # Mock de la méthode triangulate_stream_from_id
     # C'est a dire qu'on remplace ce que renvoi
-    # la méthode triangulate_from_id par les valeur la fausse reponse binaire
+    # la méthode triangulate_stream_from_id par les valeur la fausse reponse binaire
     fake_binary_response = b'\x00\x00\x00\x01...'
-    mocker.patch("src.triangulator.triangulator.Triangulator.triangulate_from_id",
-                 return_value=fake_binary_response)
+    mocker.patch(STREAM_METHOD,
+                 return_value=(len(fake_binary_response), iter([fake_binary_response])))
     valid_uuid = "123e4567-e89b-12d3-a456-426614174000"
 
     response = client.get(f"/triangulation/{valid_uuid}")
     assert response.status_code == 200
     assert response.headers["Content-Type"] == "application/octet-stream"
     assert response.data == fake_binary_response
+    assert response.headers["Content-Length"] == str(len(fake_binary_response))
 
 def test_invalid_id_returns_400(client):
     """Cas 400 Bad Request."""
@@ -32,24 +40,101 @@ def test_invalid_id_returns_400(client):
 
 def test_pointset_not_found_returns_404(client, mocker):
     """Cas 404 Not Found."""
-    mocker.patch("src.triangulator.triangulator.Triangulator.triangulate_from_id",
-                 side_effect=FileNotFoundError)
+    mocker.patch(STREAM_METHOD, side_effect=FileNotFoundError)
     uuid_not_found = "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa"
     response = client.get(f"/triangulation/{uuid_not_found}")
     assert response.status_code == 404
 
 def test_internal_error_returns_500(client, mocker):
     """Cas 500 Internal Server Error."""
-    mocker.patch("src.triangulator.triangulator.Triangulator.triangulate_from_id",
-                 side_effect=ValueError("Failed triangulation"))
+    mocker.patch(STREAM_METHOD, side_effect=ValueError("Failed triangulation"))
     uuid_error = "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
     response = client.get(f"/triangulation/{uuid_error}")
     assert response.status_code == 500
 
 def test_service_unavailable_returns_503(client, mocker):
     """Cas 503 Service Unavailable."""
-    mocker.patch("src.triangulator.triangulator.Triangulator.triangulate_from_id",
-                 side_effect=Exception("PSM down"))
+    mocker.patch(STREAM_METHOD, side_effect=Exception("PSM down"))
     uuid_fail = "cccccccc-cccc-cccc-cccc-cccccccccccc"
     response = client.get(f"/triangulation/{uuid_fail}")
     assert response.status_code == 503
+
+def test_valid_request_streams_real_triangulation(client, mocker):
+    """Cas 200 OK de bout en bout : la réponse en flux est complète."""
+    t = Triangulator()
+    points = [(0, 0), (1, 0), (0, 1), (1, 1)]
+    mocker.patch("src.triangulator.triangulator.Triangulator.fetch_pointset",
+                 return_value=t.encode_pointset(points))
+    uuid_ok = "dddddddd-dddd-dddd-dddd-dddddddddddd"
+
+    response = client.get(f"/triangulation/{uuid_ok}")
+
+    assert response.status_code == 200
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert t.decode_triangles(response.data) == t.triangulate(points)
+
+def read_batch_frames(data):
+    """Découpe la réponse d'un lot en {index: (code HTTP, charge utile)}."""
+    frames = {}
+    position = 0
+    while position < len(data):
+        index, status, length = struct.unpack_from('<III', data, position)
+        position += 12
+        frames[index] = (status, data[position:position + length])
+        position += length
+    return frames
+
+def test_batch_returns_one_frame_per_item(client, mocker):
+    """Cas lot : chaque élément a sa trame avec son propre code."""
+    def fake_triangulate(self, pointset_id):
+        if pointset_id.startswith("aaaaaaaa"):
+            raise FileNotFoundError
+        return b"triangles:" + pointset_id.encode()
+
+    mocker.patch("src.triangulator.triangulator.Triangulator.triangulate_from_id",
+                 fake_triangulate)
+    ids = [
+        "123e4567-e89b-12d3-a456-426614174000",
+        "invalid-uuid",
+        "aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+    ]
+
+    response = client.post("/triangulation/batch", json=ids)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/octet-stream"
+    frames = read_batch_frames(response.data)
+    assert frames[0] == (200, b"triangles:" + ids[0].encode())
+    assert frames[1][0] == 400
+    assert json.loads(frames[1][1])["code"] == "BAD_REQUEST"
+    assert frames[2][0] == 404
+    assert json.loads(frames[2][1])["code"] == "NOT_FOUND"
+
+def test_batch_invalid_body_returns_400(client):
+    """Cas lot : le corps doit être une liste JSON d'identifiants."""
+    response = client.post("/triangulation/batch", json={"ids": []})
+    assert response.status_code == 400
+    assert response.get_json() == invalid_batch(BATCH_MAX_ITEMS)
+
+def test_engine_query_parameter(client, mocker):
+    """Le paramètre ?engine= choisit le moteur de triangulation."""
+    t = Triangulator()
+    points = [(0, 0), (1, 0), (0, 1), (2, 2), (3, 0)]
+    mocker.patch("src.triangulator.triangulator.Triangulator.fetch_pointset",
+                 return_value=t.encode_pointset(points))
+    spy = mocker.spy(Triangulator, "triangulate")
+    uuid_ok = "eeeeeeee-eeee-eeee-eeee-eeeeeeeeeeee"
+
+    response = client.get(f"/triangulation/{uuid_ok}?engine=divide_conquer")
+
+    assert response.status_code == 200
+    assert spy.call_args.args[0].engine == "divide_conquer"
+    assert sorted(t.decode_triangles(response.data)) == sorted(
+        t.triangulate(points))
+
+def test_unknown_engine_returns_400(client):
+    """Un moteur inconnu est refusé avant tout appel au PSM."""
+    uuid_ok = "eeeeeeee-eeee-eeee-eeee-eeeeeeeeeeee"
+    response = client.get(f"/triangulation/{uuid_ok}?engine=quantique")
+    assert response.status_code == 400
+    assert response.get_json()["code"] == "BAD_REQUEST"
@@ -0,0 +1,248 @@
+"""Tests du point d'entrée ASGI et du client asyncio du PSM."""
+
+import asyncio
+import json
+import struct
+
+import pytest
+from src.triangulator import asgi
+from src.triangulator.cache import ResultCache
+from src.triangulator.psm_client import AsyncPSMClient
+from src.triangulator.triangulator import Triangulator
+
+POINTS = [(0, 0), (1, 0), (0, 1), (1, 1)]
+
+
+def call(path, method="GET", query_string=b"", headers=()):
+    """Appelle l'application ASGI → (code HTTP, en-têtes, corps)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path,
+             "query_string": query_string, "headers": list(headers)}
+    asyncio.run(asgi.app(scope, receive, send))
+
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+@pytest.fixture
+def fake_psm(mocker, monkeypatch):
+    """Remplace le client asyncio du PSM par un mock (cache vide)."""
+    monkeypatch.setattr(asgi, "result_cache", ResultCache(max_bytes=1_000_000))
+    return mocker.patch.object(asgi.psm, "get_pointset")
+
+def test_asgi_200(fake_psm):
+    """Cas 200 OK : même binaire que le pipeline synchrone."""
+    t = Triangulator()
+    fake_psm.return_value = t.encode_pointset(POINTS)
+
+    status, headers, body = call("/triangulation/123e4567-e89b-12d3-a456-426614174000")
+
+    assert status == 200
+    assert headers[b"content-type"] == b"application/octet-stream"
+    assert int(headers[b"content-length"]) == len(body)
+    assert t.decode_triangles(body) == t.triangulate(POINTS)
+
+def test_asgi_compression_gzip(fake_psm, monkeypatch):
+    """Accept-Encoding: gzip → corps compressé, gardé pour l'appel suivant."""
+    from src.triangulator import content_encoding
+
+    monkeypatch.setattr(asgi, "encoded_cache", ResultCache(max_bytes=1_000_000))
+    t = Triangulator()
+    fake_psm.return_value = t.encode_pointset(POINTS)
+    path = "/triangulation/123e4567-e89b-12d3-a456-426614174000"
+
+    status, headers, body = call(path, headers=[(b"accept-encoding", b"gzip")])
+    again = call(path, headers=[(b"accept-encoding", b"gzip")])
+
+    assert status == 200
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"Accept-Encoding" in headers[b"vary"]
+    assert t.decode_triangles(content_encoding.decompress(body, "gzip")) \
+        == t.triangulate(POINTS)
+    assert again[2] == body
+    assert asgi.encoded_cache.stats()["hits"] == 1
+
+def test_asgi_400(fake_psm):
+    """Cas 400 Bad Request."""
+    status, _, body = call("/triangulation/invalid-uuid")
+    assert status == 400
+    assert json.loads(body)["code"] == "BAD_REQUEST"
+
+@pytest.mark.parametrize("error, expected", [
+    (FileNotFoundError("absent"), 404),
+    (ValueError("colinéaires"), 500),
+    (ConnectionError("PSM down"), 503),
+])
+def test_asgi_erreurs(fake_psm, error, expected):
+    """Les erreurs suivent la même correspondance que l'application Flask."""
+    fake_psm.side_effect = error
+    status, _, _ = call("/triangulation/cccccccc-cccc-cccc-cccc-cccccccccccc")
+    assert status == expected
+
+def test_asgi_route_inconnue():
+    """Une autre route répond 404."""
+    status, _, _ = call("/autre")
+    assert status == 404
+
+def serve(handler):
+    """Démarre un faux PSM asyncio et renvoie (serveur, URL)."""
+    async def start():
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        return server, f"http://127.0.0.1:{port}"
+    return start()
+
+def test_async_client_keep_alive():
+    """Le client asyncio lit le PointSet et réutilise sa connexion."""
+    body = struct.pack('<I2f', 1, 1.0, 2.0)
+    connections = []
+
+    async def handler(reader, writer):
+        connections.append(writer)
+        while await reader.readline():
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n"
+                         % len(body) + body)
+            await writer.drain()
+
+    async def scenario():
+        server, url = await serve(handler)
+        client = AsyncPSMClient(base_url=url)
+        first = await client.get_pointset("a")
+        second = await client.get_pointset("b")
+        await client.close()
+        server.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == body and second == body
+    assert len(connections) == 1
+
+@pytest.mark.parametrize("status, error", [
+    (404, FileNotFoundError),
+    (503, ConnectionError),
+    (500, ValueError),
+])
+def test_async_client_erreurs(status, error):
+    """Le client asyncio garde la correspondance des erreurs HTTP."""
+    async def handler(reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        writer.write(b"HTTP/1.1 %d Error\r\nContent-Length: 0\r\n"
+                     b"Connection: close\r\n\r\n" % status)
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server, url = await serve(handler)
+        client = AsyncPSMClient(base_url=url, retries=1, backoff=0)
+        try:
+            await client.get_pointset("a")
+        finally:
+            server.close()
+
+    with pytest.raises(error):
+        asyncio.run(scenario())
+
+def test_async_client_corps_tronque():
+    """Un Content-Length trop court par rapport à N est rejeté (503)."""
+    async def handler(reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\n"
+                     + struct.pack('<I', 10))
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server, url = await serve(handler)
+        client = AsyncPSMClient(base_url=url, retries=0)
+        try:
+            await client.get_pointset("a")
+        finally:
+            server.close()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
+
+def test_asgi_moteur(fake_psm):
+    """Le paramètre ?engine= est aussi accepté par le point d'entrée ASGI."""
+    t = Triangulator()
+    fake_psm.return_value = t.encode_pointset(POINTS)
+    path = "/triangulation/123e4567-e89b-12d3-a456-426614174000"
+
+    status, _, body = call(path, query_string=b"engine=divide_conquer")
+    assert status == 200
+    assert len(t.decode_triangles(body)) == 2
+
+    status, _, body = call(path, query_string=b"engine=quantique")
+    assert status == 400
+
+def test_asgi_ordre(fake_psm):
+    """Le paramètre ?order= est aussi accepté par le point d'entrée ASGI."""
+    t = Triangulator()
+    fake_psm.return_value = t.encode_pointset(POINTS)
+    path = "/triangulation/123e4567-e89b-12d3-a456-426614174000"
+
+    status, _, body = call(path, query_string=b"order=spatial")
+    assert status == 200
+    assert all(a < b and a < c for a, b, c in t.decode_triangles(body))
+    assert asgi.result_cache.get(
+        "123e4567-e89b-12d3-a456-426614174000#spatial") == body
+
+    status, _, _ = call(path, query_string=b"order=aleatoire")
+    assert status == 400
+
+def test_asgi_metrics_et_server_timing(fake_psm):
+    """ASGI : en-tête Server-Timing et route /metrics."""
+    fake_psm.return_value = Triangulator().encode_pointset(POINTS)
+
+    status, headers, _ = call("/triangulation/123e4567-e89b-12d3-a456-426614174000")
+    assert status == 200
+    assert b"fetch;dur=" in headers[b"server-timing"]
+
+    status, headers, body = call("/metrics")
+    assert status == 200
+    assert b'triangulator_stage_duration_seconds_count{stage="fetch"}' in body
+
+def test_asgi_regroupe_les_requetes_simultanees(fake_psm):
+    """Requêtes simultanées sur le même PointSet : un seul appel au PSM."""
+    binary = Triangulator().encode_pointset(POINTS)
+
+    async def slow_fetch(pointset_id):
+        await asyncio.sleep(0.05)
+        return binary
+    fake_psm.side_effect = slow_fetch
+    pointset_id = "123e4567-e89b-12d3-a456-426614174000"
+
+    async def burst():
+        return await asyncio.gather(*(asgi.triangulate(pointset_id)
+                                      for _ in range(5)))
+    results = asyncio.run(burst())
+
+    assert {status for status, _, _ in results} == {200}
+    assert len({body for _, _, body in results}) == 1
+    assert fake_psm.call_count == 1
+    assert asgi._inflight == {}
+
+def test_asgi_regroupe_aussi_les_erreurs(fake_psm):
+    """L'erreur du chargement partagé est rendue à chaque requête."""
+    async def failing_fetch(pointset_id):
+        await asyncio.sleep(0.05)
+        raise ConnectionError("PSM down")
+    fake_psm.side_effect = failing_fetch
+
+    async def burst():
+        return await asyncio.gather(*(asgi.triangulate(
+            "123e4567-e89b-12d3-a456-426614174000") for _ in range(3)))
+
+    assert [status for status, _, _ in asyncio.run(burst())] == [503] * 3
+    assert fake_psm.call_count == 1
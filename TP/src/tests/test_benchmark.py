@@ -0,0 +1,72 @@
+"""Tests du banc de mesure (distributions, statistiques, comparaison)."""
+
+import json
+import random
+
+import pytest
+from src.triangulator import benchmark
+
+
+@pytest.mark.parametrize("name", sorted(benchmark.DISTRIBUTIONS))
+def test_distributions(name):
+    """Chaque distribution produit n points reproductibles."""
+    first = benchmark.DISTRIBUTIONS[name](500, random.Random(1))
+    second = benchmark.DISTRIBUTIONS[name](500, random.Random(1))
+    assert len(first) == 500
+    assert first == second
+
+def test_mann_whitney_exact():
+    """Loi exacte : séparation complète de 5 contre 5 → p = 1 / C(10, 5)."""
+    slower = [2.0, 2.1, 2.2, 2.3, 2.4]
+    faster = [1.0, 1.1, 1.2, 1.3, 1.4]
+    assert benchmark.mann_whitney_greater(slower, faster) == pytest.approx(1 / 252)
+    assert benchmark.mann_whitney_greater(faster, slower) == pytest.approx(1.0)
+
+def test_mann_whitney_approximation_normale():
+    """Grands échantillons ou ex aequo : approximation normale."""
+    same = [1.0] * 30
+    assert benchmark.mann_whitney_greater(same, same) == 1.0
+    slower = [1.0 + k / 100 for k in range(30)]
+    faster = [0.5 + k / 100 for k in range(30)]
+    assert benchmark.mann_whitney_greater(slower, faster) < 0.001
+
+def test_compare_signale_les_regressions():
+    """Régression = plus lent au-delà du seuil ET test significatif."""
+    baseline = {
+        "lent": [1.0, 1.01, 1.02, 1.03, 1.04],
+        "bruit": [1.0, 1.5, 0.8, 1.2, 0.9],
+        "stable": [1.0, 1.01, 1.02, 1.03, 1.04],
+    }
+    current = {
+        "lent": [2.0, 2.01, 2.02, 2.03, 2.04],
+        "bruit": [1.1, 0.9, 1.6, 1.0, 1.3],
+        "stable": [1.0, 1.01, 1.02, 1.03, 1.05],
+        "nouveau": [1.0],
+    }
+
+    rows = {row["key"]: row for row in benchmark.compare(baseline, current)}
+
+    assert set(rows) == {"lent", "bruit", "stable"}
+    assert rows["lent"]["regression"]
+    assert not rows["bruit"]["regression"]
+    assert not rows["stable"]["regression"]
+
+def test_run_et_reference(tmp_path):
+    """Une passe réduite produit toutes les clés ; la référence est créée."""
+    baseline = tmp_path / "baseline.json"
+
+    code = benchmark.main(["--sizes", "100", "--distributions", "uniform",
+                           "--repeat", "2", "--baseline", str(baseline)])
+
+    assert code == 0
+    results = json.loads(baseline.read_text())["results"]
+    assert set(results) == {
+        "decode/uniform/100",
+        "encode/uniform/100",
+        "triangulate/incremental/uniform/100",
+        "pipeline/incremental/uniform/100",
+        "reorder/uniform/100",
+        "traverse/none/uniform/100",
+        "traverse/spatial/uniform/100",
+    }
+    assert all(len(samples) == 2 for samples in results.values())
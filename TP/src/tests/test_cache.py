@@ -0,0 +1,82 @@
+"""Tests du cache de résultats de triangulation."""
+
+import struct
+
+from src.triangulator.cache import ResultCache, content_key
+from src.triangulator.triangulator import Triangulator
+
+POINTSET = struct.pack('<I6f', 3, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0)
+
+
+def test_cache_hit_et_miss():
+    """Un résultat enregistré est retrouvé par son PointSetID."""
+    cache = ResultCache(max_bytes=100)
+    assert cache.get("a") is None
+    cache.put("a", "h1", b"resultat")
+    assert cache.get("a") == b"resultat"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_eviction_lru_par_taille():
+    """Au-delà de max_bytes, l'entrée la moins récemment utilisée part."""
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", "h1", b"aaaa")
+    cache.put("b", "h2", b"bbbb")
+    # On touche "a" : c'est "b" qui devient la plus ancienne
+    cache.get("a")
+    cache.put("c", "h3", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 8
+
+def test_cache_ignore_les_resultats_trop_gros():
+    """Un résultat plus gros que le cache n'est pas conservé."""
+    cache = ResultCache(max_bytes=4)
+    cache.put("a", "h1", b"trop gros")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+def test_cache_expiration_ttl():
+    """Une entrée expirée n'est plus servie."""
+    now = [0.0]
+    cache = ResultCache(max_bytes=100, ttl=10, clock=lambda: now[0])
+    cache.put("a", "h1", b"resultat")
+    now[0] = 9.9
+    assert cache.get("a") == b"resultat"
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+def test_cache_par_contenu():
+    """Le même contenu sous un autre identifiant réutilise le résultat."""
+    cache = ResultCache(max_bytes=100)
+    cache.put("a", content_key(POINTSET), b"resultat")
+    assert cache.get_by_content("b", content_key(POINTSET)) == b"resultat"
+    # "b" est maintenant connu directement
+    assert cache.get("b") == b"resultat"
+
+def test_triangulate_from_id_ne_recalcule_pas(mocker):
+    """Un deuxième appel est servi sans PSM ni triangulation."""
+    t = Triangulator(cache=ResultCache(max_bytes=1000))
+    fetch = mocker.patch.object(t, "fetch_pointset", return_value=POINTSET)
+    triangulate = mocker.spy(t, "triangulate")
+
+    first = t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+    second = t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+
+    assert first == second
+    fetch.assert_called_once()
+    assert triangulate.call_count == 1
+
+def test_triangulate_from_id_contenu_identique(mocker):
+    """Un autre PointSetID avec le même binaire ne relance pas le calcul."""
+    t = Triangulator(cache=ResultCache(max_bytes=1000))
+    mocker.patch.object(t, "fetch_pointset", return_value=POINTSET)
+    triangulate = mocker.spy(t, "triangulate")
+
+    t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+    t.triangulate_from_id("aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa")
+
+    assert triangulate.call_count == 1
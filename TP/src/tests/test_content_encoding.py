@@ -0,0 +1,115 @@
+"""Tests de la compression négociée et de la transformation delta-shuffle."""
+
+import struct
+
+import pytest
+from src.triangulator import app as app_module
+from src.triangulator import codec, content_encoding
+from src.triangulator.cache import ResultCache
+from src.triangulator.triangulator import Triangulator
+
+UUID = "123e4567-e89b-12d3-a456-426614174000"
+POINTSET = struct.pack('<I10f', 5, 0.0, 0.0, 4.0, 0.0, 0.0, 4.0, 4.0, 4.0,
+                       2.0, 1.5)
+
+
+def grid_result(side=40):
+    """Renvoie la triangulation d'une grille, sommets dans l'ordre des lignes."""
+    points = [(i % side, i // side) for i in range(side * side)]
+    return codec.encode_triangles(points, Triangulator().triangulate(points))
+
+@pytest.fixture
+def client(mocker, monkeypatch):
+    """Client Flask, PSM simulé, caches vides."""
+    monkeypatch.setattr(app_module, "result_cache", None)
+    monkeypatch.setattr(app_module, "encoded_cache",
+                        ResultCache(max_bytes=1_000_000))
+    mocker.patch("src.triangulator.triangulator.Triangulator.fetch_pointset",
+                 return_value=POINTSET)
+    with app_module.app.test_client() as client:
+        yield client
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, deflate", "deflate"),
+    ("deflate, gzip", content_encoding.ENCODINGS[0]),
+    ("*", content_encoding.ENCODINGS[0]),
+    ("gzip;q=0, br", None),
+    ("identity", None),
+    ("", None),
+    (None, None),
+])
+def test_negociation(header, expected):
+    """Qualités, joker et refus (q=0) ; à égalité, préférence du serveur."""
+    assert content_encoding.negotiate(header) == expected
+
+@pytest.mark.parametrize("encoding", content_encoding.ENCODINGS)
+def test_compression_aller_retour(encoding):
+    """Compression d'un bloc ou en flux → même décompression."""
+    binary = grid_result()
+    compressed = content_encoding.compress(binary, encoding)
+    streamed = b"".join(content_encoding.iter_compressed(
+        codec.iter_chunks(binary, 1000), encoding))
+    assert len(compressed) < len(binary)
+    assert content_encoding.decompress(compressed, encoding) == binary
+    assert content_encoding.decompress(streamed, encoding) == binary
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_transformation_reversible(numpy, monkeypatch):
+    """delta-shuffle garde la taille et les headers, `revert` redonne l'original."""
+    if not numpy:
+        monkeypatch.setattr(content_encoding, "np", None)
+    binary = grid_result()
+    transformed = content_encoding.apply(binary, "delta-shuffle")
+    assert len(transformed) == len(binary)
+    assert transformed[:4] == binary[:4]
+    assert content_encoding.revert(transformed, "delta-shuffle") == binary
+    empty = codec.encode_triangles([], [])
+    assert content_encoding.revert(
+        content_encoding.apply(empty, "delta-shuffle"), "delta-shuffle") == empty
+
+def test_transformation_compresse_mieux():
+    """Sur des sommets ordonnés dans l'espace, le gain est net."""
+    binary = grid_result()
+    plain = content_encoding.compress(binary, "gzip")
+    transformed = content_encoding.encode(binary, "gzip", "delta-shuffle")
+    assert len(transformed) * 1.5 < len(plain)
+
+def test_endpoint_gzip_mis_en_cache(client, mocker):
+    """Réponse gzip identique une fois décompressée, compressée une seule fois."""
+    compress = mocker.spy(content_encoding, "compress")
+    plain = client.get(f"/triangulation/{UUID}")
+    first = client.get(f"/triangulation/{UUID}",
+                       headers={"Accept-Encoding": "gzip"})
+    second = client.get(f"/triangulation/{UUID}",
+                        headers={"Accept-Encoding": "gzip"})
+
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    assert content_encoding.decompress(first.data, "gzip") == plain.data
+    assert second.data == first.data
+    assert compress.call_count == 1
+
+def test_endpoint_gros_resultat_compresse_en_flux(client, monkeypatch):
+    """Trop gros pour le cache des formes encodées → flux sans Content-Length."""
+    monkeypatch.setattr(app_module, "encoded_cache", ResultCache(max_bytes=10))
+    plain = client.get(f"/triangulation/{UUID}")
+    response = client.get(f"/triangulation/{UUID}",
+                          headers={"Accept-Encoding": "deflate"})
+    assert response.headers["Content-Encoding"] == "deflate"
+    assert "Content-Length" not in response.headers
+    assert content_encoding.decompress(response.data, "deflate") == plain.data
+
+def test_endpoint_transformation(client):
+    """X-Triangles-Transform est appliqué et renvoyé ; valeur inconnue → 400."""
+    plain = client.get(f"/triangulation/{UUID}")
+    response = client.get(f"/triangulation/{UUID}",
+                          headers={"X-Triangles-Transform": "delta-shuffle"})
+    assert response.headers["X-Triangles-Transform"] == "delta-shuffle"
+    assert "Content-Encoding" not in response.headers
+    assert content_encoding.revert(response.data, "delta-shuffle") == plain.data
+
+    invalid = client.get(f"/triangulation/{UUID}",
+                         headers={"X-Triangles-Transform": "rot13"})
+    assert invalid.status_code == 400
+    assert invalid.get_json()["code"] == "BAD_REQUEST"
@@ -0,0 +1,105 @@
+"""Tests de conformité communs aux moteurs de triangulation.
+
+Chaque moteur doit produire, sur les mêmes entrées, une triangulation de
+Delaunay valide : triangles dans le sens trigonométrique, cercles
+circonscrits vides, aucun doublon, et l'enveloppe convexe entièrement
+couverte (même nombre de triangles et même aire pour tous les moteurs).
+"""
+
+import math
+import random
+
+import pytest
+from src.triangulator import predicates
+from src.triangulator.triangulator import ENGINES, Triangulator
+
+
+def random_points(n, seed=0):
+    """Génère n points aléatoires reproductibles."""
+    rng = random.Random(seed)
+    return [(rng.random() * 100, rng.random() * 100) for _ in range(n)]
+
+CASES = {
+    "aleatoire": random_points(300),
+    "motif_modulo": [(i, i % 50) for i in range(300)],
+    "grille": [(i, j) for i in range(15) for j in range(15)],
+    "grille_decimale": [(i * 0.1, j * 0.1) for i in range(15) for j in range(15)],
+    "cercle": [(math.cos(k * 0.1), math.sin(k * 0.1)) for k in range(62)],
+    "parabole": [(i, i * i) for i in range(200)],
+    "etire": [(x * 1e6, y * 1e-3) for x, y in random_points(200, seed=1)],
+    "doublons": [(x // 20, y // 20) for x, y in random_points(100, seed=2)],
+    "alignes_plus_un": [(i, 0) for i in range(50)] + [(3, 1)],
+}
+
+def area(points, triangles):
+    """Aire totale couverte par les triangles."""
+    total = 0.0
+    for a, b, c in ((points[i] for i in tri) for tri in triangles):
+        total += (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return total / 2
+
+def assert_delaunay(points, triangles):
+    """Vérifie les propriétés d'une triangulation de Delaunay."""
+    assert len(set(triangles)) == len(triangles)
+    for tri in triangles:
+        a, b, c = (points[k] for k in tri)
+        # Plus petit indice en premier, sens trigonométrique
+        assert tri[0] == min(tri)
+        assert predicates.orient2d(*a, *b, *c) > 0
+        # Aucun point strictement dans le cercle circonscrit
+        assert not any(predicates.incircle(*a, *b, *c, *p) > 0 for p in points)
+
+@pytest.fixture(params=sorted(ENGINES))
+def engine(request):
+    """Nom de chaque moteur disponible."""
+    return request.param
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_moteur_produit_une_triangulation_de_delaunay(engine, case):
+    """Chaque moteur produit une triangulation de Delaunay valide."""
+    points = CASES[case]
+    triangles = Triangulator(engine=engine).triangulate(points)
+    assert triangles
+    assert_delaunay(points, triangles)
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_moteurs_couvrent_la_meme_enveloppe(case):
+    """Tous les moteurs donnent autant de triangles, sur la même aire."""
+    points = CASES[case]
+    results = [Triangulator(engine=e).triangulate(points) for e in sorted(ENGINES)]
+    reference = results[0]
+    for triangles in results[1:]:
+        assert len(triangles) == len(reference)
+        assert area(points, triangles) == pytest.approx(area(points, reference))
+
+def test_moteurs_identiques_en_position_generale():
+    """Sans points cocycliques, la triangulation de Delaunay est unique."""
+    points = random_points(500, seed=3)
+    results = [sorted(Triangulator(engine=e).triangulate(points))
+               for e in sorted(ENGINES)]
+    assert all(r == results[0] for r in results)
+
+def test_moteur_points_alignes(engine):
+    """Des points tous alignés lèvent une ValueError (-> 500)."""
+    with pytest.raises(ValueError, match="colinéaires"):
+        Triangulator(engine=engine).triangulate([(i, 2 * i) for i in range(10)])
+
+def test_moteur_inconnu():
+    """Un nom de moteur inconnu est refusé dès la construction."""
+    with pytest.raises(ValueError, match="inconnu"):
+        Triangulator(engine="quantique")
+
+def test_cache_separe_par_moteur(mocker):
+    """Le cache ne mélange pas les résultats de deux moteurs."""
+    from src.triangulator.cache import ResultCache
+
+    cache = ResultCache(max_bytes=1_000_000)
+    binary = Triangulator().encode_pointset(random_points(50))
+    computed = {}
+    for engine in sorted(ENGINES):
+        t = Triangulator(cache=cache, engine=engine)
+        mocker.patch.object(t, "fetch_pointset", return_value=binary)
+        spy = mocker.spy(t, "triangulate")
+        t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+        computed[engine] = spy.call_count
+    assert all(count == 1 for count in computed.values())
@@ -0,0 +1,105 @@
+"""Tests du pool de processus de triangulation."""
+
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from src.triangulator.executor import ExecutorBusy, TriangulationExecutor
+from src.triangulator.triangulator import Triangulator
+
+
+@pytest.fixture
+def executor():
+    """Pool d'un seul processus qui prend tous les PointSets."""
+    pool = TriangulationExecutor(max_workers=1, max_pending=1, inline_threshold=0)
+    yield pool
+    pool.shutdown()
+
+def random_points(n, seed=0):
+    """Génère n points aléatoires reproductibles."""
+    rng = random.Random(seed)
+    return [(rng.random() * 100, rng.random() * 100) for _ in range(n)]
+
+def test_executor_meme_resultat_que_en_ligne(executor):
+    """Le calcul dans un autre processus donne les mêmes triangles."""
+    t = Triangulator()
+    points = t.decode_pointset(t.encode_pointset(random_points(500)))
+    assert executor.triangulate(points) == t.triangulate(points)
+
+def test_executor_propage_l_erreur_de_triangulation(executor):
+    """Une ValueError du processus remonte telle quelle (-> 500)."""
+    with pytest.raises(ValueError, match="colinéaires"):
+        executor.triangulate([(0, 0), (1, 1), (2, 2)])
+
+def test_executor_seuil_en_ligne(mocker):
+    """En dessous du seuil, le calcul reste dans le thread de la requête."""
+    pool = TriangulationExecutor(max_workers=1, inline_threshold=1000)
+    t = Triangulator(executor=pool)
+    mocker.patch.object(t, "fetch_pointset",
+                        return_value=t.encode_pointset(random_points(50)))
+    pooled = mocker.patch.object(pool, "triangulate")
+
+    t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+
+    pooled.assert_not_called()
+
+def test_executor_file_pleine(executor):
+    """Au-delà de la file d'attente, la requête est refusée (-> 503)."""
+    executor._slots.acquire()
+    with pytest.raises(ExecutorBusy):
+        executor.triangulate(random_points(10))
+    executor._slots.release()
+
+def test_executor_delai_depasse():
+    """Un calcul trop long lève TimeoutError (-> 503)."""
+    pool = TriangulationExecutor(max_workers=1, timeout=0.001, inline_threshold=0)
+    try:
+        with pytest.raises(TimeoutError, match="trop longue"):
+            pool.triangulate(random_points(20_000))
+    finally:
+        pool.shutdown()
+
+def test_triangulate_from_id_utilise_le_pool(mocker, executor):
+    """Un gros PointSet passe par le pool depuis triangulate_from_id."""
+    t = Triangulator(executor=executor)
+    points = random_points(200)
+    mocker.patch.object(t, "fetch_pointset", return_value=t.encode_pointset(points))
+    spy = mocker.spy(executor, "triangulate")
+
+    result = t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+
+    spy.assert_called_once()
+    assert t.decode_triangles(result) == t.triangulate(t.decode_pointset(result))
+
+def test_executor_transmet_le_moteur(executor):
+    """Le moteur choisi est utilisé dans le processus du pool."""
+    t = Triangulator(engine="divide_conquer")
+    points = random_points(300)
+    assert executor.triangulate(points, "divide_conquer") == t.triangulate(points)
+
+def test_executor_segment_libere_sans_erreur_du_tracker():
+    """Le parent libère seul le segment : le resource tracker reste muet.
+
+    Le tracker est un processus à part, qui écrit directement sur stderr :
+    on lance donc les calculs dans un interpréteur séparé.
+    """
+    script = (
+        "from src.triangulator.executor import TriangulationExecutor\n"
+        "points = [(i % 7, i * i % 11) for i in range(200)]\n"
+        "pool = TriangulationExecutor(max_workers=1, inline_threshold=0)\n"
+        "try:\n"
+        "    for _ in range(3):\n"
+        "        pool.triangulate(points)\n"
+        "finally:\n"
+        "    pool.shutdown()\n"
+    )
+    run = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                         text=True, timeout=120,
+                         cwd=Path(__file__).resolve().parents[2])
+
+    assert run.returncode == 0, run.stderr
+    # Ni KeyError à l'unlink, ni segment signalé comme fuite à l'arrêt
+    assert "resource_tracker" not in run.stderr, run.stderr
+    assert run.stderr == ""
@@ -0,0 +1,61 @@
+"""Tests du générateur de charge (PSM local + Triangulator servi en HTTP)."""
+
+import threading
+
+import pytest
+from src.triangulator import app as app_module
+from src.triangulator import codec
+from src.triangulator.loadgen import LoadGenerator, percentile, upload_pointsets
+from src.triangulator.psm_client import PSMClient
+from src.triangulator.psm_stub import StubPSM
+from werkzeug.serving import make_server
+
+POINTS = [(0, 0), (1, 0), (0, 1), (1, 1), (0.5, 0.4)]
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """PSM de substitution + Triangulator sur un vrai port → (psm, url)."""
+    with StubPSM() as psm:
+        client = PSMClient(psm.base_url, retries=0)
+        monkeypatch.setattr(app_module, "psm", client)
+        monkeypatch.setattr(app_module, "result_cache", None)
+        server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield psm, f"http://127.0.0.1:{server.server_port}"
+        finally:
+            server.shutdown()
+            thread.join()
+            client.close()
+
+def test_centiles():
+    """Centile au rang le plus proche, 0 sans mesure."""
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+def test_charge_de_bout_en_bout(services):
+    """Dépôt dans le PSM, puis charge : toutes les requêtes répondent 200."""
+    psm, url = services
+    ids = upload_pointsets(psm.base_url, [codec.encode_pointset(POINTS)] * 2)
+    assert len(set(ids)) == 2
+
+    report = LoadGenerator(url, ids, concurrency=4).run(rps=20, duration=0.5)
+    assert report["requests"] == 10
+    assert report["statuses"] == {"200": 10}
+    assert report["p50_ms"] <= report["p90_ms"] <= report["p99_ms"] \
+        <= report["max_ms"]
+    assert report["received_bytes"] == 10 * len(
+        codec.encode_triangles(POINTS, [(0, 1, 4), (0, 2, 4), (1, 3, 4),
+                                        (2, 3, 4)]))
+
+def test_erreurs_comptees_par_code(services):
+    """Un PointSet inconnu du PSM est compté sous son code HTTP."""
+    _, url = services
+    report = LoadGenerator(url, ["34343434-3434-3434-3434-343434343434"]
+                           ).run(rps=10, duration=0.2)
+    assert report["statuses"] == {"404": 2}
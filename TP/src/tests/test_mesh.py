@@ -0,0 +1,140 @@
+"""Tests du maillage modifiable (ajout et retrait de points)."""
+
+import math
+import random
+
+import pytest
+from src.triangulator import delaunay, predicates
+from src.triangulator.mesh import DelaunayMesh
+
+
+def assert_delaunay_mesh(mesh):
+    """Vérifie que le maillage est la triangulation des points présents."""
+    xs, ys = mesh.xs, mesh.ys
+    present = [i for i, alive in enumerate(mesh.alive) if alive]
+    triangles = mesh.triangles()
+    assert len(set(triangles)) == len(triangles)
+    for a, b, c in triangles:
+        assert mesh.alive[a] and mesh.alive[b] and mesh.alive[c]
+        assert a == min(a, b, c)
+        assert predicates.orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) > 0
+        assert not any(
+            predicates.incircle(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c],
+                                xs[k], ys[k]) > 0
+            for k in present
+        )
+    # Même nombre de triangles qu'une triangulation refaite de zéro
+    fresh = delaunay.triangulate([xs[i] for i in present],
+                                 [ys[i] for i in present])
+    assert len(triangles) == len(fresh)
+
+
+@pytest.mark.parametrize("case", ["aleatoire", "grille", "cercle", "doublons"])
+def test_ajouts_et_retraits_aleatoires(case):
+    """Après chaque modification, le maillage reste de Delaunay."""
+    rng = random.Random(3)
+    if case == "aleatoire":
+        points = [(rng.random(), rng.random()) for _ in range(60)]
+    elif case == "grille":
+        points = [(i, j) for i in range(7) for j in range(7)]
+    elif case == "cercle":
+        points = [(math.cos(k * 0.3), math.sin(k * 0.3)) for k in range(20)]
+    else:
+        points = [(rng.randint(0, 5), rng.randint(0, 5)) for _ in range(40)]
+    integers = case in ("grille", "doublons")
+
+    mesh = DelaunayMesh(points)
+    assert_delaunay_mesh(mesh)
+    for _ in range(25):
+        present = [i for i, alive in enumerate(mesh.alive) if alive]
+        if rng.random() < 0.5:
+            mesh.remove(rng.sample(present, min(len(present), 3)))
+        elif integers:
+            mesh.insert([(rng.randint(-1, 8), rng.randint(-1, 8))])
+        else:
+            mesh.insert([(rng.random() * 2 - 0.5, rng.random() * 2 - 0.5)])
+        assert_delaunay_mesh(mesh)
+
+
+def test_meme_resultat_que_triangulation_complete():
+    """En position générale, le maillage modifié est identique au calcul complet."""
+    rng = random.Random(5)
+    mesh = DelaunayMesh([(rng.random(), rng.random()) for _ in range(200)])
+    added = mesh.insert([(rng.random(), rng.random()) for _ in range(20)])
+    mesh.remove(range(0, 200, 7))
+
+    assert list(added) == list(range(200, 220))
+    present = [i for i, alive in enumerate(mesh.alive) if alive]
+    fresh = delaunay.triangulate([mesh.xs[i] for i in present],
+                                 [mesh.ys[i] for i in present])
+    expected = {tuple(present[k] for k in tri) for tri in fresh}
+    assert set(mesh.triangles()) == expected
+
+
+def test_retrait_point_enveloppe():
+    """Retirer un coin du carré : l'enveloppe est recalculée."""
+    mesh = DelaunayMesh([(0, 0), (4, 0), (4, 4), (0, 4), (1, 2), (3, 1)])
+    mesh.remove([2])
+
+    assert_delaunay_mesh(mesh)
+    assert all(2 not in tri for tri in mesh.triangles())
+
+
+def test_retrait_jusqu_a_points_alignes():
+    """Plus que des points alignés : aucun triangle, puis le maillage repart."""
+    mesh = DelaunayMesh([(0, 0), (1, 0), (2, 0), (1, 1)])
+    mesh.remove([3])
+    assert mesh.triangles() == []
+    assert len(mesh) == 3
+
+    mesh.insert([(1, -1)])
+    assert_delaunay_mesh(mesh)
+    assert len(mesh.triangles()) == 2
+
+
+def test_doublon_prend_la_place_du_point_retire():
+    """Un doublon mis de côté remplace le point retiré."""
+    mesh = DelaunayMesh([(0, 0), (2, 0), (1, 2), (1, 1), (1, 1)])
+    assert all(4 not in tri for tri in mesh.triangles())
+
+    mesh.remove([3])
+
+    assert_delaunay_mesh(mesh)
+    assert any(4 in tri for tri in mesh.triangles())
+
+
+def test_aller_retour_binaire():
+    """to_bytes / from_bytes : même maillage, points retirés omis."""
+    rng = random.Random(8)
+    mesh = DelaunayMesh([(rng.random(), rng.random()) for _ in range(50)])
+    mesh.remove([0, 10])
+    binary = mesh.to_bytes()
+
+    copy = DelaunayMesh.from_bytes(binary)
+
+    assert len(copy) == 48
+    assert sorted(copy.triangles()) == sorted(
+        DelaunayMesh.from_bytes(binary).triangles())
+    assert copy.to_bytes() == binary
+    assert_delaunay_mesh(copy)
+
+
+def test_from_bytes_sans_recalcul(mocker):
+    """from_bytes reprend les triangles sans relancer la triangulation."""
+    mesh = DelaunayMesh([(0, 0), (1, 0), (0, 1), (1, 1), (0.5, 0.4)])
+    build = mocker.spy(DelaunayMesh, "_build")
+
+    DelaunayMesh.from_bytes(mesh.to_bytes())
+
+    build.assert_not_called()
+
+
+def test_indice_absent():
+    """Retirer un point inconnu ou déjà retiré → IndexError."""
+    mesh = DelaunayMesh([(0, 0), (1, 0), (0, 1)])
+    mesh.remove([1])
+
+    with pytest.raises(IndexError):
+        mesh.remove([1])
+    with pytest.raises(IndexError):
+        mesh.remove([5])
@@ -0,0 +1,93 @@
+"""Tests des métriques (format Prometheus, étapes, en-tête Server-Timing)."""
+
+import pytest
+from src.triangulator.app import app
+from src.triangulator.metrics import REGISTRY, Counter, Histogram, Registry
+from src.triangulator.triangulator import Triangulator
+
+POINTS = [(0, 0), (1, 0), (0, 1), (1, 1), (0.5, 0.4)]
+FETCH_METHOD = "src.triangulator.triangulator.Triangulator.fetch_pointset"
+
+
+@pytest.fixture
+def client():
+    """Client de test Flask."""
+    with app.test_client() as client:
+        yield client
+
+def test_compteur_et_histogramme_au_format_prometheus():
+    """Export texte : séries étiquetées, buckets cumulés, somme et compte."""
+    counter = Counter("c_total", "aide", ("code",))
+    counter.inc(2, "A")
+    counter.inc(1, "A")
+    histogram = Histogram("h_seconds", "aide", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "fetch")
+    histogram.observe(0.5, "fetch")
+
+    assert list(counter.samples()) == ['c_total{code="A"} 3']
+    assert list(histogram.samples()) == [
+        'h_seconds_bucket{stage="fetch",le="0.1"} 1',
+        'h_seconds_bucket{stage="fetch",le="1.0"} 2',
+        'h_seconds_bucket{stage="fetch",le="+Inf"} 2',
+        'h_seconds_sum{stage="fetch"} 0.55',
+        'h_seconds_count{stage="fetch"} 2',
+    ]
+
+def test_etapes_chronometrees(mocker):
+    """Chaque étape du pipeline est mesurée, avec les tailles du résultat."""
+    registry = Registry()
+    metrics = registry.request_metrics()
+    t = Triangulator(metrics=metrics)
+    mocker.patch.object(t, "fetch_pointset",
+                        return_value=t.encode_pointset(POINTS))
+
+    t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000")
+
+    assert list(metrics.durations) == ["fetch", "decode", "triangulate", "encode"]
+    assert registry.stage_duration.count("triangulate") == 1
+    assert registry.points.value() == 5
+    assert registry.triangles.value() == 4
+    assert "fetch;dur=" in metrics.server_timing()
+
+def test_registre_desactive():
+    """Mesures désactivées : aucune mesure de requête."""
+    assert Registry(enabled=False).request_metrics() is None
+
+def test_tests_de_cercle_comptes():
+    """Les moteurs comptent leurs tests de cercle circonscrit."""
+    before = REGISTRY.circumcircle_tests.value()
+    Triangulator().triangulate(POINTS)
+    Triangulator(engine="divide_conquer").triangulate(POINTS)
+    assert REGISTRY.circumcircle_tests.value() > before
+
+def test_endpoint_metrics_et_server_timing(client, mocker):
+    """/metrics expose les étapes ; la réponse porte l'en-tête Server-Timing."""
+    mocker.patch(FETCH_METHOD,
+                 return_value=Triangulator().encode_pointset(POINTS))
+
+    response = client.get("/triangulation/ffffffff-ffff-ffff-ffff-ffffffffffff")
+    assert response.status_code == 200
+    assert "triangulate;dur=" in response.headers["Server-Timing"]
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.content_type.startswith("text/plain")
+    text = metrics.get_data(as_text=True)
+    assert 'triangulator_stage_duration_seconds_count{stage="fetch"}' in text
+    assert 'triangulator_http_responses_total{status="200"}' in text
+    assert "triangulator_cache_entries" in text
+
+def test_erreurs_comptees_par_categorie(client, mocker):
+    """Chaque catégorie d'erreur a son compteur."""
+    mocker.patch(FETCH_METHOD, side_effect=FileNotFoundError)
+    before = REGISTRY.errors.value("NOT_FOUND")
+
+    response = client.get("/triangulation/abababab-abab-abab-abab-abababababab")
+
+    assert response.status_code == 404
+    assert REGISTRY.errors.value("NOT_FOUND") == before + 1
+
+def test_endpoint_metrics_desactive(client, monkeypatch):
+    """TRIANGULATOR_METRICS=0 : /metrics répond 404."""
+    monkeypatch.setattr(REGISTRY, "enabled", False)
+    assert client.get("/metrics").status_code == 404
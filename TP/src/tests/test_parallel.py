@@ -0,0 +1,90 @@
+"""Tests de la triangulation parallèle par bandes."""
+
+import math
+import random
+
+import pytest
+from src.triangulator import predicates
+from src.triangulator.parallel import ParallelTriangulator
+from src.triangulator.spatial import GridIndex
+from src.triangulator.triangulator import Triangulator
+
+
+@pytest.fixture(scope="module")
+def parallel():
+    """Mode parallèle à 3 bandes, quelle que soit la taille du PointSet."""
+    pool = ParallelTriangulator(workers=3, min_points=0)
+    yield pool
+    pool.shutdown()
+
+def random_points(n, seed=0):
+    """Génère n points aléatoires reproductibles."""
+    rng = random.Random(seed)
+    return [(rng.random() * 100, rng.random() * 100) for _ in range(n)]
+
+def area(points, triangles):
+    """Aire totale couverte par les triangles."""
+    total = 0.0
+    for a, b, c in ((points[i] for i in tri) for tri in triangles):
+        total += (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return total / 2
+
+def test_parallele_identique_en_position_generale(parallel):
+    """Sans points cocycliques, on retrouve exactement le résultat en série."""
+    points = random_points(3000)
+    serial = Triangulator().triangulate(points)
+    result = Triangulator(parallel=parallel).triangulate(points)
+    assert sorted(result) == sorted(serial)
+
+@pytest.mark.parametrize("points", [
+    [(i, j) for i in range(20) for j in range(20)],
+    [(i * 0.1, j * 0.1) for i in range(20) for j in range(20)],
+    [(math.cos(k * 0.1), math.sin(k * 0.1)) for k in range(62)],
+    [(i, i * i) for i in range(300)],
+], ids=["grille", "grille_decimale", "cercle", "parabole"])
+def test_parallele_cas_degeneres(parallel, points):
+    """Cas cocycliques : triangulation de Delaunay complète, sans chevauchement."""
+    serial = Triangulator().triangulate(points)
+    result = Triangulator(parallel=parallel).triangulate(points)
+
+    assert len(set(result)) == len(result) == len(serial)
+    assert area(points, result) == pytest.approx(area(points, serial))
+    for tri in result:
+        a, b, c = (points[k] for k in tri)
+        assert predicates.orient2d(*a, *b, *c) > 0
+        assert not any(predicates.incircle(*a, *b, *c, *p) > 0 for p in points)
+
+def test_parallele_moteur_diviser_pour_regner(parallel):
+    """Les bandes utilisent le moteur demandé."""
+    points = random_points(2000, seed=1)
+    t = Triangulator(parallel=parallel, engine="divide_conquer")
+    assert sorted(t.triangulate(points)) == sorted(Triangulator().triangulate(points))
+
+def test_parallele_points_alignes(parallel):
+    """Des points tous alignés lèvent toujours une ValueError."""
+    with pytest.raises(ValueError, match="colinéaires"):
+        Triangulator(parallel=parallel).triangulate([(i, i) for i in range(100)])
+
+def test_parallele_seuil(mocker):
+    """En dessous du seuil, le nuage n'est pas découpé."""
+    pool = ParallelTriangulator(workers=2, min_points=1000)
+    spy = mocker.patch.object(pool, "triangulate")
+    Triangulator(parallel=pool).triangulate(random_points(100))
+    spy.assert_not_called()
+
+def test_parallele_desactive_par_defaut(monkeypatch):
+    """Sans TRIANGULATOR_PARALLEL_WORKERS (> 1), le mode est désactivé."""
+    monkeypatch.delenv("TRIANGULATOR_PARALLEL_WORKERS", raising=False)
+    assert ParallelTriangulator.from_env() is None
+    monkeypatch.setenv("TRIANGULATOR_PARALLEL_WORKERS", "4")
+    assert ParallelTriangulator.from_env().workers == 4
+
+def test_grille_proches_d_un_disque():
+    """L'index par grille renvoie au moins tous les points du disque."""
+    points = random_points(2000, seed=2)
+    grid = GridIndex([p[0] for p in points], [p[1] for p in points])
+    for x, y, r in [(50, 50, 3), (0, 0, 10), (120, 50, 25), (10, 90, 0.5)]:
+        near = set(grid.near_disk(x, y, r))
+        inside = {k for k, (px, py) in enumerate(points)
+                  if math.hypot(px - x, py - y) < r}
+        assert inside <= near
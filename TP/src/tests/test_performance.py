@@ -1,5 +1,6 @@
 """Tests de performance pour le module de triangulation."""
 
+import random
 import struct
 import time
 
@@ -44,22 +45,21 @@ def test_decode_pointset_performance(mocker):
 
     assert duration < 0.1
 
-def test_encode_triangles_performance(mocker):
+def test_encode_triangles_performance():
     """Test de performance : l'encodage des triangles doit être rapide."""
-    points = [(0, 0)] * 5000
-    triangles = [(0, 1, 2)] * 4000
+    rng = random.Random(0)
+    points = [(rng.random(), rng.random()) for _ in range(5000)]
 
     t = Triangulator()
+    triangles = t.triangulate(points)
 
-    mocker.patch.object(t, "encode_triangles", return_value=b"ok")
-
-    import time
     start = time.perf_counter()
 
-    t.encode_triangles(points, triangles)
+    binary = t.encode_triangles(points, triangles)
 
     duration = time.perf_counter() - start
 
+    assert t.decode_triangles(binary) == triangles
     assert duration < 0.1
 
 def test_full_pipeline_performance(mocker):
@@ -82,3 +82,216 @@ def test_full_pipeline_performance(mocker):
 
     assert duration < 7
 
+def test_triangulation_perf_100k_points():
+    """Vérifie que 100 000 points aléatoires se triangulent en quelques secondes."""
+    rng = random.Random(42)
+    points = [(rng.random() * 1000, rng.random() * 1000) for _ in range(100_000)]
+
+    t = Triangulator()
+
+    start = time.perf_counter()
+
+    triangles = t.triangulate(points)
+
+    duration = time.perf_counter() - start
+
+    # Euler : au plus 2n - 5 triangles pour n points
+    assert 0 < len(triangles) <= 2 * len(points) - 5
+    assert duration < 30
+
+def test_codec_1m_points_performance():
+    """Test de performance : encodage + décodage d'un PointSet de 1M points."""
+    rng = random.Random(0)
+    points = [(rng.random(), rng.random()) for _ in range(1_000_000)]
+
+    t = Triangulator()
+
+    start = time.perf_counter()
+
+    binary = t.encode_pointset(points)
+    decoded = t.decode_pointset(binary)
+
+    duration = time.perf_counter() - start
+
+    assert len(decoded) == len(points)
+    assert duration < 2
+
+def test_predicates_filtre_proche_du_flottant(mocker):
+    """Le filtre d'erreur évite le calcul exact sur des données aléatoires."""
+    from src.triangulator import predicates
+
+    rng = random.Random(7)
+    cases = [tuple(rng.random() for _ in range(8)) for _ in range(100_000)]
+
+    def plain(ax, ay, bx, by, cx, cy, dx, dy):
+        adx, ady = ax - dx, ay - dy
+        bdx, bdy = bx - dx, by - dy
+        cdx, cdy = cx - dx, cy - dy
+        return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+                + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+                + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+    incircle_exact = mocker.spy(predicates, "incircle_exact")
+    orient2d_exact = mocker.spy(predicates, "orient2d_exact")
+
+    # Le calcul exact (fractions) est des dizaines de fois plus lent que le
+    # flottant : il ne doit jamais être déclenché, ni par les prédicats
+    # seuls, ni par une triangulation de points aléatoires
+    for c in cases:
+        assert (predicates.incircle(*c) > 0) == (plain(*c) > 0)
+    points = [(rng.random() * 1000, rng.random() * 1000) for _ in range(20_000)]
+    for engine in ("incremental", "divide_conquer"):
+        Triangulator(engine=engine).triangulate(points)
+    assert incircle_exact.call_count == 0
+    assert orient2d_exact.call_count == 0
+
+    # Points cocirculaires : le filtre ne tranche pas, le calcul exact prend le relais
+    assert predicates.incircle(0, 0, 1, 0, 1, 1, 0, 1) == 0
+    assert incircle_exact.call_count == 1
+
+@pytest.mark.parametrize("engine", ["incremental", "divide_conquer"])
+def test_moteurs_perf_motif_modulo(engine):
+    """Motif (i, i % 50) sur 20 000 points : les deux moteurs restent rapides."""
+    points = [(i, i % 50) for i in range(20_000)]
+
+    t = Triangulator(engine=engine)
+
+    start = time.perf_counter()
+
+    triangles = t.triangulate(points)
+
+    duration = time.perf_counter() - start
+
+    # Euler : au plus 2n - 5 triangles pour n points
+    assert 0 < len(triangles) <= 2 * len(points) - 5
+    assert duration < 20
+
+@pytest.mark.parametrize("workers", [2, 4, 8])
+def test_parallele_acceleration(workers):
+    """Mode parallèle : accélération en fonction du nombre de cœurs."""
+    import os
+
+    from src.triangulator.parallel import ParallelTriangulator
+
+    if (os.cpu_count() or 1) < workers:
+        pytest.skip(f"{workers} cœurs nécessaires")
+
+    rng = random.Random(42)
+    points = [(rng.random() * 1000, rng.random() * 1000) for _ in range(200_000)]
+
+    start = time.perf_counter()
+    serial = Triangulator().triangulate(points)
+    serial_duration = time.perf_counter() - start
+
+    pool = ParallelTriangulator(workers=workers, min_points=0)
+    try:
+        # Démarrage des processus hors mesure
+        Triangulator(parallel=pool).triangulate(points[:1000])
+
+        start = time.perf_counter()
+        result = Triangulator(parallel=pool).triangulate(points)
+        parallel_duration = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+
+    speedup = serial_duration / parallel_duration
+    assert sorted(result) == sorted(serial)
+    # Au moins la moitié de l'accélération idéale
+    assert speedup > workers / 2, (
+        f"{workers} workers : x{speedup:.2f} "
+        f"({serial_duration:.1f} s -> {parallel_duration:.1f} s)")
+
+def test_memoire_par_triangle():
+    """Stockage compact : moins de 100 octets par triangle (moteur incrémental)."""
+    import tracemalloc
+
+    from src.triangulator import delaunay
+
+    rng = random.Random(7)
+    n = 20_000
+    xs = [rng.random() for _ in range(n)]
+    ys = [rng.random() for _ in range(n)]
+    order = delaunay.insertion_order(xs, ys)
+
+    tracemalloc.start()
+    mesh = delaunay.IncrementalDelaunay(xs, ys)
+    seeds = mesh.start(order)
+    for i in order:
+        if i not in seeds:
+            mesh.insert(i)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n_triangles = len(mesh.triangles())
+    assert size / n_triangles < 100
+
+def test_maillage_modifiable_mise_a_jour_locale():
+    """Ajouter / retirer 100 points coûte bien moins qu'une triangulation complète."""
+    from src.triangulator.mesh import DelaunayMesh
+
+    rng = random.Random(1)
+    points = [(rng.random(), rng.random()) for _ in range(100_000)]
+
+    start = time.perf_counter()
+    mesh = DelaunayMesh(points)
+    build_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mesh.insert([(rng.random(), rng.random()) for _ in range(100)])
+    mesh.remove(rng.sample(range(100_000), 100))
+    update_duration = time.perf_counter() - start
+
+    assert update_duration * 20 < build_duration
+
+def test_region_bbox_petite_fenetre():
+    """Une petite fenêtre renvoie beaucoup moins d'octets, rapidement."""
+    from src.triangulator import codec
+    from src.triangulator.region import RegionIndex
+
+    rng = random.Random(1)
+    points = [(rng.random() * 1000, rng.random() * 1000) for _ in range(50_000)]
+    full = codec.encode_triangles(points, Triangulator().triangulate(points))
+    index = RegionIndex(full)
+
+    start = time.perf_counter()
+    region = index.extract((100, 100, 150, 150))
+    duration = time.perf_counter() - start
+
+    assert len(region) * 100 < len(full)
+    assert duration < 0.05
+
+def test_ordre_spatial_compression_et_localite():
+    """Ordre spatial : réponse compressée bien plus petite, ACMR divisé par 2,5."""
+    from src.triangulator import codec, content_encoding, reorder
+
+    rng = random.Random(1)
+    points = [(rng.random() * 1000, rng.random() * 1000) for _ in range(20_000)]
+    triangles = Triangulator().triangulate(points)
+
+    start = time.perf_counter()
+    ordered_points, ordered = reorder.spatial(points, triangles)
+    duration = time.perf_counter() - start
+
+    before = content_encoding.encode(codec.encode_triangles(points, triangles),
+                                     "gzip", "delta-shuffle")
+    after = content_encoding.encode(codec.encode_triangles(ordered_points, ordered),
+                                    "gzip", "delta-shuffle")
+    assert len(after) * 1.5 < len(before)
+    assert reorder.cache_miss_ratio(ordered) * 2.5 < reorder.cache_miss_ratio(triangles)
+    assert duration < 2
+
+def test_points_degeneres_rejetes_en_temps_lineaire():
+    """100 000 points alignés ou confondus : échec (ou résultat) immédiat."""
+    aligned = [(i, 2 * i) for i in range(100_000)]
+    duplicates = [(1.0, 2.0)] * 99_997 + [(0, 0), (5, 0), (0, 5)]
+    t = Triangulator()
+
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match="colinéaires"):
+        t.triangulate(aligned)
+    triangles = t.triangulate(duplicates)
+    duration = time.perf_counter() - start
+
+    # 4 points distincts, (1, 2) à l'intérieur du triangle des 3 autres
+    assert len(triangles) == 3
+    assert duration < 1
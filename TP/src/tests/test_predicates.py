@@ -0,0 +1,80 @@
+"""Tests des prédicats géométriques robustes."""
+
+import math
+from fractions import Fraction
+
+import pytest
+from src.triangulator import predicates
+from src.triangulator.triangulator import Triangulator
+
+
+def naive_orient2d(ax, ay, bx, by, cx, cy):
+    """orient2d en flottants seuls (sans filtre)."""
+    return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+
+def near_collinear_cases():
+    """Points quasi alignés avec (12, 12) et (24, 24), à quelques ulp près."""
+    ulp = math.ulp(0.5)
+    return [(0.5 + i * ulp, 0.5 + j * ulp, 12.0, 12.0, 24.0, 24.0)
+            for i in range(32) for j in range(32)]
+
+def sign(value):
+    """Signe d'un nombre : -1, 0 ou 1."""
+    return (value > 0) - (value < 0)
+
+def test_orient2d_cas_simples():
+    """Sens trigonométrique > 0, sens horaire < 0, alignés = 0."""
+    assert predicates.orient2d(0, 0, 1, 0, 0, 1) > 0
+    assert predicates.orient2d(0, 0, 0, 1, 1, 0) < 0
+    assert predicates.orient2d(0, 0, 1, 1, 2, 2) == 0
+
+def test_orient2d_quasi_alignes_signe_exact():
+    """Le signe reste exact là où le calcul flottant se trompe."""
+    cases = near_collinear_cases()
+    wrong = [c for c in cases
+             if sign(naive_orient2d(*c)) != predicates.orient2d_exact(*c)]
+    # Le cas est bien piégeux pour les flottants...
+    assert wrong
+    # ...mais pas pour le prédicat filtré
+    for c in cases:
+        assert sign(predicates.orient2d(*c)) == predicates.orient2d_exact(*c)
+
+def test_incircle_cas_simples():
+    """Dedans > 0, dehors < 0, sur le cercle = 0."""
+    assert predicates.incircle(0, 0, 4, 0, 0, 4, 1, 1) > 0
+    assert predicates.incircle(0, 0, 4, 0, 0, 4, 5, 5) < 0
+    assert predicates.incircle(-1, 0, 1, 0, 0, 1, 0, -1) == 0
+
+def test_incircle_quasi_cocycliques_signe_exact():
+    """Points à quelques ulp d'un cercle : le signe suit le calcul exact."""
+    ulp = math.ulp(1.0)
+    for i in range(-8, 9):
+        d = (0.1 + 1.0 + i * ulp, 0.1)
+        args = (0.1 - 1.0, 0.1, 0.1, 0.1 + 1.0, 0.1, 0.1 - 1.0, *d)
+        assert sign(predicates.incircle(*args)) == predicates.incircle_exact(*args)
+
+def test_incircle_exact_sur_fractions():
+    """Le calcul exact ne perd rien sur des coordonnées non représentables."""
+    x = Fraction(1, 10)
+    assert predicates.incircle_exact(x, 0, 0, x, -x, 0, 0, -x) == 0
+
+@pytest.mark.parametrize("triangle", [(0, 1, 2), (0, 2, 1)])
+def test_circumcircle_independant_de_l_orientation(triangle):
+    """is_in_circumcircle accepte aussi les triangles dans le sens horaire."""
+    t = Triangulator()
+    points = [(0, 0), (4, 0), (0, 4)]
+    assert t.is_in_circumcircle((1, 1), triangle, points) is True
+    assert t.is_in_circumcircle((5, 5), triangle, points) is False
+
+def test_triangulation_grille_decimale():
+    """Grille au pas de 0.1 (quasi cocyclique en flottants) : maillage valide."""
+    points = [(i * 0.1, j * 0.1) for i in range(12) for j in range(12)]
+    t = Triangulator()
+    triangles = t.triangulate(points)
+
+    # Grille 12 x 12 : 2 triangles par case, ni trou ni chevauchement
+    assert len(triangles) == 2 * 11 * 11
+    for tri in triangles:
+        a, b, c = (points[k] for k in tri)
+        assert predicates.orient2d(*a, *b, *c) > 0
+        assert not any(t.is_in_circumcircle(p, tri, points) for p in points)
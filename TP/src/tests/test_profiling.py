@@ -0,0 +1,106 @@
+"""Tests du profilage à la demande d'une requête."""
+
+import json
+
+import pytest
+from src.triangulator import app as app_module
+from src.triangulator.profiling import RequestProfiler
+from src.triangulator.triangulator import Triangulator
+
+POINTS = [(0, 0), (1, 0), (0, 1), (1, 1), (0.5, 0.4)]
+FETCH_METHOD = "src.triangulator.triangulator.Triangulator.fetch_pointset"
+UUID = "12121212-1212-1212-1212-121212121212"
+
+
+@pytest.fixture
+def client():
+    """Client de test Flask."""
+    with app_module.app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    """Profilage activé avec un jeton, cache désactivé."""
+    profiler = RequestProfiler(str(tmp_path), token="secret")
+    monkeypatch.setattr(app_module, "profiler", profiler)
+    monkeypatch.setattr(app_module, "result_cache", None)
+    return profiler
+
+def test_jeton_et_taux():
+    """Jeton valide → profil ; sinon selon le taux d'échantillonnage."""
+    profiler = RequestProfiler("/tmp", token="secret")
+    assert profiler.wants("secret")
+    assert not profiler.wants("autre")
+    assert not profiler.wants(None)
+    assert RequestProfiler("/tmp", rate=1.0).wants(None)
+
+def test_desactive_sans_repertoire(monkeypatch):
+    """Sans TRIANGULATOR_PROFILE_DIR, aucun profilage."""
+    monkeypatch.delenv("TRIANGULATOR_PROFILE_DIR", raising=False)
+    assert RequestProfiler.from_env() is None
+
+def test_requete_profilee(client, profiler, tmp_path, mocker):
+    """Le jeton déclenche le profil : .prof, .collapsed et résumé JSON."""
+    mocker.patch(FETCH_METHOD,
+                 return_value=Triangulator().encode_pointset(POINTS))
+
+    response = client.get(f"/triangulation/{UUID}",
+                          headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
+    assert Triangulator().decode_triangles(response.data) == \
+        Triangulator().triangulate(POINTS)
+    name = response.headers["X-Profile"]
+    assert (tmp_path / f"{name}.prof").stat().st_size > 0
+    collapsed = (tmp_path / f"{name}.collapsed").read_text()
+    assert "triangulate" in collapsed
+    summary = json.loads((tmp_path / f"{name}.json").read_text())
+    assert summary["pointSetId"] == UUID
+    assert summary["points"] == 5
+    assert summary["triangles"] == 4
+    assert set(summary["stages_ms"]) == {"fetch", "decode", "triangulate", "encode"}
+
+def test_requete_non_profilee(client, profiler, tmp_path, mocker):
+    """Sans jeton (ou mauvais jeton), la réponse part sans profil."""
+    mocker.patch(FETCH_METHOD,
+                 return_value=Triangulator().encode_pointset(POINTS))
+
+    response = client.get(f"/triangulation/{UUID}?profile=mauvais")
+
+    assert response.status_code == 200
+    assert "X-Profile" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+def test_profil_tire_au_sort_sans_en_tete(client, profiler, tmp_path, mocker,
+                                          caplog):
+    """Requête tirée au sort : profil écrit, nom seulement dans le journal."""
+    mocker.patch(FETCH_METHOD,
+                 return_value=Triangulator().encode_pointset(POINTS))
+    profiler.rate = 1.0
+
+    with caplog.at_level("INFO", logger="src.triangulator.profiling"):
+        response = client.get(f"/triangulation/{UUID}?profile=mauvais")
+
+    assert response.status_code == 200
+    assert "X-Profile" not in response.headers
+    written = {path.stem for path in tmp_path.iterdir()}
+    assert len(written) == 1
+    assert written.pop() in caplog.text
+
+def test_ecriture_du_profil_impossible(client, profiler, tmp_path, mocker, caplog):
+    """Répertoire de profils non inscriptible → 200 sans profil, erreur journalisée."""
+    mocker.patch(FETCH_METHOD,
+                 return_value=Triangulator().encode_pointset(POINTS))
+    # Un fichier à la place du répertoire : makedirs lève une OSError
+    blocked = tmp_path / "profils"
+    blocked.write_text("")
+    profiler.directory = str(blocked)
+
+    response = client.get(f"/triangulation/{UUID}",
+                          headers={"X-Profile-Token": "secret"})
+
+    assert response.status_code == 200
+    assert Triangulator().decode_triangles(response.data) == \
+        Triangulator().triangulate(POINTS)
+    assert "X-Profile" not in response.headers
+    assert "non écrit" in caplog.text
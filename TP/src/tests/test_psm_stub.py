@@ -0,0 +1,68 @@
+"""Tests du PointSetManager de substitution."""
+
+import http.client
+import json
+
+import pytest
+from src.triangulator import codec
+from src.triangulator.psm_client import PSMClient
+from src.triangulator.psm_stub import StubPSM
+
+UUID = "12121212-1212-1212-1212-121212121212"
+BINARY = codec.encode_pointset([(0, 0), (1, 0), (0, 1)])
+
+
+def request(psm, method, path, body=None):
+    """Envoie une requête brute au PSM → (code, corps)."""
+    connection = http.client.HTTPConnection(psm.host, psm.port, timeout=5)
+    try:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+def test_sert_les_pointsets_connus():
+    """Le PSM local sert les PointSets connus et répond 404 sinon."""
+    with StubPSM({UUID: BINARY}) as psm:
+        client = PSMClient(psm.base_url, retries=0)
+        try:
+            assert client.get_pointset(UUID) == BINARY
+            with pytest.raises(FileNotFoundError):
+                client.get_pointset("34343434-3434-3434-3434-343434343434")
+        finally:
+            client.close()
+
+def test_depot_puis_lecture():
+    """POST /pointset → 201 et un identifiant, relu ensuite par GET."""
+    with StubPSM() as psm:
+        status, body = request(psm, "POST", "/pointset", BINARY)
+        assert status == 201
+        pointset_id = json.loads(body)["pointSetId"]
+        assert request(psm, "GET", f"/pointset/{pointset_id}") == (200, BINARY)
+
+def test_erreurs_au_format_du_contrat():
+    """Binaire invalide ou identifiant mal formé → 400 avec {code, message}."""
+    with StubPSM() as psm:
+        status, body = request(psm, "POST", "/pointset", BINARY[:-1])
+        assert status == 400
+        assert set(json.loads(body)) == {"code", "message"}
+        status, body = request(psm, "GET", "/pointset/pas-un-uuid")
+        assert status == 400
+        assert json.loads(body)["code"] == "BAD_REQUEST"
+
+def test_stockage_sur_disque(tmp_path):
+    """Avec un répertoire, les PointSets survivent à un redémarrage."""
+    with StubPSM({UUID: BINARY}, directory=str(tmp_path)):
+        pass
+    with StubPSM(directory=str(tmp_path)) as psm:
+        assert request(psm, "GET", f"/pointset/{UUID}") == (200, BINARY)
+
+def test_injection_d_erreurs_et_de_latence(mocker):
+    """error_rate=1 → 503 ; la latence configurée est appliquée."""
+    sleep = mocker.patch("src.triangulator.psm_stub.time.sleep")
+    with StubPSM({UUID: BINARY}, latency=0.05, error_rate=1.0) as psm:
+        status, body = request(psm, "GET", f"/pointset/{UUID}")
+    assert status == 503
+    assert json.loads(body)["code"] == "SERVICE_UNAVAILABLE"
+    sleep.assert_called_once_with(0.05)
@@ -0,0 +1,107 @@
+"""Tests de l'extraction d'une sous-région (`?bbox=`)."""
+
+import random
+import struct
+
+import pytest
+from src.triangulator import app as app_module
+from src.triangulator import codec
+from src.triangulator.region import RegionCache, RegionIndex, _meets_box, parse_bbox
+from src.triangulator.triangulator import Triangulator
+
+UUID = "123e4567-e89b-12d3-a456-426614174000"
+POINTSET = struct.pack('<I10f', 5, 0.0, 0.0, 4.0, 0.0, 0.0, 4.0, 4.0, 4.0,
+                       2.0, 1.5)
+
+
+def coordinates(binary):
+    """Renvoie les triangles d'une structure Triangles, en coordonnées."""
+    points = codec.decode_pointset(binary)
+    return {tuple(points[i] for i in triangle)
+            for triangle in codec.decode_triangles(binary)}
+
+@pytest.mark.parametrize("value", ["0,0,1", "a,0,1,1", "1,0,0,1", "0,0,nan,1",
+                                   "0,0,inf,1"])
+def test_bbox_invalide(value):
+    """Quatre nombres finis, min <= max, sinon ValueError."""
+    with pytest.raises(ValueError):
+        parse_bbox(value)
+
+def test_bbox_valide():
+    """Les quatre bornes sont lues dans l'ordre minx,miny,maxx,maxy."""
+    assert parse_bbox("-1,2.5,3,4") == (-1.0, 2.5, 3.0, 4.0)
+
+def test_triangle_hors_du_rectangle_malgre_sa_boite():
+    """Boîtes qui se touchent mais triangle séparé par son hypoténuse."""
+    assert not _meets_box(0, 0, 4, 0, 0, 4, 3, 3, 4, 4)
+    assert _meets_box(0, 0, 4, 0, 0, 4, 1, 1, 4, 4)
+    # Rectangle entièrement dans le triangle
+    assert _meets_box(0, 0, 4, 0, 0, 4, 0.5, 0.5, 1, 1)
+
+def test_extraction_identique_au_parcours_complet():
+    """Mêmes triangles qu'un test exhaustif, sommets inutilisés omis."""
+    rng = random.Random(3)
+    points = [(rng.random() * 100, rng.random() * 100) for _ in range(500)]
+    full = codec.encode_triangles(points, Triangulator().triangulate(points))
+    index = RegionIndex(full)
+    every = coordinates(full)
+
+    for _ in range(20):
+        x, y = rng.random() * 100, rng.random() * 100
+        bbox = (x, y, x + rng.random() * 30, y + rng.random() * 30)
+        region = index.extract(bbox)
+        expected = {triangle for triangle in every
+                    if _meets_box(*(v for p in triangle for v in p), *bbox)}
+        assert coordinates(region) == expected
+        n = codec.HEADER.unpack_from(region)[0]
+        assert n == len({p for triangle in expected for p in triangle})
+
+def test_region_vide():
+    """Rectangle hors du nuage → N = 0 et T = 0."""
+    full = codec.encode_triangles([(0, 0), (1, 0), (0, 1)], [(0, 1, 2)])
+    assert RegionIndex(full).extract((5, 5, 6, 6)) == struct.pack('<II', 0, 0)
+
+def test_cache_borne_en_octets(mocker):
+    """Le cache d'index est borné en octets estimés ; trop gros → non gardé."""
+    rng = random.Random(3)
+    points = [(rng.random(), rng.random()) for _ in range(500)]
+    full = codec.encode_triangles(points, Triangulator().triangulate(points))
+    size = RegionIndex(full).nbytes
+    assert size > len(full)
+    compute = mocker.Mock(return_value=full)
+
+    cache = RegionCache(max_bytes=size)
+    cache.extract("a", (0, 0, 1, 1), compute)
+    cache.extract("b", (0, 0, 1, 1), compute)
+    cache.extract("b", (0, 0, 1, 1), compute)
+    assert cache.size == size
+    assert compute.call_count == 2
+
+    small = RegionCache(max_bytes=size - 1)
+    for _ in range(3):
+        assert small.extract("a", (0, 0, 1, 1), compute) == \
+            RegionIndex(full).extract((0, 0, 1, 1))
+    assert small.size == 0
+    assert compute.call_count == 5
+
+def test_endpoint_bbox(mocker, monkeypatch):
+    """?bbox= → structure compacte ; l'index sert aux requêtes suivantes."""
+    monkeypatch.setattr(app_module, "result_cache", None)
+    monkeypatch.setattr(app_module, "regions", app_module.RegionCache())
+    fetch = mocker.patch(
+        "src.triangulator.triangulator.Triangulator.fetch_pointset",
+        return_value=POINTSET)
+    with app_module.app.test_client() as client:
+        full = client.get(f"/triangulation/{UUID}")
+        corner = client.get(f"/triangulation/{UUID}?bbox=0,0,0.5,0.5")
+        again = client.get(f"/triangulation/{UUID}?bbox=3.9,3.9,5,5")
+        invalid = client.get(f"/triangulation/{UUID}?bbox=1,1,0,0")
+
+    assert corner.status_code == again.status_code == 200
+    assert coordinates(corner.data) <= coordinates(full.data)
+    assert len(corner.data) < len(full.data)
+    assert codec.decode_triangles(corner.data)
+    # Une seule récupération pour l'index, en plus de la requête complète
+    assert fetch.call_count == 2
+    assert invalid.status_code == 400
+    assert invalid.get_json()["code"] == "BAD_REQUEST"
@@ -0,0 +1,126 @@
+"""Tests du réordonnancement spatial du maillage (`?order=spatial`)."""
+
+import random
+
+import pytest
+from src.triangulator import app as app_module
+from src.triangulator import benchmark, codec, reorder
+from src.triangulator.triangulator import Triangulator
+
+UUID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+def random_mesh(n: int, seed: int = 1):
+    """Renvoie (points, triangles) d'un nuage aléatoire de n points."""
+    rng = random.Random(seed)
+    points = [(rng.random() * 100, rng.random() * 100) for _ in range(n)]
+    return points, Triangulator().triangulate(points)
+
+
+def oriented(points, triangles):
+    """Triangles en coordonnées, à rotation près (orientation comprise)."""
+    shapes = set()
+    for triangle in triangles:
+        corners = [points[i] for i in triangle]
+        k = corners.index(min(corners))
+        shapes.add(tuple(corners[k:] + corners[:k]))
+    return shapes
+
+def test_hilbert_order_permutation():
+    """Chaque point apparaît une fois ; les doublons gardent leur ordre."""
+    xs = [3.0, 0.0, 3.0, 1.0, 2.0]
+    ys = [3.0, 0.0, 3.0, 1.0, 2.0]
+    order = reorder.hilbert_order(xs, ys)
+    assert sorted(order) == list(range(5))
+    assert order.index(0) + 1 == order.index(2)
+
+def test_cache_miss_ratio():
+    """Un triangle seul : 3 défauts ; un second qui partage une arête : 1."""
+    assert reorder.cache_miss_ratio([]) == 0.0
+    assert reorder.cache_miss_ratio([(0, 1, 2)]) == 3.0
+    assert reorder.cache_miss_ratio([(0, 1, 2), (1, 3, 2)]) == 2.0
+    # Cache de 3 sommets : le sommet 0 est sorti quand il revient
+    assert reorder.cache_miss_ratio([(0, 1, 2), (3, 4, 5), (0, 1, 2)],
+                                    cache_size=3) == 3.0
+
+def test_tipsify_permutation_et_composantes():
+    """Tous les triangles une seule fois, y compris sur plusieurs composantes."""
+    triangles = [(0, 1, 2), (5, 6, 7), (1, 3, 2), (6, 8, 7)]
+    order = reorder.tipsify(triangles, 9)
+    assert sorted(order) == [0, 1, 2, 3]
+    assert reorder.tipsify([], 0) == []
+
+def test_spatial_meme_maillage():
+    """Mêmes triangles en coordonnées et même orientation, plus petit en tête."""
+    points, triangles = random_mesh(500)
+
+    ordered_points, ordered = reorder.spatial(points, triangles)
+
+    assert sorted(ordered_points) == sorted(points)
+    assert len(ordered) == len(triangles)
+    assert oriented(ordered_points, ordered) == oriented(points, triangles)
+    assert all(a < b and a < c for a, b, c in ordered)
+
+def test_spatial_ameliore_la_localite():
+    """Moins de défauts de cache de sommets qu'à la sortie du moteur."""
+    points, triangles = random_mesh(2000)
+
+    _, ordered = reorder.spatial(points, triangles)
+
+    assert reorder.cache_miss_ratio(ordered) < 0.8
+    assert reorder.cache_miss_ratio(ordered) < reorder.cache_miss_ratio(triangles) / 2
+
+def test_ordre_inconnu(monkeypatch):
+    """Ordre inconnu → ValueError (Triangulator et variable d'environnement)."""
+    with pytest.raises(ValueError):
+        Triangulator(order="aleatoire")
+    monkeypatch.setenv("TRIANGULATOR_ORDER", "aleatoire")
+    with pytest.raises(ValueError):
+        reorder.order_from_env()
+    monkeypatch.setenv("TRIANGULATOR_ORDER", "spatial")
+    assert reorder.order_from_env() == "spatial"
+
+def test_cle_de_cache_par_ordre():
+    """Un résultat réordonné n'est pas partagé avec l'ordre d'origine."""
+    assert Triangulator().cache_key("id") == "id"
+    assert Triangulator(order="spatial").cache_key("id") == "id#spatial"
+    assert Triangulator(engine="divide_conquer", order="spatial").cache_key(
+        "id") == "id#divide_conquer#spatial"
+
+def test_vertex_areas_numpy_et_python(monkeypatch):
+    """Parcours du banc : mêmes aires avec et sans NumPy."""
+    points, triangles = random_mesh(300)
+    binary = codec.encode_triangles(points, triangles)
+
+    fast = benchmark.vertex_areas(binary)
+    monkeypatch.setattr(benchmark, "np", None)
+    slow = benchmark.vertex_areas(binary)
+
+    # Calcul en float32 avec NumPy
+    assert fast == pytest.approx(slow, rel=1e-5)
+    # Triangles tous dans le même sens : la somme est l'aire totale
+    total = sum(abs((xb - xa) * (yc - ya) - (yb - ya) * (xc - xa)) / 2
+                for (xa, ya), (xb, yb), (xc, yc)
+                in ([points[i] for i in t] for t in triangles))
+    assert abs(sum(slow)) == pytest.approx(total, rel=1e-4)
+
+def test_endpoint_order(mocker, monkeypatch):
+    """?order=spatial → même maillage, renuméroté ; ordre inconnu → 400."""
+    monkeypatch.setattr(app_module, "result_cache", None)
+    points, _ = random_mesh(200)
+    mocker.patch(
+        "src.triangulator.triangulator.Triangulator.fetch_pointset",
+        return_value=codec.encode_pointset(points))
+    with app_module.app.test_client() as client:
+        plain = client.get(f"/triangulation/{UUID}")
+        spatial = client.get(f"/triangulation/{UUID}?order=spatial")
+        invalid = client.get(f"/triangulation/{UUID}?order=aleatoire")
+
+    assert plain.status_code == spatial.status_code == 200
+    assert len(spatial.data) == len(plain.data)
+    assert spatial.data != plain.data
+    decoded = codec.decode_pointset(spatial.data)
+    assert oriented(decoded, codec.decode_triangles(spatial.data)) == oriented(
+        codec.decode_pointset(plain.data), codec.decode_triangles(plain.data))
+    assert invalid.status_code == 400
+    assert "order" in invalid.get_json()["message"]
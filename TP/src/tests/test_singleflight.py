@@ -0,0 +1,154 @@
+"""Tests du regroupement des requêtes simultanées (single-flight)."""
+
+import os
+import threading
+import time
+
+import pytest
+from src.triangulator.singleflight import SingleFlight
+from src.triangulator.triangulator import Triangulator
+
+
+def run_concurrently(n, target):
+    """Lance n threads sur target et renvoie leurs résultats (ou erreurs)."""
+    results = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_un_seul_calcul_entre_threads():
+    """Dix appels simultanés pour la même clé → un seul calcul."""
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"resultat"
+
+    results = run_concurrently(10, lambda: flight.do("id", compute))
+
+    assert results == [b"resultat"] * 10
+    assert len(calls) == 1
+
+def test_erreur_propagee_aux_threads_en_attente():
+    """Les requêtes en attente reçoivent la même catégorie d'erreur."""
+    flight = SingleFlight()
+
+    def compute():
+        time.sleep(0.05)
+        raise FileNotFoundError("PointSet introuvable")
+
+    results = run_concurrently(5, lambda: flight.do("id", compute))
+
+    assert all(isinstance(r, FileNotFoundError) for r in results)
+
+def test_cles_differentes_independantes():
+    """Deux clés différentes sont calculées séparément."""
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+
+def test_desactive_par_defaut(monkeypatch, tmp_path):
+    """Sans configuration, pas de regroupement (les réponses restent en flux)."""
+    monkeypatch.delenv("TRIANGULATOR_SINGLEFLIGHT", raising=False)
+    monkeypatch.delenv("TRIANGULATOR_SINGLEFLIGHT_DIR", raising=False)
+    assert SingleFlight.from_env() is None
+
+    monkeypatch.setenv("TRIANGULATOR_SINGLEFLIGHT", "1")
+    assert SingleFlight.from_env().lock_dir is None
+    monkeypatch.setenv("TRIANGULATOR_SINGLEFLIGHT_DIR", str(tmp_path))
+    assert SingleFlight.from_env().lock_dir == str(tmp_path)
+
+@pytest.mark.parametrize("outcome", [
+    b"triangles",
+    ValueError("colinéaires"),
+    ConnectionError("PSM"),
+])
+def test_entre_processus_par_fichier_verrou(tmp_path, outcome):
+    """Une autre instance (autre processus) relit le résultat du leader."""
+    leader = SingleFlight(lock_dir=str(tmp_path))
+    follower = SingleFlight(lock_dir=str(tmp_path))
+    started = threading.Event()
+    release = threading.Event()
+    results = {}
+
+    def slow():
+        started.set()
+        release.wait(5)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def run(name, flight, fn):
+        try:
+            results[name] = flight.do("id", fn)
+        except Exception as e:
+            results[name] = e
+
+    first = threading.Thread(target=run, args=("leader", leader, slow))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=run, args=(
+        "follower", follower, lambda: pytest.fail("calcul en double")))
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join()
+    second.join()
+
+    if isinstance(outcome, Exception):
+        assert type(results["follower"]) is type(outcome)
+        assert str(results["follower"]) == str(outcome)
+    else:
+        assert results["follower"] == outcome
+
+def test_repertoire_verrous_borne(tmp_path):
+    """Les verrous et résultats expirés sont supprimés : le répertoire reste borné."""
+    flight = SingleFlight(lock_dir=str(tmp_path), ttl=0.0)
+    for i in range(50):
+        assert flight.do(f"id{i}", lambda i=i: b"x" * i) == b"x" * i
+    with pytest.raises(ValueError):
+        flight.do("erreur", lambda: int("x"))
+
+    # Chaque leader balaie après avoir publié : il ne reste que les siens
+    assert len(list(tmp_path.iterdir())) <= 2
+
+def test_verrou_tenu_non_supprime(tmp_path):
+    """Un verrou tenu par un calcul en cours n'est pas supprimé."""
+    flight = SingleFlight(lock_dir=str(tmp_path), ttl=0.0)
+    lock_path, _ = flight._paths("en_cours")
+
+    def inner():
+        flight._sweep(time.time() + 1)
+        return b"verrou" if os.path.exists(lock_path) else b""
+
+    assert flight.do("en_cours", inner) == b"verrou"
+    assert not os.path.exists(lock_path)
+
+def test_triangulate_from_id_regroupe(mocker):
+    """Des appels simultanés à triangulate_from_id ne font qu'un appel au PSM."""
+    t = Triangulator(flight=SingleFlight())
+    binary = t.encode_pointset([(0, 0), (1, 0), (0, 1)])
+
+    def slow_fetch(pointset_id):
+        time.sleep(0.05)
+        return binary
+
+    fetch = mocker.patch.object(t, "fetch_pointset", side_effect=slow_fetch)
+
+    results = run_concurrently(
+        5, lambda: t.triangulate_from_id("123e4567-e89b-12d3-a456-426614174000"))
+
+    assert len(set(results)) == 1
+    assert fetch.call_count == 1
@@ -0,0 +1,108 @@
+"""Tests du stockage sur disque des réponses Triangles."""
+
+import os
+import struct
+
+from src.triangulator import app as app_module
+from src.triangulator import codec
+from src.triangulator.cache import content_key
+from src.triangulator.store import ResultStore, StoredResult, _name
+from src.triangulator.triangulator import Triangulator
+
+POINTSET = struct.pack('<I6f', 3, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0)
+RESULT = codec.encode_triangles([(0, 0), (1, 0), (0, 1)], [(0, 1, 2)])
+UUID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+def test_resultat_conserve_apres_redemarrage(tmp_path):
+    """Un résultat écrit est relu par une autre instance (autre worker)."""
+    ResultStore(str(tmp_path)).put("a", "h1", RESULT)
+    store = ResultStore(str(tmp_path))
+    result = store.get("a")
+    assert isinstance(result, StoredResult)
+    assert result[:] == RESULT
+    assert store.get("b") is None
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+    assert store.stats()["bytes"] == len(RESULT)
+
+def test_recherche_par_contenu(tmp_path):
+    """Même empreinte sous un autre PointSetID → associé ensuite directement."""
+    store = ResultStore(str(tmp_path))
+    store.put("a", "h1", RESULT)
+    assert store.get_by_content("b", "h1")[:] == RESULT
+    assert store.get("b")[:] == RESULT
+    # Le contenu n'est écrit qu'une fois
+    assert len(os.listdir(tmp_path / "content")) == 1
+
+def test_eviction_des_plus_anciens(tmp_path):
+    """Au-delà de max_bytes, le fichier le moins récemment utilisé part."""
+    store = ResultStore(str(tmp_path), max_bytes=3 * len(RESULT) - 1)
+    store.put("a", "h1", RESULT)
+    store.put("b", "h2", RESULT)
+    # Dates d'usage explicites : "a" est le plus ancien
+    os.utime(tmp_path / "content" / _name("h1"), (1, 1))
+    os.utime(tmp_path / "content" / _name("h2"), (2, 2))
+    store.put("c", "h3", RESULT)
+    assert store.get("a") is None
+    assert store.get("b")[:] == RESULT
+    assert store.get("c")[:] == RESULT
+    assert store.stats()["evictions"] == 1
+    # Le lien de "a" ne pointe plus sur rien : il est supprimé aussi
+    assert len(os.listdir(tmp_path / "ids")) == 2
+
+def test_taille_bornee_entre_processus(tmp_path):
+    """Deux workers sur le même répertoire : le total reste sous max_bytes."""
+    limit = 3 * len(RESULT) - 1
+    stores = [ResultStore(str(tmp_path), max_bytes=limit) for _ in range(2)]
+
+    for i in range(10):
+        stores[i % 2].put(f"id{i}", f"h{i}", RESULT)
+        on_disk = sum(entry.stat().st_size
+                      for entry in os.scandir(tmp_path / "content"))
+        assert on_disk <= limit
+        # Le compteur commun suit le disque, quel que soit l'écrivain
+        assert stores[i % 2].stats()["bytes"] == on_disk
+
+    assert sum(store.stats()["evictions"] for store in stores) == 8
+    assert ResultStore(str(tmp_path)).stats()["bytes"] == 2 * len(RESULT)
+
+def test_fichier_tronque_ignore(tmp_path):
+    """Un fichier de taille incohérente avec N et T est traité comme absent."""
+    store = ResultStore(str(tmp_path))
+    store.put("a", "h1", RESULT)
+    with open(tmp_path / "content" / _name("h1"), "r+b") as file:
+        file.truncate(len(RESULT) - 4)
+    assert store.get("a") is None
+
+def test_triangulator_relit_le_disque(tmp_path, mocker):
+    """Un nouveau worker sert le résultat du disque sans PSM ni calcul."""
+    first = Triangulator(store=ResultStore(str(tmp_path)))
+    mocker.patch.object(first, "fetch_pointset", return_value=POINTSET)
+    expected = first.triangulate_from_id(UUID)
+
+    second = Triangulator(store=ResultStore(str(tmp_path)))
+    fetch = mocker.patch.object(second, "fetch_pointset")
+    size, chunks = second.triangulate_stream_from_id(UUID)
+    # Fichier ouvert, que le serveur WSGI peut envoyer directement
+    with chunks:
+        assert chunks.read() == expected
+    assert size == len(expected)
+    fetch.assert_not_called()
+
+def test_endpoint_sert_le_fichier(tmp_path, mocker, monkeypatch):
+    """L'endpoint renvoie le fichier stocké, identique au calcul initial."""
+    monkeypatch.setattr(app_module, "result_cache", None)
+    monkeypatch.setattr(app_module, "result_store", ResultStore(str(tmp_path)))
+    fetch = mocker.patch(
+        "src.triangulator.triangulator.Triangulator.fetch_pointset",
+        return_value=POINTSET)
+    with app_module.app.test_client() as client:
+        first = client.get(f"/triangulation/{UUID}")
+        second = client.get(f"/triangulation/{UUID}")
+    assert first.status_code == second.status_code == 200
+    assert second.data == first.data
+    assert second.headers["Content-Length"] == str(len(first.data))
+    fetch.assert_called_once()
+    assert ResultStore(str(tmp_path)).get_by_content(
+        "autre", content_key(POINTSET))[:] == first.data
@@ -1,11 +1,23 @@
 """Tests unitaires pour le module de triangulation."""
 
+import random
 import struct
-import urllib.error
 from io import BytesIO
 import pytest
+from src.triangulator import codec, psm_client
+from src.triangulator.psm_client import PSMClient
 from src.triangulator.triangulator import Triangulator
 
+
+@pytest.fixture(params=["numpy", "struct"])
+def codec_backend(request, monkeypatch):
+    """Exécute le test avec NumPy puis avec le repli pur Python."""
+    if request.param == "numpy" and codec.np is None:
+        pytest.skip("NumPy n'est pas installé")
+    if request.param == "struct":
+        monkeypatch.setattr(codec, "np", None)
+    return request.param
+
 ### Tests fetch_pointset ###
 
 def test_fetch_pointset_success(mocker):
@@ -16,67 +28,140 @@ def test_fetch_pointset_success(mocker):
     result = t.fetch_pointset("valid_id")
     assert result == expected_binary
 
+def fake_psm(mocker, *responses):
+    """Remplace les connexions HTTP vers le PSM par des réponses simulées.
+
+    Chaque réponse est un couple (statut, corps) ou une exception à lever.
+    """
+    connection = mocker.MagicMock()
+    connection.sock = None
+
+    def connect():
+        connection.sock = mocker.MagicMock()
+
+    connection.connect.side_effect = connect
+    replies = []
+    for item in responses:
+        if isinstance(item, Exception):
+            replies.append(item)
+            continue
+        status, body = item
+        response = mocker.MagicMock(status=status, reason=f"HTTP {status}",
+                                    will_close=False)
+        stream = BytesIO(body)
+        response.read.side_effect = stream.read
+        response.readinto.side_effect = stream.readinto
+        response.getheader.return_value = None
+        replies.append(response)
+    connection.getresponse.side_effect = replies
+    connection.replies = replies
+    factory = mocker.patch("http.client.HTTPConnection", return_value=connection)
+    return factory, connection
+
 def test_fetch_pointset_404(mocker):
     """Teste la levée de FileNotFoundError lors d'une 404."""
-    t = Triangulator()
+    t = Triangulator(client=PSMClient())
     # On simule une erreur HTTP 404
-    error_404 = urllib.error.HTTPError("url", 404, "Not Found", {}, BytesIO(b""))
-    mocker.patch("urllib.request.urlopen", side_effect=error_404)
+    fake_psm(mocker, (404, b""))
 
     with pytest.raises(FileNotFoundError, match="introuvable"):
         t.fetch_pointset("unknown_id")
 
 def test_fetch_pointset_503(mocker):
-    """Teste la levée de ConnectionError lors d'une 503."""
-    t = Triangulator()
-    # On simule une erreur HTTP 503
-    error_503 = urllib.error.HTTPError("url", 503, "Service Unavailable", {}, BytesIO(b""))
-    mocker.patch("urllib.request.urlopen", side_effect=error_503)
+    """Teste la levée de ConnectionError lors d'une 503 (après les reprises)."""
+    t = Triangulator(client=PSMClient(retries=2, backoff=0))
+    # On simule une erreur HTTP 503 à chaque essai
+    _, connection = fake_psm(mocker, (503, b""), (503, b""), (503, b""))
 
     with pytest.raises(ConnectionError, match="maintenance"):
         t.fetch_pointset("any_id")
+    assert connection.getresponse.call_count == 3
+
+def test_fetch_pointset_503_puis_succes(mocker):
+    """Une 503 passagère est absorbée par une reprise."""
+    t = Triangulator(client=PSMClient(retries=2, backoff=0))
+    fake_psm(mocker, (503, b""), (200, b"\x00\x00\x00\x00"))
+
+    assert t.fetch_pointset("any_id") == b"\x00\x00\x00\x00"
 
 def test_fetch_pointset_other_http_error(mocker):
     """Teste la levée de ValueError pour d'autres codes HTTP (ex: 500)."""
-    t = Triangulator()
-    error_500 = urllib.error.HTTPError("url", 500, "Internal Server Error", {}, BytesIO(b""))
-    mocker.patch("urllib.request.urlopen", side_effect=error_500)
+    t = Triangulator(client=PSMClient())
+    fake_psm(mocker, (500, b""))
 
     with pytest.raises(ValueError, match="Erreur HTTP 500"):
         t.fetch_pointset("any_id")
 
 def test_fetch_pointset_url_error(mocker):
     """Teste la levée de ConnectionError quand le serveur est inaccessible."""
-    t = Triangulator()
+    t = Triangulator(client=PSMClient(retries=1, backoff=0))
     # On simule un échec de connexion (serveur éteint)
-    mocker.patch("urllib.request.urlopen", side_effect=urllib.error.URLError("Connection refused"))
+    refused = ConnectionRefusedError("Connection refused")
+    fake_psm(mocker, refused, refused)
 
     with pytest.raises(ConnectionError, match="Impossible de joindre le PSM"):
         t.fetch_pointset("any_id")
 
 def test_fetch_pointset_read_coverage(mocker):
     """Teste le succès de lecture de fetch_pointset pour le coverage."""
-    t = Triangulator()
-    fake_data = b"\x00\x00\x00\x01\x00\x00\x80\x3f\x00\x00\x00\x40"
-
-    # 1. On crée le MagicMock
-    mock_response = mocker.MagicMock()
-    
-    # 2. IMPORTANT : On dit au mock que lorsqu'on entre dans le "with", 
-    # il doit se retourner lui-même pour que 'as response' soit égal au mock.
-    mock_response.__enter__.return_value = mock_response
-    
-    # 3. On définit ce que read() doit renvoyer
-    mock_response.read.return_value = fake_data
-
-    # 4. On patch l'ouverture de l'URL
-    mocker.patch("urllib.request.urlopen", return_value=mock_response)
+    t = Triangulator(client=PSMClient(base_url="http://psm:9000/api"))
+    # N = 1 (little-endian) puis le point (1.0, 2.0)
+    fake_data = b"\x01\x00\x00\x00\x00\x00\x80\x3f\x00\x00\x00\x40"
+    factory, connection = fake_psm(mocker, (200, fake_data))
 
     result = t.fetch_pointset("123e4567-e89b-12d3-a456-426614174000")
 
     # result sera bien égal à fake_data
     assert result == fake_data
-    mock_response.read.assert_called_once()
+    factory.assert_called_once_with("psm", 9000, timeout=2.0)
+    connection.request.assert_called_once_with(
+        "GET", "/api/pointset/123e4567-e89b-12d3-a456-426614174000",
+        headers={"Accept": "application/octet-stream"})
+
+def test_fetch_pointset_reutilise_la_connexion(mocker):
+    """Deux appels successifs passent par la même connexion keep-alive."""
+    t = Triangulator(client=PSMClient())
+    first = struct.pack('<I2f', 1, 1.0, 2.0)
+    second = struct.pack('<I', 0)
+    factory, connection = fake_psm(mocker, (200, first), (200, second))
+
+    assert t.fetch_pointset("id1") == first
+    assert t.fetch_pointset("id2") == second
+    factory.assert_called_once()
+
+def test_fetch_pointset_corps_tronque(mocker):
+    """Un corps plus court que 4 + N * 8 octets est rejeté (503)."""
+    t = Triangulator(client=PSMClient(retries=0))
+    truncated = struct.pack('<I3f', 2, 1.0, 2.0, 3.0)
+    fake_psm(mocker, (200, truncated))
+
+    with pytest.raises(ConnectionError, match="Impossible de joindre le PSM"):
+        t.fetch_pointset("any_id")
+
+def test_fetch_pointset_content_length_trop_court(mocker):
+    """Le Content-Length suffit à détecter la troncature, sans lire le corps."""
+    t = Triangulator(client=PSMClient(retries=0))
+    _, connection = fake_psm(mocker, (200, struct.pack('<I', 1000)))
+    response = connection.replies[0]
+    response.getheader.return_value = "12"
+
+    with pytest.raises(ConnectionError):
+        t.fetch_pointset("any_id")
+    response.readinto.assert_not_called()
+    connection.close.assert_called()
+
+def test_fetch_pointset_chunked_n_enorme(mocker):
+    """Sans Content-Length, un N énorme ne provoque aucune grosse allocation."""
+    t = Triangulator(client=PSMClient(retries=0))
+    _, connection = fake_psm(
+        mocker, (200, struct.pack('<I4f', 2**31, 1.0, 2.0, 3.0, 4.0)))
+    response = connection.replies[0]
+
+    with pytest.raises(ConnectionError):
+        t.fetch_pointset("any_id")
+    response.readinto.assert_not_called()
+    assert all(call.args[0] <= psm_client.READ_CHUNK
+               for call in response.read.call_args_list)
 
 ### Tests de triangulation ###
 
@@ -167,6 +252,26 @@ def test_points_colineaires_et_non_colineaires_creent_triangles_valides():
     triangles = t.triangulate(points)
     assert len(triangles) == 2
 
+def test_triangulation_respecte_delaunay_avec_tri_spatial():
+    """Cas : assez de points pour activer le tri BRIO -> cercles vides."""
+    rng = random.Random(7)
+    points = [(rng.random() * 100, rng.random() * 100) for _ in range(300)]
+    t = Triangulator()
+    triangles = t.triangulate(points)
+    for tri in triangles:
+        a, b, c = (points[i] for i in tri)
+        # Orientation trigonométrique
+        assert (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) > 0
+        # Aucun point strictement dans le cercle circonscrit
+        assert not any(t.is_in_circumcircle(p, tri, points) for p in points)
+
+def test_triangulation_ignore_les_doublons():
+    """Cas : un point en double ne crée pas de triangle dégénéré."""
+    points = [(0, 0), (1, 0), (0, 1), (1, 0)]
+    t = Triangulator()
+    triangles = t.triangulate(points)
+    assert triangles == [(0, 1, 2)]
+
 
 ### Tests de décodage / encodage ###
 
@@ -246,6 +351,94 @@ def test_decode_invalid_triangles():
     with pytest.raises(ValueError):
         t.decode_triangles(invalid_binary)
 
+def test_codec_backends_produisent_les_memes_octets(codec_backend):
+    """Les deux implémentations du codec respectent exactement la spec."""
+    points = [(1.0, 2.0), (3.5, -4.25), (0.0, 1.0)]
+    triangles = [(0, 1, 2)]
+    t = Triangulator()
+
+    expected_points = struct.pack('<I', 3) + b"".join(
+        struct.pack('<ff', x, y) for x, y in points
+    )
+    expected = expected_points + struct.pack('<I', 1) + struct.pack('<III', 0, 1, 2)
+
+    assert t.encode_pointset(points) == expected_points
+    assert t.encode_triangles(points, triangles) == expected
+    assert t.decode_pointset(expected) == points
+    assert t.decode_triangles(expected) == triangles
+
+def test_codec_backends_pointset_vide(codec_backend):
+    """Un PointSet vide fait un aller-retour sans erreur."""
+    t = Triangulator()
+    binary = t.encode_triangles([], [])
+    assert binary == struct.pack('<II', 0, 0)
+    assert t.decode_pointset(binary) == []
+    assert t.decode_triangles(binary) == []
+
+def test_codec_backends_triangles_tronques(codec_backend):
+    """Partie triangles tronquée → même ValueError avec les deux implémentations."""
+    t = Triangulator()
+    binary = t.encode_triangles([(0, 0), (1, 0), (0, 1), (1, 1)],
+                                [(0, 1, 2), (1, 3, 2)])
+    assert len(t.decode_triangles(binary)) == 2
+    for truncated in (binary[:-1], binary[:-12], binary[:-23]):
+        with pytest.raises(ValueError, match="invalides ou incomplètes"):
+            t.decode_triangles(truncated)
+
+def test_pointset_vue_sans_copie():
+    """La vue PointSet se comporte comme une liste de points (x, y)."""
+    points = [(0.5, 1.0), (2.0, -3.0), (4.0, 8.0)]
+    t = Triangulator()
+    decoded = t.decode_pointset(t.encode_pointset(points))
+
+    assert len(decoded) == 3
+    assert decoded[1] == (2.0, -3.0)
+    assert decoded[-1] == (4.0, 8.0)
+    assert list(decoded) == points
+    assert decoded.xs() == [0.5, 2.0, 4.0]
+    with pytest.raises(IndexError):
+        decoded[3]
+
+def test_encode_triangles_recopie_les_sommets_d_origine():
+    """Les octets des sommets d'un PointSet décodé sont recopiés tels quels."""
+    # Un NaN avec une charge utile non standard : un ré-encodage la perdrait
+    nan = bytes.fromhex("0100c07f")
+    binary = struct.pack('<I', 3) + nan + struct.pack('<5f', 1, 0, 0, 1, 1)
+    t = Triangulator()
+    points = t.decode_pointset(binary)
+    result = t.encode_triangles(points, [(0, 1, 2)])
+    assert result == binary + struct.pack('<IIII', 1, 0, 1, 2)
+
+@pytest.mark.parametrize("decoded", [False, True])
+def test_encodage_en_flux_identique(codec_backend, decoded):
+    """Les morceaux produits en flux recomposent exactement la réponse."""
+    rng = random.Random(3)
+    points = [(rng.random(), rng.random()) for _ in range(100)]
+    t = Triangulator()
+    if decoded:
+        points = t.decode_pointset(t.encode_pointset(points))
+    triangles = t.triangulate(points)
+
+    expected = t.encode_triangles(points, triangles)
+    chunks = list(codec.iter_triangles(points, triangles, chunk_size=64))
+
+    assert b"".join(chunks) == expected
+    assert codec.triangles_size(len(points), len(triangles)) == len(expected)
+    # Aucun morceau ne dépasse la taille demandée
+    assert max(len(chunk) for chunk in chunks) <= 64
+
+def test_triangulate_stream_from_id(mocker):
+    """La version en flux annonce la taille exacte et produit le même binaire."""
+    points = [(0, 0), (1, 0), (0, 1), (1, 1)]
+    t = Triangulator()
+    mocker.patch.object(t, 'fetch_pointset', return_value=t.encode_pointset(points))
+
+    size, chunks = t.triangulate_stream_from_id("id", chunk_size=16)
+    data = b"".join(chunks)
+
+    assert size == len(data)
+    assert data == t.triangulate_from_id("id")
+
 ### Test de la méthode triangulate_from_id ###
 
 def test_triangulate_from_id_success(mocker):
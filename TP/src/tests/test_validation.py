@@ -0,0 +1,92 @@
+"""Tests de la pré-passe de validation (taille, NaN, doublons, alignement)."""
+
+import math
+import struct
+
+import pytest
+from src.triangulator import app as app_module
+from src.triangulator import codec, validation
+from src.triangulator.triangulator import Triangulator
+
+UUID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Exécute le test avec NumPy puis avec la boucle Python."""
+    if request.param == "numpy" and validation.np is None:
+        pytest.skip("NumPy n'est pas installé")
+    if request.param == "python":
+        monkeypatch.setattr(validation, "np", None)
+    return request.param
+
+@pytest.mark.parametrize("bad", [math.nan, math.inf, -math.inf])
+def test_coordonnees_non_finies(backend, bad):
+    """NaN ou infini → ValueError avant toute triangulation."""
+    with pytest.raises(ValueError, match="NaN ou infini"):
+        validation.check_finite([0.0, 1.0, bad], [0.0, 1.0, 0.0])
+    with pytest.raises(ValueError, match="NaN ou infini"):
+        Triangulator().triangulate([(0.0, 0.0), (1.0, 0.0), (0.0, bad)])
+
+def test_doublons_table_stable(backend):
+    """Premier point de chaque groupe, dans l'ordre d'entrée ; -0.0 == 0.0."""
+    xs = [1.0, 0.0, 1.0, -0.0, 2.0, 0.0]
+    ys = [1.0, 0.0, 1.0, 0.0, 2.0, 0.5]
+    assert validation.unique_indices(xs, ys) == [0, 1, 4, 5]
+    assert validation.unique_indices([0.0, 1.0], [0.0, 0.0]) is None
+
+def test_alignement_exact(backend):
+    """Alignement confirmé en exact ; un écart d'un ulp suffit à l'écarter."""
+    xs = [i * 0.1 for i in range(1000)]
+    ys = [i * 0.1 for i in range(1000)]
+    assert validation.all_collinear(xs, ys)
+    ys[500] = math.nextafter(ys[500], math.inf)
+    assert not validation.all_collinear(xs, ys)
+    assert not validation.all_collinear([0.0, 1.0, 0.0], [0.0, 0.0, 1.0])
+
+def test_points_confondus_ou_alignes(backend):
+    """Moins de 3 points distincts ou tous alignés → ValueError."""
+    with pytest.raises(ValueError, match="colinéaires"):
+        Triangulator().triangulate([(1.0, 2.0)] * 1000)
+    with pytest.raises(ValueError, match="colinéaires"):
+        Triangulator().triangulate([(i, 3 * i) for i in range(1000)])
+
+@pytest.mark.parametrize("engine", ["incremental", "divide_conquer"])
+def test_doublons_indices_d_origine(backend, engine):
+    """Triangulation des seuls points distincts, indices du PointSet d'origine."""
+    distinct = [(0, 0), (4, 0), (4, 4), (0, 4), (2, 1)]
+    points = [(4, 4), *distinct, (4, 0), (2, 1), (2, 1)]
+    t = Triangulator(engine=engine)
+
+    triangles = t.triangulate(points)
+
+    # (4, 4) est d'abord à l'indice 0 : ses doublons ne sont jamais utilisés
+    assert {i for triangle in triangles for i in triangle} == {0, 1, 2, 4, 5}
+    shapes = {frozenset(points[i] for i in triangle) for triangle in triangles}
+    assert shapes == {frozenset(distinct[i] for i in triangle)
+                      for triangle in t.triangulate(distinct)}
+    assert all(a < b and a < c for a, b, c in triangles)
+
+def test_taille_du_pointset():
+    """Le PointSet du PSM doit faire exactement 4 + 8N octets."""
+    binary = codec.encode_pointset([(0, 0), (1, 0), (0, 1)])
+    assert len(codec.decode_pointset(binary, exact=True)) == 3
+    for invalid in (binary + b"\x00", binary[:-1], struct.pack('<I', 2**31)):
+        with pytest.raises(ValueError):
+            codec.decode_pointset(invalid, exact=True)
+    # Sans `exact`, la partie sommets d'une structure Triangles reste lisible
+    assert len(codec.decode_pointset(binary + struct.pack('<I', 0))) == 3
+
+def test_endpoint_pointset_mal_forme(mocker, monkeypatch):
+    """Octets en trop dans la réponse du PSM → 500 sans triangulation."""
+    monkeypatch.setattr(app_module, "result_cache", None)
+    mocker.patch(
+        "src.triangulator.triangulator.Triangulator.fetch_pointset",
+        return_value=codec.encode_pointset([(0, 0), (1, 0), (0, 1)]) + b"\x00")
+    triangulate = mocker.spy(Triangulator, "triangulate")
+    with app_module.app.test_client() as client:
+        response = client.get(f"/triangulation/{UUID}")
+
+    assert response.status_code == 500
+    assert response.get_json()["code"] == "TRIANGULATION_FAILED"
+    triangulate.assert_not_called()
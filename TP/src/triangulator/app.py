@@ -1,20 +1,113 @@
 """Application Flask pour la triangulation de points."""
 
-import uuid
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from flask import Flask, Response, jsonify
+from flask import Flask, Response, g, jsonify, request
+from werkzeug.wsgi import wrap_file
 
-from .triangulator import Triangulator
+from . import codec, content_encoding, reorder
+from .cache import ResultCache
+from .executor import TriangulationExecutor
+from .metrics import (
+    CONTENT_TYPE,
+    REGISTRY,
+    Registry,
+    RequestMetrics,
+    cache_collector,
+    store_collector,
+)
+from .parallel import ParallelTriangulator
+from .profiling import RequestProfiler
+from .protocol import (
+    BAD_REQUEST,
+    NOT_FOUND_ROUTE,
+    error_payload,
+    invalid_batch,
+    invalid_bbox,
+    is_valid_uuid,
+    unknown_engine,
+    unknown_order,
+    unknown_transform,
+)
+from .psm_client import PSMClient
+from .region import RegionCache, parse_bbox
+from .singleflight import SingleFlight
+from .store import ResultStore
+from .triangulator import DEFAULT_ENGINE, ENGINES, Triangulator
 
 app = Flask(__name__)
 
-def is_valid_uuid(value: str) -> bool:
-    """Vérifie si une chaîne est un UUID valide."""
-    try:
-        uuid.UUID(value)
-        return True
-    except ValueError:
-        return False
+# Cache partagé par toutes les requêtes du worker (les PointSets sont immuables)
+result_cache = ResultCache.from_env()
+
+# Compteurs du cache exportés sur /metrics
+REGISTRY.add_collector("cache", cache_collector(result_cache))
+
+# Réponses conservées sur disque, partagées entre workers et redémarrages
+# (désactivé si non configuré)
+result_store = ResultStore.from_env()
+if result_store is not None:
+    REGISTRY.add_collector("store", store_collector(result_store))
+
+# Client du PSM partagé (pool de connexions keep-alive entre les requêtes)
+psm = PSMClient.from_env()
+
+# Pool de processus pour les gros PointSets (désactivé si non configuré)
+executor = TriangulationExecutor.from_env()
+
+# Très gros PointSets découpés en bandes sur plusieurs cœurs (si configuré)
+parallel = ParallelTriangulator.from_env()
+
+# Un seul calcul pour les requêtes simultanées sur le même PointSet
+# (désactivé si non configuré : les réponses restent produites en flux)
+flight = SingleFlight.from_env()
+
+# Formes compressées / transformées des réponses, pour ne pas recompresser
+# à chaque succès du cache
+encoded_cache = ResultCache(max_bytes=int(os.environ.get(
+    "TRIANGULATOR_ENCODED_CACHE_MAX_BYTES",
+    content_encoding.DEFAULT_CACHE_MAX_BYTES)))
+
+# Ordre des sommets et triangles des réponses, si `?order=` est absent
+# (voir reorder.py)
+DEFAULT_ORDER = reorder.order_from_env()
+
+# Index des sous-régions (?bbox=), un par triangulation récemment demandée
+regions = RegionCache.from_env()
+
+# Profilage d'une requête à la demande (désactivé si non configuré)
+profiler = RequestProfiler.from_env()
+
+# Pool de threads pour les lots : les appels au PSM se font en parallèle
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TRIANGULATOR_BATCH_WORKERS", 8))
+)
+BATCH_MAX_ITEMS = int(os.environ.get("TRIANGULATOR_BATCH_MAX_ITEMS", 1000))
+
+# En-tête de trame d'un lot : index, code HTTP, longueur de la charge utile
+BATCH_FRAME = struct.Struct('<III')
+
+@app.after_request
+def record_response(response):
+    """Compte la réponse, ajoute les en-têtes Server-Timing et Vary."""
+    if request.endpoint == "triangulate_endpoint":
+        response.headers["Vary"] = content_encoding.VARY
+    if REGISTRY.enabled:
+        REGISTRY.responses.inc(1, str(response.status_code))
+        metrics = g.get("metrics")
+        if metrics is not None and metrics.durations:
+            response.headers["Server-Timing"] = metrics.server_timing()
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Métriques du worker au format texte Prometheus."""
+    if not REGISTRY.enabled:
+        return jsonify(NOT_FOUND_ROUTE), 404
+    return Response(REGISTRY.render(), status=200, content_type=CONTENT_TYPE)
 
 # Création de la route http pour la triangulation
 @app.route("/triangulation/<pointset_id>", methods=["GET"])
@@ -22,37 +115,187 @@ def triangulate_endpoint(pointset_id):
     """Endpoint principal de triangulation."""
     # Vérification simple, pointset_id doit être un UUID valide
     if not is_valid_uuid(pointset_id):
-        return jsonify({
-            "code": "BAD_REQUEST", 
-            "message": "Invalid ID format"
-        }), 400
+        return jsonify(BAD_REQUEST), 400
+
+    # Moteur de triangulation optionnel (?engine=divide_conquer)
+    engine = request.args.get("engine", DEFAULT_ENGINE)
+    if engine not in ENGINES:
+        return jsonify(unknown_engine(engine)), 400
+
+    # Réordonnancement optionnel du maillage (?order=spatial)
+    order = request.args.get("order", DEFAULT_ORDER)
+    if order not in reorder.ORDERS:
+        return jsonify(unknown_order(order)), 400
 
-    t = Triangulator()
+    # Sous-région optionnelle (?bbox=minx,miny,maxx,maxy)
+    bbox = request.args.get("bbox")
+    if bbox is not None:
+        try:
+            bbox = parse_bbox(bbox)
+        except ValueError:
+            return jsonify(invalid_bbox(bbox)), 400
+
+    # Compression négociée et transformation optionnelle avant compression
+    encoding = content_encoding.negotiate(request.headers.get("Accept-Encoding"))
+    transform = request.headers.get("X-Triangles-Transform")
+    if transform is not None and transform not in content_encoding.TRANSFORMS:
+        return jsonify(unknown_transform(transform)), 400
+
+    # Profilage demandé par un administrateur (jeton) ou tiré au sort
+    token = request.headers.get("X-Profile-Token") or request.args.get("profile")
+    profiled = profiler is not None and profiler.wants(token)
+
+    g.metrics = REGISTRY.request_metrics()
+    if profiled and g.metrics is None:
+        # Les durées des étapes accompagnent le profil, même sans /metrics
+        g.metrics = RequestMetrics(Registry(enabled=False))
+    t = Triangulator(cache=result_cache, client=psm, executor=executor,
+                     flight=flight, engine=engine, parallel=parallel,
+                     metrics=g.metrics, store=result_store, order=order)
     try:
-        result = t.triangulate_from_id(pointset_id)
+        if bbox is not None:
+            # Triangles de la fenêtre seulement, sommets renumérotés
+            with t.stage("region"):
+                result = regions.extract(
+                    t.cache_key(pointset_id), bbox,
+                    lambda: t.triangulate_from_id(pointset_id))
+            with t.stage("compress"):
+                result = content_encoding.encode(result, encoding, transform)
+            headers = content_encoding.response_headers(encoding, transform)
+            headers["Content-Length"] = str(len(result))
+            return Response(result, status=200,
+                            mimetype='application/octet-stream',
+                            headers=headers)
+
+        if profiled:
+            result, name = profiler.run(
+                pointset_id, engine, g.metrics,
+                lambda: t.triangulate_from_id(pointset_id))
+            headers = {"Content-Length": str(len(result))}
+            # Nom du fichier : pour l'administrateur seulement (sinon journal)
+            if name is not None and profiler.authorized(token):
+                headers["X-Profile"] = name
+            return Response(bytes(result), status=200,
+                            mimetype='application/octet-stream',
+                            headers=headers)
+
+        if encoding is not None or transform is not None:
+            return encoded_response(t, pointset_id, encoding, transform)
+
+        # La réponse part en flux : taille exacte connue d'avance (N et T)
+        length, chunks = t.triangulate_stream_from_id(pointset_id)
+        if hasattr(chunks, "fileno"):
+            # Résultat lu sur disque : le serveur WSGI envoie le fichier
+            # lui-même (sendfile s'il le permet)
+            return Response(
+                wrap_file(request.environ, chunks),
+                status=200,
+                mimetype='application/octet-stream',
+                headers={"Content-Length": str(length)},
+                direct_passthrough=True
+            )
         return Response(
-            result,
+            chunks,
             status=200,
-            mimetype='application/octet-stream'
+            mimetype='application/octet-stream',
+            headers={"Content-Length": str(length)}
         )
 
-    except FileNotFoundError:
-        return jsonify({
-            "code": "NOT_FOUND",
-            "message": "PointSet not found"
-        }), 404
+    except Exception as e:
+        status, payload = error_payload(e)
+        return jsonify(payload), status
+
+def encoded_response(t, pointset_id: str, encoding, transform):
+    """Réponse compressée et/ou transformée, gardée en cache si possible."""
+    headers = content_encoding.response_headers(encoding, transform)
+    key = f"{t.cache_key(pointset_id)};{encoding};{transform}"
+    body = encoded_cache.get(key)
+    if body is None:
+        if transform is None:
+            length, chunks = t.triangulate_stream_from_id(pointset_id)
+            if hasattr(chunks, "read"):
+                chunks = codec.iter_file(chunks)
+            if length > encoded_cache.max_bytes:
+                # Trop gros pour être gardé : compressé au fil de l'envoi
+                # (taille inconnue d'avance, donc sans Content-Length)
+                return Response(
+                    content_encoding.iter_compressed(chunks, encoding),
+                    status=200,
+                    mimetype='application/octet-stream',
+                    headers=headers
+                )
+            binary = b"".join(chunks)
+        else:
+            # La transformation porte sur la structure complète
+            binary = t.triangulate_from_id(pointset_id)
+        with t.stage("compress"):
+            body = content_encoding.encode(binary, encoding, transform)
+        encoded_cache.put(key, key, body)
+    headers["Content-Length"] = str(len(body))
+    return Response(body, status=200, mimetype='application/octet-stream',
+                    headers=headers)
 
-    except ValueError as e:
-        return jsonify({
-            "code": "TRIANGULATION_FAILED",
-            "message": str(e)
-        }), 500
+def triangulate_item(pointset_id: str, engine: str = DEFAULT_ENGINE,
+                     order: str = DEFAULT_ORDER):
+    """Triangule un élément d'un lot → (code HTTP, charge utile binaire)."""
+    if not is_valid_uuid(pointset_id):
+        return 400, json.dumps(BAD_REQUEST).encode()
 
+    t = Triangulator(cache=result_cache, client=psm, executor=executor,
+                     flight=flight, engine=engine, parallel=parallel,
+                     metrics=REGISTRY.request_metrics(), store=result_store,
+                     order=order)
+    try:
+        # Un résultat lu sur disque est projeté en mémoire : copié ici dans
+        # la trame (sans effet pour un bytes)
+        return 200, bytes(t.triangulate_from_id(pointset_id))
     except Exception as e:
-        return jsonify({
-            "code": "SERVICE_UNAVAILABLE",
-            "message": f"Unexpected error: {e}"
-        }), 503
+        status, payload = error_payload(e)
+        return status, json.dumps(payload).encode()
+
+def iter_batch(pointset_ids, engine: str = DEFAULT_ENGINE,
+               order: str = DEFAULT_ORDER):
+    """Produit les trames du lot au fur et à mesure que les calculs finissent.
+
+    Chaque trame : index dans la requête, code HTTP et longueur (3 unsigned
+    long little-endian), puis la charge utile (Triangles ou erreur JSON).
+    """
+    futures = {
+        batch_executor.submit(triangulate_item, pointset_id, engine,
+                              order): index
+        for index, pointset_id in enumerate(pointset_ids)
+    }
+    try:
+        for future in as_completed(futures):
+            status, payload = future.result()
+            yield BATCH_FRAME.pack(futures[future], status, len(payload))
+            yield payload
+    finally:
+        # Client parti en cours de route : on abandonne ce qui n'a pas démarré
+        for future in futures:
+            future.cancel()
+
+@app.route("/triangulation/batch", methods=["POST"])
+def triangulate_batch_endpoint():
+    """Triangule plusieurs PointSets en un seul appel (réponse en flux)."""
+    pointset_ids = request.get_json(silent=True)
+    if (not isinstance(pointset_ids, list)
+            or not all(isinstance(i, str) for i in pointset_ids)
+            or len(pointset_ids) > BATCH_MAX_ITEMS):
+        return jsonify(invalid_batch(BATCH_MAX_ITEMS)), 400
+
+    engine = request.args.get("engine", DEFAULT_ENGINE)
+    if engine not in ENGINES:
+        return jsonify(unknown_engine(engine)), 400
+    order = request.args.get("order", DEFAULT_ORDER)
+    if order not in reorder.ORDERS:
+        return jsonify(unknown_order(order)), 400
+
+    return Response(
+        iter_batch(pointset_ids, engine, order),
+        status=200,
+        mimetype='application/octet-stream'
+    )
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""Point d'entrée ASGI (asyncio) du service de triangulation.
+
+Même contrat que l'application Flask (`GET /triangulation/{pointSetId}`,
+mêmes codes et corps d'erreur), mais l'attente du PSM ne bloque aucun
+thread : elle passe par le client asyncio. Seul le calcul (CPU) est confié
+à un pool de threads, et les gros PointSets au pool de processus s'il est
+configuré. Les requêtes simultanées sur le même PointSet partagent un seul
+chargement (PSM et calcul), dans le processus.
+
+Lancement, avec n'importe quel serveur ASGI :
+    uvicorn src.triangulator.asgi:app
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from . import codec, content_encoding, reorder
+from .cache import ResultCache, content_key
+from .executor import TriangulationExecutor
+from .metrics import CONTENT_TYPE, REGISTRY, cache_collector, store_collector
+from .parallel import ParallelTriangulator
+from .protocol import (
+    BAD_REQUEST,
+    NOT_FOUND_ROUTE,
+    error_payload,
+    invalid_bbox,
+    is_valid_uuid,
+    unknown_engine,
+    unknown_order,
+    unknown_transform,
+)
+from .psm_client import AsyncPSMClient
+from .region import RegionCache, parse_bbox
+from .store import ResultStore
+from .triangulator import DEFAULT_ENGINE, ENGINES, Triangulator
+
+ROUTE_PREFIX = "/triangulation/"
+METRICS_ROUTE = "/metrics"
+
+result_cache = ResultCache.from_env()
+psm = AsyncPSMClient.from_env()
+executor = TriangulationExecutor.from_env()
+parallel = ParallelTriangulator.from_env()
+regions = RegionCache.from_env()
+encoded_cache = ResultCache(max_bytes=int(os.environ.get(
+    "TRIANGULATOR_ENCODED_CACHE_MAX_BYTES",
+    content_encoding.DEFAULT_CACHE_MAX_BYTES)))
+DEFAULT_ORDER = reorder.order_from_env()
+REGISTRY.add_collector("cache", cache_collector(result_cache))
+result_store = ResultStore.from_env()
+if result_store is not None:
+    REGISTRY.add_collector("store", store_collector(result_store))
+
+# Threads réservés au calcul : la boucle asyncio n'est jamais bloquée
+compute_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TRIANGULATOR_COMPUTE_THREADS",
+                                   os.cpu_count() or 1))
+)
+
+
+def _compute(binary, engine: str, metrics=None,
+             order: str = reorder.DEFAULT_ORDER) -> bytes:
+    """Décode, triangule et encode un PointSet (exécuté hors de la boucle)."""
+    t = Triangulator(executor=executor, engine=engine, parallel=parallel,
+                     metrics=metrics, order=order)
+    points, triangles = t.triangulate_pointset(binary)
+    with t.stage("encode"):
+        return t.encode_triangles(points, triangles)
+
+
+# Chargements en cours (stockage, PSM, calcul), par clé de cache
+_inflight = {}
+
+
+async def _coalesce(key: str, factory):
+    """Renvoie le résultat de factory(), ou celui du chargement en cours pour `key`."""
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(factory())
+
+        def forget(done, key=key):
+            if _inflight.get(key) is done:
+                del _inflight[key]
+        task.add_done_callback(forget)
+    # Une requête annulée (client parti) n'annule pas le calcul partagé
+    return await asyncio.shield(task)
+
+
+async def _load(t: Triangulator, pointset_id: str, engine: str, metrics,
+                order: str) -> bytes:
+    """Stockage sur disque, sinon PSM et calcul → triangulation encodée."""
+    key = t.cache_key
+    loop = asyncio.get_running_loop()
+    result = None
+    # Stockage sur disque : accès fichier hors de la boucle
+    if result_store is not None:
+        with t.stage("store"):
+            result = await loop.run_in_executor(
+                compute_pool, result_store.get, key(pointset_id))
+    if result is not None:
+        return result
+
+    with t.stage("fetch"):
+        binary = await psm.get_pointset(pointset_id)
+    with t.stage("cache"):
+        digest = key(await loop.run_in_executor(
+            compute_pool, content_key, binary))
+        result = result_cache.get_by_content(key(pointset_id), digest)
+    if result is None and result_store is not None:
+        with t.stage("store"):
+            result = await loop.run_in_executor(
+                compute_pool, result_store.get_by_content,
+                key(pointset_id), digest)
+    if result is None:
+        result = await loop.run_in_executor(compute_pool, _compute,
+                                            binary, engine, metrics, order)
+        result_cache.put(key(pointset_id), digest, result)
+        if result_store is not None:
+            with t.stage("store"):
+                await loop.run_in_executor(
+                    compute_pool, result_store.put, key(pointset_id),
+                    digest, result)
+    return result
+
+
+async def triangulate(pointset_id: str, engine: str = DEFAULT_ENGINE,
+                      metrics=None, bbox: str = None,
+                      order: str = DEFAULT_ORDER):
+    """Pipeline asynchrone → (code HTTP, type de contenu, corps)."""
+    if not is_valid_uuid(pointset_id):
+        return 400, "application/json", json.dumps(BAD_REQUEST).encode()
+    if engine not in ENGINES:
+        return 400, "application/json", json.dumps(unknown_engine(engine)).encode()
+    if order not in reorder.ORDERS:
+        return 400, "application/json", json.dumps(unknown_order(order)).encode()
+    box = None
+    if bbox is not None:
+        try:
+            box = parse_bbox(bbox)
+        except ValueError:
+            return 400, "application/json", json.dumps(invalid_bbox(bbox)).encode()
+
+    # Clés de cache propres au moteur et à l'ordre (voir Triangulator.cache_key)
+    t = Triangulator(engine=engine, metrics=metrics, order=order)
+    key = t.cache_key
+    loop = asyncio.get_running_loop()
+    try:
+        with t.stage("cache"):
+            result = result_cache.get(key(pointset_id))
+        if result is None:
+            # Requêtes simultanées sur le même PointSet : un seul calcul
+            result = await _coalesce(
+                key(pointset_id),
+                lambda: _load(t, pointset_id, engine, metrics, order))
+        if box is not None:
+            with t.stage("region"):
+                result = await loop.run_in_executor(
+                    compute_pool, regions.extract, key(pointset_id), box,
+                    lambda result=result: result)
+    except Exception as e:
+        status, payload = error_payload(e)
+        return status, "application/json", json.dumps(payload).encode()
+
+    return 200, "application/octet-stream", result
+
+
+async def _encode(pointset_id: str, engine: str, bbox, body, encoding,
+                  transform, metrics=None, order: str = DEFAULT_ORDER):
+    """Compresse / transforme une réponse (forme encodée gardée en cache)."""
+    t = Triangulator(engine=engine, metrics=metrics, order=order)
+    # Les sous-régions varient trop pour être gardées
+    key = None
+    if bbox is None:
+        key = f"{t.cache_key(pointset_id)};{encoding};{transform}"
+        cached = encoded_cache.get(key)
+        if cached is not None:
+            return cached
+    loop = asyncio.get_running_loop()
+    with t.stage("compress"):
+        body = await loop.run_in_executor(compute_pool, content_encoding.encode,
+                                          body, encoding, transform)
+    if key is not None:
+        encoded_cache.put(key, key, body)
+    return body
+
+
+async def _send(send, status: int, content_type: str, body, headers=()):
+    """Envoie une réponse complète, le corps découpé en morceaux."""
+    if REGISTRY.enabled:
+        REGISTRY.responses.inc(1, str(status))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    for chunk in codec.iter_chunks(body):
+        await send({"type": "http.response.body", "body": chunk,
+                    "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _lifespan(receive, send):
+    """Gère le démarrage et l'arrêt du serveur ASGI."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await psm.close()
+            for pool in (executor, parallel):
+                if pool is not None:
+                    pool.shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """Application ASGI."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+
+    path = scope["path"]
+    if path == METRICS_ROUTE and scope["method"] == "GET" and REGISTRY.enabled:
+        await _send(send, 200, CONTENT_TYPE, REGISTRY.render().encode())
+        return
+
+    pointset_id = path[len(ROUTE_PREFIX):]
+    if not path.startswith(ROUTE_PREFIX) or not pointset_id or "/" in pointset_id:
+        body = json.dumps(NOT_FOUND_ROUTE)
+        await _send(send, 404, "application/json", body.encode())
+        return
+
+    if scope["method"] != "GET":
+        body = json.dumps({"code": "METHOD_NOT_ALLOWED",
+                           "message": "Only GET is supported"})
+        await _send(send, 405, "application/json", body.encode())
+        return
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    engine = query.get("engine", [DEFAULT_ENGINE])[0]
+    bbox = query.get("bbox", [None])[0]
+    order = query.get("order", [DEFAULT_ORDER])[0]
+
+    # Compression négociée et transformation optionnelle avant compression
+    request_headers = dict(scope.get("headers", ()))
+    encoding = content_encoding.negotiate(
+        request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+    transform = request_headers.get(b"x-triangles-transform")
+    if transform is not None:
+        transform = transform.decode("latin-1")
+        if transform not in content_encoding.TRANSFORMS:
+            body = json.dumps(unknown_transform(transform))
+            await _send(send, 400, "application/json", body.encode())
+            return
+
+    metrics = REGISTRY.request_metrics()
+    status, content_type, body = await triangulate(pointset_id, engine, metrics,
+                                                   bbox, order)
+    headers = [(b"vary", content_encoding.VARY.encode())]
+    if status == 200 and (encoding is not None or transform is not None):
+        body = await _encode(pointset_id, engine, bbox, body, encoding,
+                             transform, metrics, order)
+        headers.extend((name.lower().encode(), value.encode()) for name, value
+                       in content_encoding.response_headers(encoding,
+                                                            transform).items())
+    if metrics is not None and metrics.durations:
+        headers.append((b"server-timing", metrics.server_timing().encode()))
+    await _send(send, status, content_type, body, headers)
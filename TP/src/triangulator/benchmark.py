@@ -0,0 +1,379 @@
+"""Banc de mesure du pipeline, avec suivi des régressions.
+
+Pour chaque distribution de points et chaque taille, on mesure plusieurs
+fois chaque étape :
+
+- decode      : `decode_pointset` sur le binaire,
+- triangulate : `Triangulator.triangulate` (par moteur),
+- encode      : `encode_triangles`,
+- pipeline    : `triangulate_from_id` complet, le PointSet étant servi par
+  un PSM de substitution local (vrai client HTTP, sans cache),
+- reorder     : réordonnancement spatial du maillage (`reorder.spatial`),
+- traverse    : parcours du maillage par un client (aire associée à chaque
+  sommet, lue dans la réponse Triangles), dans l'ordre d'origine ("none")
+  et dans l'ordre spatial.
+
+Les mesures sont enregistrées en JSON. Comparées à une référence (baseline),
+une étape est en régression si elle est plus lente d'au moins `threshold`
+(médianes) ET que le test de Mann-Whitney (unilatéral) est significatif au
+seuil `alpha` : le bruit d'une machine chargée ne suffit pas à échouer.
+
+Utilisation :
+    python -m src.triangulator.benchmark --baseline benchmarks/baseline.json
+    python -m src.triangulator.benchmark --baseline ... --save-baseline
+    python -m src.triangulator.benchmark --layout --sizes 100000
+
+`--layout` affiche aussi, pour chaque ordre, les défauts de cache de
+sommets par triangle (ACMR) et la taille de la réponse compressée.
+
+Les tailles vont de 10² à 10⁶ points, bornées par TRIANGULATOR_BENCH_MAX_N
+(10 000 par défaut : 10⁶ points demandent plusieurs minutes par mesure).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+
+from . import codec, content_encoding, reorder
+from .psm_client import PSMClient
+from .psm_stub import StubPSM
+from .triangulator import DEFAULT_ENGINE, ENGINES, Triangulator
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    np = None
+
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+STAGES = ("decode", "triangulate", "encode", "pipeline", "reorder", "traverse")
+DEFAULT_MAX_N = 10_000
+DEFAULT_REPEAT = 5
+
+# Critères de régression : seuil du test et ralentissement minimal (deux
+# lancements sur la même machine varient souvent de 10 à 20 %)
+DEFAULT_ALPHA = 0.01
+DEFAULT_THRESHOLD = 0.25
+
+# Au-delà, la loi exacte de U coûte trop cher : approximation normale
+EXACT_MAX_PRODUCT = 400
+
+
+# Distributions de points
+
+def uniform(n: int, rng):
+    """Points uniformes dans un carré."""
+    return [(rng.random() * 1000, rng.random() * 1000) for _ in range(n)]
+
+
+def clustered(n: int, rng):
+    """Amas gaussiens (environ 1000 points par amas)."""
+    centers = [(rng.random() * 1000, rng.random() * 1000)
+               for _ in range(max(1, n // 1000))]
+    points = []
+    for _ in range(n):
+        cx, cy = rng.choice(centers)
+        points.append((rng.gauss(cx, 5.0), rng.gauss(cy, 5.0)))
+    return points
+
+
+def grid(n: int, rng):
+    """Grille régulière : quadruplets cocycliques partout."""
+    side = math.isqrt(n - 1) + 1
+    return [(i % side, i // side) for i in range(n)]
+
+
+def collinear(n: int, rng):
+    """90 % des points sur trois droites, le reste uniforme."""
+    points = []
+    for k in range(n):
+        t = rng.random() * 1000
+        if k % 10 < 9:
+            points.append(((t, 0.0), (0.0, t), (t, t))[k % 3])
+        else:
+            points.append((t, rng.random() * 1000))
+    return points
+
+
+def modulo(n: int, rng):
+    """Motif historique des tests de performance : (i, i % 50)."""
+    return [(i, i % 50) for i in range(n)]
+
+
+DISTRIBUTIONS = {
+    "uniform": uniform,
+    "clustered": clustered,
+    "grid": grid,
+    "collinear": collinear,
+    "modulo": modulo,
+}
+
+
+# Statistiques
+
+def _exact_upper_tail(u: float, n1: int, n2: int) -> float:
+    """Renvoie P(U >= u) sous H0, par dénombrement exact (sans ex aequo)."""
+    # table[(i, j)][v] : nombre d'arrangements de i valeurs courantes et
+    # j valeurs de référence donnant U = v
+    table = {(0, j): [1] for j in range(n2 + 1)}
+    for i in range(1, n1 + 1):
+        table[(i, 0)] = [1]
+        for j in range(1, n2 + 1):
+            # f(i, j, v) = f(i - 1, j, v - j) + f(i, j - 1, v)
+            left, down = table[(i - 1, j)], table[(i, j - 1)]
+            row = [0] * (i * j + 1)
+            for v, count in enumerate(left):
+                row[v + j] += count
+            for v, count in enumerate(down):
+                row[v] += count
+            table[(i, j)] = row
+    row = table[(n1, n2)]
+    total = math.comb(n1 + n2, n1)
+    start = math.ceil(u)
+    return sum(row[start:]) / total
+
+
+def mann_whitney_greater(current, baseline) -> float:
+    """Renvoie la p-valeur du test "current plus grand que baseline"."""
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0
+            for c in current for b in baseline)
+    ties = len(set(current) | set(baseline)) < n1 + n2
+    if not ties and n1 * n2 <= EXACT_MAX_PRODUCT:
+        return _exact_upper_tail(u, n1, n2)
+
+    # Approximation normale, avec correction de continuité et des ex aequo
+    values = sorted(current + baseline)
+    n = n1 + n2
+    tie_term = 0
+    position = 0
+    while position < n:
+        end = position
+        while end + 1 < n and values[end + 1] == values[position]:
+            end += 1
+        size = end - position + 1
+        tie_term += size ** 3 - size
+        position = end + 1
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+# Mesures
+
+def vertex_areas(binary):
+    """Renvoie l'aire (signée, au tiers) accumulée sur chaque sommet.
+
+    Parcours typique d'un client : chaque triangle lit ses trois sommets
+    et écrit dans trois cases ; sa vitesse dépend de la localité.
+    """
+    n = codec.HEADER.unpack_from(binary)[0]
+    position = codec.HEADER.size + n * codec.POINT.size + codec.HEADER.size
+    if np is not None:
+        coords = np.frombuffer(binary, dtype='<f4', count=2 * n,
+                               offset=codec.HEADER.size).reshape(-1, 2)
+        indices = np.frombuffer(binary, dtype='<u4',
+                                offset=position).reshape(-1, 3)
+        a, b, c = (coords[indices[:, k]] for k in range(3))
+        area = ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1])
+                - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 6
+        return np.bincount(indices.ravel(), np.repeat(area, 3), n).tolist()
+
+    points = codec.decode_pointset(binary)
+    areas = [0.0] * n
+    for i, j, k in codec.TRIANGLE.iter_unpack(memoryview(binary)[position:]):
+        (xa, ya), (xb, yb), (xc, yc) = points[i], points[j], points[k]
+        area = ((xb - xa) * (yc - ya) - (yb - ya) * (xc - xa)) / 6
+        areas[i] += area
+        areas[j] += area
+        areas[k] += area
+    return areas
+
+
+def layout(points, triangles, encoding: str = "gzip"):
+    """Compare les ordres du maillage → {ordre: ACMR et tailles (octets)}."""
+    rows = {}
+    for order in reorder.ORDERS:
+        ordered_points, ordered = reorder.apply(order, points, triangles)
+        binary = codec.encode_triangles(ordered_points, ordered)
+        rows[order] = {
+            "acmr": round(reorder.cache_miss_ratio(ordered), 3),
+            "bytes": len(binary),
+            encoding: len(content_encoding.encode(binary, encoding, None)),
+            f"{encoding}+delta-shuffle": len(content_encoding.encode(
+                binary, encoding, "delta-shuffle")),
+        }
+    return rows
+
+
+def _measure(function, repeat: int):
+    """Renvoie les durées (s) de `repeat` appels, après un appel à vide."""
+    function()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(sizes, distributions=tuple(DISTRIBUTIONS), stages=STAGES,
+        engines=(DEFAULT_ENGINE,), repeat: int = DEFAULT_REPEAT, log=None):
+    """Mesure toutes les combinaisons → {clé: durées}.
+
+    Clés : "étape/distribution/taille", et "étape/moteur/distribution/taille"
+    pour les étapes qui dépendent du moteur.
+    """
+    results = {}
+    with StubPSM() as psm:
+        client = PSMClient(psm.base_url)
+        try:
+            for name in distributions:
+                for n in sizes:
+                    points = DISTRIBUTIONS[name](n, random.Random(n))
+                    binary = codec.encode_pointset(points)
+                    # Identifiant stable d'un lancement à l'autre (UUID, comme le PSM)
+                    pointset_id = str(uuid.uuid5(uuid.NAMESPACE_URL,
+                                                 f"{name}-{n}"))
+                    psm.add(pointset_id, binary)
+                    decoded = codec.decode_pointset(binary)
+                    triangles = Triangulator().triangulate(decoded)
+
+                    measures = {
+                        "decode": lambda b=binary: codec.decode_pointset(b),
+                        "encode": lambda p=decoded, t=triangles:
+                            codec.encode_triangles(p, t),
+                        "reorder": lambda p=decoded, t=triangles:
+                            reorder.spatial(p, t),
+                    }
+                    for order in reorder.ORDERS:
+                        mesh = codec.encode_triangles(
+                            *reorder.apply(order, decoded, triangles))
+                        measures[f"traverse/{order}"] = \
+                            lambda m=mesh: vertex_areas(m)
+                    for engine in engines:
+                        t = Triangulator(engine=engine, client=client)
+                        measures[f"triangulate/{engine}"] = \
+                            lambda t=t, p=decoded: t.triangulate(p)
+                        measures[f"pipeline/{engine}"] = \
+                            lambda t=t, i=pointset_id: t.triangulate_from_id(i)
+
+                    for label, function in measures.items():
+                        if label.split("/")[0] not in stages:
+                            continue
+                        key = f"{label}/{name}/{n}"
+                        results[key] = _measure(function, repeat)
+                        if log is not None:
+                            log(f"{key}: {statistics.median(results[key]):.6f} s")
+        finally:
+            client.close()
+    return results
+
+
+def compare(baseline, current, alpha: float = DEFAULT_ALPHA,
+            threshold: float = DEFAULT_THRESHOLD):
+    """Compare deux séries de mesures → une ligne par clé commune."""
+    rows = []
+    for key in sorted(current):
+        if key not in baseline:
+            continue
+        before, after = baseline[key], current[key]
+        ratio = statistics.median(after) / statistics.median(before)
+        p_value = mann_whitney_greater(after, before)
+        rows.append({
+            "key": key,
+            "baseline": statistics.median(before),
+            "current": statistics.median(after),
+            "ratio": ratio,
+            "p_value": p_value,
+            "regression": ratio > 1 + threshold and p_value < alpha,
+        })
+    return rows
+
+
+def load(path: str):
+    """Lit un fichier de mesures → {clé: durées}."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def save(path: str, results):
+    """Écrit les mesures, avec la description de la machine."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=1, sort_keys=True)
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande ; renvoie 1 en cas de régression."""
+    max_n = int(os.environ.get("TRIANGULATOR_BENCH_MAX_N", DEFAULT_MAX_N))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[n for n in SIZES if n <= max_n])
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS,
+                        default=list(DISTRIBUTIONS))
+    parser.add_argument("--stages", nargs="+", choices=STAGES,
+                        default=list(STAGES))
+    parser.add_argument("--engines", nargs="+", choices=ENGINES,
+                        default=[DEFAULT_ENGINE])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--baseline", help="fichier JSON de référence")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="enregistre les mesures comme nouvelle référence")
+    parser.add_argument("--output", help="fichier JSON des mesures")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--layout", action="store_true",
+                        help="affiche ACMR et tailles compressées par ordre")
+    args = parser.parse_args(argv)
+
+    if args.layout:
+        for name in args.distributions:
+            for n in args.sizes:
+                points = DISTRIBUTIONS[name](n, random.Random(n))
+                rows = layout(points, Triangulator().triangulate(points))
+                for order, row in rows.items():
+                    print(f"layout/{order}/{name}/{n}: {json.dumps(row)}")
+
+    results = run(args.sizes, args.distributions, args.stages, args.engines,
+                  args.repeat, log=print)
+    if args.output:
+        save(args.output, results)
+
+    if args.baseline is None:
+        return 0
+    if args.save_baseline or not os.path.exists(args.baseline):
+        save(args.baseline, results)
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    rows = compare(load(args.baseline), results, args.alpha, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['key']:<45} {row['baseline']:.6f} -> {row['current']:.6f}"
+              f"  x{row['ratio']:.2f}  p={row['p_value']:.4f}  {flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Cache en mémoire des réponses Triangles.
+
+Les PointSets du PointSetManager sont immuables une fois créés : la
+triangulation d'un même PointSetID ne change jamais. On garde donc les
+réponses déjà calculées dans un cache LRU borné en octets :
+
+- clé principale : le PointSetID (aucun appel au PSM en cas de succès),
+- clé secondaire : une empreinte du binaire récupéré, pour réutiliser le
+  résultat quand le même contenu arrive sous un autre identifiant.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Valeurs par défaut, surchargeables par variables d'environnement
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 0  # 0 = pas d'expiration
+
+
+def content_key(binary) -> str:
+    """Renvoie l'empreinte d'un PointSet binaire."""
+    return hashlib.blake2b(binary, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Cache LRU des réponses, borné en octets, avec durée de vie optionnelle."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL,
+                 clock=time.monotonic):
+        """Crée un cache de `max_bytes` octets ; `ttl` en secondes (0 = infini)."""
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # empreinte -> (résultat, date d'expiration), dans l'ordre LRU
+        self._entries = OrderedDict()
+        # PointSetID -> empreinte, et empreinte -> PointSetIDs associés
+        self._ids = {}
+        self._aliases = {}
+        self.size = 0
+
+        # Compteurs exposés
+        self.hits = 0
+        self.content_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """Crée un cache configuré par TRIANGULATOR_CACHE_MAX_BYTES / _TTL."""
+        return cls(
+            max_bytes=int(os.environ.get("TRIANGULATOR_CACHE_MAX_BYTES",
+                                         DEFAULT_MAX_BYTES)),
+            ttl=float(os.environ.get("TRIANGULATOR_CACHE_TTL", DEFAULT_TTL)),
+        )
+
+    def _lookup(self, digest):
+        """Renvoie le résultat de l'empreinte (None si absent ou expiré)."""
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        result, expires = entry
+        if expires is not None and self._clock() >= expires:
+            self._remove(digest)
+            return None
+        self._entries.move_to_end(digest)
+        return result
+
+    def _remove(self, digest):
+        """Retire une entrée et les identifiants qui pointent dessus."""
+        result, _ = self._entries.pop(digest)
+        self.size -= len(result)
+        for pointset_id in self._aliases.pop(digest, ()):
+            del self._ids[pointset_id]
+
+    def _alias(self, pointset_id, digest):
+        """Associe un PointSetID à une empreinte."""
+        previous = self._ids.get(pointset_id)
+        if previous is not None and previous != digest:
+            self._aliases[previous].discard(pointset_id)
+        self._ids[pointset_id] = digest
+        self._aliases.setdefault(digest, set()).add(pointset_id)
+
+    def get(self, pointset_id: str):
+        """Cherche le résultat d'un PointSetID (None si absent)."""
+        with self._lock:
+            digest = self._ids.get(pointset_id)
+            result = self._lookup(digest) if digest is not None else None
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def get_by_content(self, pointset_id: str, digest: str):
+        """Cherche un résultat par empreinte et l'associe au PointSetID."""
+        with self._lock:
+            result = self._lookup(digest)
+            if result is not None:
+                self.content_hits += 1
+                self._alias(pointset_id, digest)
+            return result
+
+    def put(self, pointset_id: str, digest: str, result):
+        """Enregistre un résultat, en évinçant les plus anciens si besoin."""
+        size = len(result)
+        # Un résultat plus gros que tout le cache n'est pas conservé
+        if size > self.max_bytes:
+            return
+        expires = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[digest] = (result, expires)
+            self._alias(pointset_id, digest)
+            self.size += size
+
+            # Éviction LRU jusqu'à repasser sous la limite
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Renvoie les compteurs du cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "content_hits": self.content_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+            }
@@ -0,0 +1,246 @@
+"""Codecs binaires des structures PointSet et Triangles.
+
+Formats (little-endian) :
+- PointSet  : N (unsigned long, 4 octets) puis N couples (float X, float Y)
+- Triangles : un PointSet, puis T (unsigned long) et T triplets d'indices
+  (3 unsigned long, 12 octets par triangle)
+
+Le décodage d'un PointSet renvoie une `PointSet` : une vue sans copie sur le
+binaire d'origine, ce qui permet aussi de recopier tel quel la partie
+sommets dans la réponse Triangles.
+
+Si NumPy est installé, l'encodage passe par des dtypes structurés et
+`np.frombuffer` / `tobytes` (aucune boucle Python par point). Sinon on se
+rabat sur `struct` : un seul `struct.pack` avec un format calculé pour
+encoder, `struct.iter_unpack` pour décoder.
+"""
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    np = None
+
+# Header : N ou T sur 4 octets (unsigned long)
+HEADER = struct.Struct('<I')
+# Un point : X et Y en float 32 bits
+POINT = struct.Struct('<ff')
+# Un triangle : 3 indices unsigned long
+TRIANGLE = struct.Struct('<III')
+
+# Taille des morceaux produits par l'encodage en flux
+CHUNK_SIZE = 64 * 1024
+
+if np is not None:
+    TRIANGLE_DTYPE = np.dtype([('a', '<u4'), ('b', '<u4'), ('c', '<u4')])
+
+
+def _as_array(rows, dtype: str, width: int):
+    """Convertit des lignes (tuples) en tableau NumPy plat du dtype donné."""
+    if isinstance(rows, np.ndarray):
+        return np.ascontiguousarray(rows, dtype=dtype).reshape(-1)
+    # fromiter sur un itérateur aplati évite de créer un tableau d'objets
+    return np.fromiter(chain.from_iterable(rows), dtype=dtype,
+                       count=width * len(rows))
+
+
+def _read_count(binary, position: int = 0) -> int:
+    """Lit un header (N ou T) à la position donnée."""
+    if len(binary) < position + HEADER.size:
+        raise ValueError("Données binaires invalides ou incomplètes")
+    return HEADER.unpack_from(binary, position)[0]
+
+
+def encode_coords(points) -> bytes:
+    """Encode les coordonnées (sans header) : 8 octets par point."""
+    if np is not None:
+        return _as_array(points, '<f4', 2).tobytes()
+
+    # Un seul pack avec un format calculé : 2N floats
+    flat = [float(c) for point in points for c in point]
+    return struct.pack(f'<{len(flat)}f', *flat)
+
+
+def encode_indices(triangles) -> bytes:
+    """Encode les triplets d'indices (sans header) : 12 octets par triangle."""
+    if np is not None:
+        return _as_array(triangles, '<u4', 3).tobytes()
+
+    flat = [i for triangle in triangles for i in triangle]
+    return struct.pack(f'<{len(flat)}I', *flat)
+
+
+def encode_pointset(points) -> bytes:
+    """Encode une liste de points (x, y) au format PointSet."""
+    return HEADER.pack(len(points)) + encode_coords(points)
+
+
+class PointSet(Sequence):
+    """Vue en lecture seule sur un PointSet binaire.
+
+    Les coordonnées ne sont pas recopiées : elles sont lues à travers un
+    `memoryview` converti en float32. Les points restent accessibles comme
+    une liste de tuples (x, y) : `len`, indexation, itération.
+    """
+
+    __slots__ = ("binary", "_coords", "_size")
+
+    def __init__(self, binary):
+        """Construit la vue sur `binary` (bytes, bytearray ou memoryview)."""
+        n = _read_count(binary)
+        end = HEADER.size + n * POINT.size
+        if len(binary) < end:
+            raise ValueError("Données binaires invalides ou incomplètes")
+
+        self.binary = binary
+        self._size = n
+        view = memoryview(binary)[HEADER.size:end]
+        if sys.byteorder == "little":
+            # Le format est little-endian : on lit directement les octets
+            self._coords = view.cast("B").cast("f")
+        else:  # pragma: no cover - machines big-endian
+            self._coords = array("f", view.tobytes())
+            self._coords.byteswap()
+
+    def __len__(self) -> int:
+        """Nombre de points."""
+        return self._size
+
+    def __getitem__(self, index):
+        """Renvoie le point (x, y) d'indice `index` (ou une liste si slice)."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("indice de point hors limites")
+        return self._coords[2 * index], self._coords[2 * index + 1]
+
+    def __iter__(self):
+        """Parcourt les points sans construire de liste intermédiaire."""
+        return zip(self._coords[0::2], self._coords[1::2], strict=True)
+
+    def __eq__(self, other):
+        """Compare point à point avec une autre séquence de points."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            tuple(p) == tuple(q) for p, q in zip(self, other, strict=True)
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Représentation courte (le contenu peut être très gros)."""
+        return f"PointSet(N={self._size})"
+
+    def xs(self):
+        """Renvoie la liste des abscisses."""
+        return self._coords[0::2].tolist()
+
+    def ys(self):
+        """Renvoie la liste des ordonnées."""
+        return self._coords[1::2].tolist()
+
+    def release(self):
+        """Relâche la vue sur le binaire (ex: avant de fermer une mémoire partagée)."""
+        self._coords.release()
+
+    @property
+    def vertex_section(self):
+        """Octets du PointSet d'origine (header + N * 8), sans copie."""
+        return memoryview(self.binary)[:HEADER.size + self._size * POINT.size]
+
+
+def decode_pointset(binary, exact: bool = False) -> PointSet:
+    """Décode un PointSet binaire en vue `PointSet` (sans copie).
+
+    Avec `exact`, le binaire doit faire exactement 4 + 8N octets (sinon
+    seule la partie sommets est lue, ex: dans une structure Triangles).
+    """
+    if exact and len(binary) != HEADER.size + _read_count(binary) * POINT.size:
+        raise ValueError(f"Taille du PointSet incohérente: {len(binary)} octets "
+                         f"pour N = {_read_count(binary)}")
+    return PointSet(binary)
+
+
+def encode_triangles(points, triangles) -> bytes:
+    """Encode des points et leurs triangles au format Triangles."""
+    # Si les points viennent d'un PointSet décodé, on recopie tels quels
+    # les octets d'origine au lieu de les ré-encoder
+    if isinstance(points, PointSet):
+        vertices = points.vertex_section
+    else:
+        vertices = encode_pointset(points)
+
+    return b''.join((vertices, HEADER.pack(len(triangles)),
+                     encode_indices(triangles)))
+
+
+def triangles_size(n: int, t: int) -> int:
+    """Taille exacte en octets d'une structure Triangles (N points, T triangles)."""
+    return HEADER.size + n * POINT.size + HEADER.size + t * TRIANGLE.size
+
+
+def iter_chunks(binary, chunk_size: int = CHUNK_SIZE):
+    """Découpe un binaire déjà encodé en morceaux de `chunk_size` octets."""
+    view = memoryview(binary)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
+def iter_file(file, chunk_size: int = CHUNK_SIZE):
+    """Lit un fichier ouvert par morceaux, puis le ferme (générateur)."""
+    with file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+def iter_triangles(points, triangles, chunk_size: int = CHUNK_SIZE):
+    """Encode la structure Triangles morceau par morceau (générateur).
+
+    On produit d'abord la partie sommets puis la partie triangles, sans
+    jamais matérialiser la réponse complète en mémoire.
+    """
+    # Partie 1 : les sommets
+    if isinstance(points, PointSet):
+        yield from iter_chunks(points.vertex_section, chunk_size)
+    else:
+        yield HEADER.pack(len(points))
+        step = max(1, chunk_size // POINT.size)
+        for start in range(0, len(points), step):
+            yield encode_coords(points[start:start + step])
+
+    # Partie 2 : les triangles
+    yield HEADER.pack(len(triangles))
+    step = max(1, chunk_size // TRIANGLE.size)
+    for start in range(0, len(triangles), step):
+        yield encode_indices(triangles[start:start + step])
+
+
+def decode_triangles(binary):
+    """Décode la partie triangles d'une structure Triangles."""
+    # Taille partie 1 = 4 bytes (N) + N * 8 bytes
+    n = _read_count(binary)
+    position = HEADER.size + n * POINT.size
+
+    # Lecture du nombre de triangles T
+    t = _read_count(binary, position)
+    position += HEADER.size
+    end = position + t * TRIANGLE.size
+    # Même contrôle pour les deux implémentations : un corps tronqué ne
+    # donne ni moins de triangles ni une erreur propre à l'une d'elles
+    if len(binary) < end:
+        raise ValueError("Données binaires invalides ou incomplètes")
+
+    if np is not None:
+        indices = np.frombuffer(binary, dtype=TRIANGLE_DTYPE, count=t,
+                                offset=position)
+        return list(zip(indices['a'].tolist(), indices['b'].tolist(),
+                        indices['c'].tolist(), strict=True))
+
+    return list(TRIANGLE.iter_unpack(memoryview(binary)[position:end]))
@@ -0,0 +1,242 @@
+"""Compression des réponses Triangles, négociée par Accept-Encoding.
+
+Codages proposés, par ordre de préférence à qualité égale :
+- zstd    : si le paquet `zstandard` est installé (le plus rapide),
+- gzip    : zlib, en-tête gzip,
+- deflate : zlib, en-tête zlib (sens HTTP du mot « deflate »).
+
+La compression fonctionne morceau par morceau : une réponse en flux reste
+en flux (sans Content-Length).
+
+Transformation optionnelle avant compression (en-tête de requête
+`X-Triangles-Transform: delta-shuffle`, renvoyé dans la réponse) :
+- les flottants des sommets sont « shufflés » par octet (tous les octets 0,
+  puis tous les octets 1...) : les exposants, très proches, se suivent,
+- les indices de triangle sont remplacés par des écarts (premier sommet
+  au premier sommet du triangle précédent, les deux autres au premier ;
+  zigzag sur 32 bits), puis shufflés de même : une fois les sommets
+  numérotés dans l'ordre spatial, les octets de poids fort sont presque
+  tous nuls.
+Les headers N et T et la taille totale sont inchangés ; `revert` redonne
+la structure Triangles d'origine.
+"""
+import sys
+import zlib
+from array import array
+
+from .codec import HEADER, POINT, TRIANGLE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    np = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    zstandard = None
+
+# Niveaux de compression : bon compromis vitesse / taille pour des réponses
+# calculées à la volée
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+ENCODINGS = (("zstd",) if zstandard is not None else ()) + ("gzip", "deflate")
+TRANSFORMS = ("delta-shuffle",)
+
+# La réponse dépend de ces en-têtes de requête (caches intermédiaires)
+VARY = "Accept-Encoding, X-Triangles-Transform"
+
+# Taille du cache des formes encodées (0 = pas de cache)
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_MASK = 0xFFFFFFFF
+
+
+def negotiate(accept_encoding: str):
+    """Choisit le codage selon l'en-tête Accept-Encoding (None = aucun)."""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    best, best_quality = None, 0.0
+    for name in ENCODINGS:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def _compressor(encoding: str):
+    """Renvoie un compresseur incrémental (compress / flush)."""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    wbits = 31 if encoding == "gzip" else 15
+    return zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, wbits)
+
+
+def iter_compressed(chunks, encoding: str):
+    """Compresse une suite de morceaux au fil de l'eau (générateur)."""
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def compress(binary, encoding: str) -> bytes:
+    """Compresse un binaire complet."""
+    return b"".join(iter_compressed([binary], encoding))
+
+
+def decompress(data, encoding: str) -> bytes:
+    """Décompresse une réponse (côté client, et pour les tests)."""
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return zlib.decompress(data, 31 if encoding == "gzip" else 15)
+
+
+def encode(binary, encoding, transform):
+    """Applique la transformation puis la compression demandées (ou aucune)."""
+    if transform is not None:
+        binary = apply(binary, transform)
+    if encoding is not None:
+        binary = compress(binary, encoding)
+    return binary
+
+
+def response_headers(encoding, transform) -> dict:
+    """Renvoie les en-têtes décrivant le codage d'une réponse."""
+    headers = {}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    if transform is not None:
+        headers["X-Triangles-Transform"] = transform
+    return headers
+
+
+# Transformation delta-shuffle
+
+def _shuffle(data) -> bytes:
+    """Regroupe les octets de même rang de chaque mot de 4 octets."""
+    view = memoryview(data)
+    return b"".join(view[k::4].tobytes() for k in range(4))
+
+
+def _unshuffle(data) -> bytes:
+    """Inverse de `_shuffle`."""
+    count = len(data) // 4
+    out = bytearray(len(data))
+    for k in range(4):
+        out[k::4] = data[k * count:(k + 1) * count]
+    return bytes(out)
+
+
+def _zigzag(delta: int) -> int:
+    """Écart signé (32 bits) → entier positif petit si l'écart est petit."""
+    delta &= _MASK
+    if delta >= 1 << 31:
+        delta -= 1 << 32
+    return ((delta << 1) ^ (delta >> 31)) & _MASK
+
+
+def _delta(indices) -> bytes:
+    """Écarts des indices (zigzag sur 32 bits), little-endian.
+
+    Pour chaque triangle (a, b, c) : a - a du triangle précédent, b - a et
+    c - a. Une fois les sommets numérotés dans l'ordre spatial, ces écarts
+    sont petits.
+    """
+    if np is not None:
+        values = np.frombuffer(indices, dtype='<u4').reshape(-1, 3)
+        delta = np.empty_like(values)
+        delta[:, 0] = np.diff(values[:, 0], prepend=np.uint32(0))
+        delta[:, 1] = values[:, 1] - values[:, 0]
+        delta[:, 2] = values[:, 2] - values[:, 0]
+        delta = delta.view(np.int32)
+        return ((delta << 1) ^ (delta >> 31)).astype('<u4').tobytes()
+
+    values = array('I', bytes(indices))
+    if sys.byteorder != "little":  # pragma: no cover - machines big-endian
+        values.byteswap()
+    out = array('I', bytes(len(values) * 4))
+    previous = 0
+    for k in range(0, len(values), 3):
+        a = values[k]
+        out[k] = _zigzag(a - previous)
+        out[k + 1] = _zigzag(values[k + 1] - a)
+        out[k + 2] = _zigzag(values[k + 2] - a)
+        previous = a
+    if sys.byteorder != "little":  # pragma: no cover
+        out.byteswap()
+    return out.tobytes()
+
+
+def _undelta(data) -> bytes:
+    """Inverse de `_delta`."""
+    if np is not None:
+        zigzag = np.frombuffer(data, dtype='<u4').reshape(-1, 3)
+        delta = (zigzag >> 1) ^ (np.uint32(0) - (zigzag & np.uint32(1)))
+        values = np.empty_like(delta)
+        values[:, 0] = np.cumsum(delta[:, 0], dtype=np.uint32)
+        values[:, 1] = values[:, 0] + delta[:, 1]
+        values[:, 2] = values[:, 0] + delta[:, 2]
+        return values.astype('<u4').tobytes()
+
+    values = array('I', bytes(data))
+    if sys.byteorder != "little":  # pragma: no cover - machines big-endian
+        values.byteswap()
+    previous = 0
+    for k in range(0, len(values), 3):
+        delta = [(z >> 1) ^ -(z & 1) for z in values[k:k + 3]]
+        previous = (previous + delta[0]) & _MASK
+        values[k] = previous
+        values[k + 1] = (previous + delta[1]) & _MASK
+        values[k + 2] = (previous + delta[2]) & _MASK
+    if sys.byteorder != "little":  # pragma: no cover
+        values.byteswap()
+    return values.tobytes()
+
+
+def _sections(binary):
+    """Renvoie (fin des sommets, début des indices, fin des indices)."""
+    n = HEADER.unpack_from(binary)[0]
+    vertices_end = HEADER.size + n * POINT.size
+    t = HEADER.unpack_from(binary, vertices_end)[0]
+    start = vertices_end + HEADER.size
+    return vertices_end, start, start + t * TRIANGLE.size
+
+
+def apply(binary, transform: str) -> bytes:
+    """Applique la transformation à une structure Triangles."""
+    if transform not in TRANSFORMS:
+        raise ValueError(f"Transformation inconnue: {transform}")
+    view = memoryview(binary)
+    vertices_end, start, end = _sections(view)
+    return b"".join((view[:HEADER.size], _shuffle(view[HEADER.size:vertices_end]),
+                     view[vertices_end:start], _shuffle(_delta(view[start:end]))))
+
+
+def revert(binary, transform: str) -> bytes:
+    """Redonne la structure Triangles d'origine."""
+    if transform not in TRANSFORMS:
+        raise ValueError(f"Transformation inconnue: {transform}")
+    view = memoryview(binary)
+    vertices_end, start, end = _sections(view)
+    return b"".join((view[:HEADER.size],
+                     _unshuffle(view[HEADER.size:vertices_end]),
+                     view[vertices_end:start],
+                     _undelta(_unshuffle(view[start:end]))))
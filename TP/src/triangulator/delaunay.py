@@ -0,0 +1,591 @@
+"""Moteur de triangulation de Delaunay incrémental (Bowyer-Watson localisé).
+
+Contrairement à la boucle naïve qui teste tous les triangles pour chaque point,
+ce moteur garde les liens de voisinage entre triangles. Pour insérer un point :
+
+1. on retrouve le triangle qui le contient en "marchant" depuis le dernier
+   triangle créé (les points étant triés spatialement, la marche est courte),
+2. on propage la cavité (les mauvais triangles) uniquement de voisin en voisin,
+3. on rebouche la cavité en éventail autour du nouveau point.
+
+Le coût attendu est en O(n log n) au lieu de O(n²).
+"""
+import random
+from array import array
+
+from .metrics import REGISTRY
+from .predicates import incircle, orient2d
+
+# En dessous de ce nombre de points, on garde l'ordre d'entrée :
+# le tri spatial ne rapporte rien et l'ordre d'insertion reste celui
+# de l'ancienne implémentation (utile pour les cas cocycliques).
+SPATIAL_SORT_THRESHOLD = 64
+
+# Taille minimale d'un tour BRIO (les plus petits tours sont fusionnés)
+BRIO_MIN_ROUND = 64
+
+# Précision de la grille utilisée pour la courbe de Hilbert (2^16 x 2^16)
+HILBERT_ORDER = 16
+
+# Indice du sommet symbolique "à l'infini" (négatif : de nouveaux points
+# peuvent être ajoutés après coup sans collision d'indices)
+INFINITE = -2
+
+
+def bounding_box(xs, ys):
+    """Renvoie la boîte englobante (min_x, min_y, max_x, max_y)."""
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def hilbert_key(x: int, y: int, order: int = HILBERT_ORDER) -> int:
+    """Position du point entier (x, y) le long d'une courbe de Hilbert."""
+    n = 1 << order
+    d = 0
+    s = n >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotation du quadrant pour que la courbe reste continue
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def hilbert_keys(xs, ys, order: int = HILBERT_ORDER):
+    """Renvoie la clé de Hilbert de chaque point après quantification."""
+    min_x, min_y, max_x, max_y = bounding_box(xs, ys)
+    span = max(max_x - min_x, max_y - min_y) or 1.0
+    scale = ((1 << order) - 1) / span
+    return [
+        hilbert_key(int((x - min_x) * scale), int((y - min_y) * scale), order)
+        for x, y in zip(xs, ys, strict=True)
+    ]
+
+
+def brio_order(xs, ys, seed: int = 0):
+    """Ordre d'insertion BRIO : tours aléatoires, chacun trié selon Hilbert."""
+    n = len(xs)
+    keys = hilbert_keys(xs, ys)
+
+    # On mélange les indices de façon reproductible
+    permutation = list(range(n))
+    random.Random(seed).shuffle(permutation)
+
+    # Découpage en tours de taille croissante (n/2^k, ..., n/4, n/2)
+    rounds = []
+    end = n
+    while end > 2 * BRIO_MIN_ROUND:
+        start = end // 2
+        rounds.append(permutation[start:end])
+        end = start
+    rounds.append(permutation[:end])
+
+    # Les petits tours d'abord, chacun parcouru le long de la courbe
+    order = []
+    for chunk in reversed(rounds):
+        chunk.sort(key=keys.__getitem__)
+        order.extend(chunk)
+    return order
+
+
+class IncrementalDelaunay:
+    """Triangulation de Delaunay incrémentale avec adjacence entre triangles.
+
+    Chaque triangle `t` occupe les cases `3t`, `3t+1`, `3t+2` de `vertices`
+    (sommets dans le sens trigonométrique) et de `neighbors`. Le voisin
+    `neighbors[3t+k]` est celui situé en face du sommet `vertices[3t+k]`.
+
+    Le stockage est compact : tableaux `array('i')` préalloués (4 octets par
+    indice, aucun objet Python par triangle) et coordonnées en `array('d')`.
+    Un triangle supprimé a `vertices[3t] == -1` ; sa place est remise dans
+    `free` et réutilisée par les insertions suivantes.
+
+    Plutôt qu'un super-triangle de taille finie (qui fait perdre des
+    triangles de l'enveloppe convexe quand les points sont très étirés),
+    on utilise un sommet symbolique "à l'infini", d'indice `INFINITE` :
+    chaque arête de l'enveloppe est bordée à l'extérieur par un triangle
+    fantôme (a, b, infini). Le maillage est donc toujours fermé.
+    """
+
+    def __init__(self, xs, ys):
+        """Prépare une structure vide (voir `start`)."""
+        self.n_points = len(xs)
+        self.infinite = INFINITE
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+
+        # Une triangulation de n points (fantômes compris) a 2n - 2
+        # triangles : on réserve tout de suite un peu plus
+        capacity = 2 * self.n_points + 64
+        self.vertices = array('i', [-1]) * (3 * capacity)
+        self.neighbors = array('i', [-1]) * (3 * capacity)
+        self.count = 0
+        self.free = array('i')
+        self.last = 0
+
+        # Marqueurs de visite pour la propagation de la cavité
+        self._mark = array('i', [0]) * capacity
+        self._stamp = 0
+
+        # Nombre de tests de cercle circonscrit (métriques)
+        self.incircle_tests = 0
+
+    def _grow(self):
+        """Double la capacité des tableaux (rare : capacité initiale large)."""
+        self.vertices.extend(array('i', [-1]) * len(self.vertices))
+        self.neighbors.extend(array('i', [-1]) * len(self.neighbors))
+        self._mark.extend(array('i', [0]) * len(self._mark))
+
+    def _new_triangle(self):
+        """Renvoie un emplacement libre pour un triangle."""
+        if self.free:
+            return self.free.pop()
+        if self.count == len(self._mark):
+            self._grow()
+        self.count += 1
+        return self.count - 1
+
+    def start(self, order):
+        """Crée le premier triangle à partir des points de `order`.
+
+        Renvoie les indices de ses 3 sommets, ou None si tous les points
+        sont confondus ou alignés.
+        """
+        xs, ys = self.xs, self.ys
+        a = b = None
+        for i in order:
+            if a is None:
+                a = i
+            elif b is None:
+                if xs[i] != xs[a] or ys[i] != ys[a]:
+                    b = i
+            elif orient2d(xs[a], ys[a], xs[b], ys[b], xs[i], ys[i]) != 0:
+                c = i
+                break
+        else:
+            return None
+
+        if orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) < 0:
+            b, c = c, b
+
+        # Triangle (a, b, c) et ses 3 triangles fantômes, un par arête :
+        # 0 = (a, b, c), 1 = (b, a, inf), 2 = (c, b, inf), 3 = (a, c, inf)
+        inf = self.infinite
+        self.vertices[:12] = array('i', [a, b, c, b, a, inf, c, b, inf, a, c, inf])
+        self.neighbors[:12] = array('i', [2, 3, 1, 3, 2, 0, 1, 3, 0, 2, 1, 0])
+        self.count = 4
+        self.last = 0
+        return a, b, c
+
+    def _conflict(self, t, px, py):
+        """Vrai si (px, py) est strictement dans le cercle circonscrit de t.
+
+        Pour un triangle fantôme, le "cercle" est le demi-plan extérieur à
+        son arête d'enveloppe (plus l'intérieur du segment lui-même).
+        """
+        xs, ys, v = self.xs, self.ys, self.vertices
+        a, b, c = v[3 * t], v[3 * t + 1], v[3 * t + 2]
+        inf = self.infinite
+        if c == inf:
+            u, w = a, b
+        elif a == inf:
+            u, w = b, c
+        elif b == inf:
+            u, w = c, a
+        else:
+            return incircle(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c], px, py) > 0
+
+        orient = orient2d(xs[u], ys[u], xs[w], ys[w], px, py)
+        if orient != 0:
+            return orient > 0
+        # Point aligné avec l'arête : en conflit seulement s'il est dessus
+        ux, uy, wx, wy = xs[u], ys[u], xs[w], ys[w]
+        if ux != wx:
+            return ux < px < wx or wx < px < ux
+        return uy < py < wy or wy < py < uy
+
+    def _is_ghost(self, t):
+        """Vrai si t est un triangle fantôme (relié au sommet infini)."""
+        v = self.vertices
+        return self.infinite in (v[3 * t], v[3 * t + 1], v[3 * t + 2])
+
+    def locate(self, px, py):
+        """Trouve un triangle contenant (px, py) en marchant depuis `last`.
+
+        Si le point est hors de l'enveloppe convexe, renvoie un triangle
+        fantôme dont l'arête d'enveloppe est visible depuis le point.
+        """
+        xs, ys, v, nb = self.xs, self.ys, self.vertices, self.neighbors
+        inf = self.infinite
+        t = self.last
+        if self._is_ghost(t):
+            # On repart du triangle réel adjacent (en face du sommet infini)
+            base = 3 * t
+            t = nb[base + (v[base], v[base + 1], v[base + 2]).index(inf)]
+        previous = -1
+        # La marche termine en pratique très vite ; on borne tout de même
+        # le nombre de pas et on repasse en recherche linéaire au besoin.
+        for step in range(4 * self.count + 16):
+            base = 3 * t
+            moved = False
+            # On commence par une arête différente à chaque pas pour
+            # éviter de tourner en rond (marche "stochastique")
+            for k in range(3):
+                e = base + (step + k) % 3
+                nxt = nb[e]
+                if nxt == previous:
+                    continue
+                # Arête en face du sommet e : (e+1, e+2)
+                i = v[base + (e - base + 1) % 3]
+                j = v[base + (e - base + 2) % 3]
+                if orient2d(xs[i], ys[i], xs[j], ys[j], px, py) < 0:
+                    nb_base = 3 * nxt
+                    if inf in (v[nb_base], v[nb_base + 1], v[nb_base + 2]):
+                        # On sort de l'enveloppe par cette arête
+                        return nxt
+                    previous, t = t, nxt
+                    moved = True
+                    break
+            if not moved:
+                return t
+        return self._locate_linear(px, py)
+
+    def _locate_linear(self, px, py):
+        """Recherche exhaustive (secours si la marche n'aboutit pas)."""
+        xs, ys, v = self.xs, self.ys, self.vertices
+        ghosts = []
+        for t in range(self.count):
+            if v[3 * t] == -1:
+                continue
+            if self._is_ghost(t):
+                ghosts.append(t)
+                continue
+            a, b, c = v[3 * t], v[3 * t + 1], v[3 * t + 2]
+            if (orient2d(xs[a], ys[a], xs[b], ys[b], px, py) >= 0
+                    and orient2d(xs[b], ys[b], xs[c], ys[c], px, py) >= 0
+                    and orient2d(xs[c], ys[c], xs[a], ys[a], px, py) >= 0):
+                return t
+        # Hors de l'enveloppe : un triangle fantôme en conflit
+        for t in ghosts:
+            if self._conflict(t, px, py):
+                return t
+        return self.last
+
+    def insert(self, i):
+        """Insère le point d'indice i ; renvoie False s'il est ignoré."""
+        xs, ys, v, nb = self.xs, self.ys, self.vertices, self.neighbors
+        px, py = xs[i], ys[i]
+
+        # ETAPE 1 : localisation du triangle contenant le point
+        t = self.locate(px, py)
+
+        # Un doublon se trouve sur le cercle de tous ses triangles :
+        # aucune cavité, le point est ignoré (comme avant)
+        if not self._conflict(t, px, py):
+            return False
+
+        # ETAPE 2 : propagation de la cavité de voisin en voisin
+        self._stamp += 1
+        stamp = self._stamp
+        mark = self._mark
+        mark[t] = stamp
+        cavity = [t]
+        stack = [t]
+        boundary = []
+        while stack:
+            t = stack.pop()
+            base = 3 * t
+            for k in range(3):
+                other = nb[base + k]
+                if mark[other] == stamp:
+                    continue
+                if self._conflict(other, px, py):
+                    mark[other] = stamp
+                    cavity.append(other)
+                    stack.append(other)
+                    continue
+                # Arête frontière : (sommet k+1, sommet k+2) vue depuis t
+                boundary.append((v[base + (k + 1) % 3], v[base + (k + 2) % 3],
+                                 other, t))
+
+        # Un test par triangle de la cavité et par voisin de sa frontière
+        self.incircle_tests += len(cavity) + len(boundary)
+
+        # ETAPE 3 : re-bouchage du trou en éventail autour du point i
+        # (les places de la cavité ne sont libérées qu'à la fin : les
+        # voisins extérieurs y font encore référence)
+        starts = {}
+        created = []
+        for a, b, other, old in boundary:
+            new = self._new_triangle()
+            base = 3 * new
+            v[base], v[base + 1], v[base + 2] = a, b, i
+            # en face de a : (b, i) ; en face de b : (i, a) ; en face de i : (a, b)
+            nb[base + 2] = other
+            # Le voisin extérieur pointait vers l'ancien triangle
+            ob = 3 * other
+            for k in range(3):
+                if nb[ob + k] == old:
+                    nb[ob + k] = new
+                    break
+            starts[a] = new
+            created.append(new)
+
+        # Les nouveaux triangles (a, b, i) et (b, c, i) partagent l'arête (b, i)
+        for new in created:
+            follower = starts[v[3 * new + 1]]
+            nb[3 * new] = follower
+            nb[3 * follower + 1] = new
+
+        for t in cavity:
+            v[3 * t] = -1
+        self.free.extend(cavity)
+
+        self.last = created[-1]
+        return True
+
+    def _find_vertex(self, i):
+        """Recherche exhaustive d'un triangle ayant i pour sommet (ou None)."""
+        v = self.vertices
+        for t in range(self.count):
+            if v[3 * t] != -1 and i in (v[3 * t], v[3 * t + 1], v[3 * t + 2]):
+                return t
+        return None
+
+    def _star(self, i, t):
+        """Renvoie l'étoile du sommet i (t l'un de ses triangles).
+
+        → (triangles de l'étoile, lien, voisins extérieurs) : le lien est
+        le polygone des sommets voisins de i dans le sens trigonométrique,
+        et `outer[k]` le triangle de l'autre côté de l'arête
+        (link[k], link[k + 1]).
+        """
+        v, nb = self.vertices, self.neighbors
+        star, link, outer = [], [], []
+        first = t
+        while True:
+            base = 3 * t
+            k = (v[base], v[base + 1], v[base + 2]).index(i)
+            star.append(t)
+            link.append(v[base + (k + 1) % 3])
+            outer.append(nb[base + k])
+            # Triangle suivant autour de i : en face du sommet k + 1
+            t = nb[base + (k + 1) % 3]
+            if t == first:
+                return star, link, outer
+
+    def _empty_circle(self, a, b, c, others):
+        """Vrai si (a, b, c) est un triangle valide au cercle vide.
+
+        Le triangle doit être orienté et aucun point de `others` ne doit
+        être dans son cercle (demi-plan extérieur pour un fantôme).
+        """
+        xs, ys, inf = self.xs, self.ys, self.infinite
+        if inf not in (a, b, c):
+            if orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) <= 0:
+                return False
+            return not any(
+                incircle(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c],
+                         xs[k], ys[k]) > 0
+                for k in others if k != inf
+            )
+        # Arête finie (u, w) du triangle fantôme, l'infini étant à gauche
+        u, w = (b, c) if a == inf else (c, a) if b == inf else (a, b)
+        ux, uy, wx, wy = xs[u], ys[u], xs[w], ys[w]
+        for k in others:
+            if k == inf:
+                continue
+            px, py = xs[k], ys[k]
+            orient = orient2d(ux, uy, wx, wy, px, py)
+            if orient > 0:
+                return False
+            if orient == 0 and (ux < px < wx or wx < px < ux
+                                or uy < py < wy or wy < py < uy):
+                return False
+        return True
+
+    def _ears(self, link):
+        """Triangule le polygone `link` par oreilles de Delaunay (ou None).
+
+        Une oreille est retenue si son cercle ne contient aucun autre
+        sommet du lien : le résultat est alors la triangulation de
+        Delaunay du trou laissé par le sommet retiré.
+        """
+        polygon = list(link)
+        triangles = []
+        while len(polygon) > 3:
+            for k in range(len(polygon)):
+                a = polygon[k - 1]
+                b = polygon[k]
+                c = polygon[(k + 1) % len(polygon)]
+                others = [p for p in link if p not in (a, b, c)]
+                if self._empty_circle(a, b, c, others):
+                    triangles.append((a, b, c))
+                    del polygon[k]
+                    break
+            else:
+                return None
+        a, b, c = polygon
+        if not self._empty_circle(a, b, c, ()):
+            return None
+        triangles.append((a, b, c))
+        return triangles
+
+    def remove(self, i):
+        """Retire le sommet i et re-triangule son étoile.
+
+        Renvoie False, sans rien modifier, si le retrait laisse un nuage
+        dégénéré (points restants tous alignés) : le maillage est alors à
+        reconstruire par l'appelant.
+        """
+        xs, ys, v, nb = self.xs, self.ys, self.vertices, self.neighbors
+        inf = self.infinite
+
+        # ETAPE 1 : un triangle ayant i pour sommet
+        t = self.locate(xs[i], ys[i])
+        if i not in (v[3 * t], v[3 * t + 1], v[3 * t + 2]):
+            t = self._find_vertex(i)
+            if t is None:
+                return False
+
+        # ETAPE 2 : l'étoile de i et son lien
+        star, link, outer = self._star(i, t)
+        finite = [k for k in link if k != inf]
+        if all(self._is_ghost(o) for o in outer) and (len(finite) < 3 or all(
+                orient2d(xs[finite[0]], ys[finite[0]], xs[finite[1]],
+                         ys[finite[1]], xs[k], ys[k]) == 0
+                for k in finite[2:])):
+            # Plus aucun triangle réel après le retrait
+            return False
+
+        # ETAPE 3 : triangulation de Delaunay du trou
+        ears = self._ears(link)
+        if ears is None:
+            return False
+
+        # ETAPE 4 : mise en place des nouveaux triangles. Chaque arête
+        # (p, q) est recollée à l'arête (q, p) : celle d'un autre nouveau
+        # triangle ou celle du voisin extérieur
+        edges = {}
+        for k, other in enumerate(outer):
+            ob = 3 * other
+            for slot in range(3):
+                if nb[ob + slot] == star[k]:
+                    edges[(link[(k + 1) % len(link)], link[k])] = ob + slot
+                    break
+        for a, b, c in ears:
+            new = self._new_triangle()
+            base = 3 * new
+            v[base], v[base + 1], v[base + 2] = a, b, c
+            for slot, edge in enumerate(((b, c), (c, a), (a, b))):
+                twin = edges.pop((edge[1], edge[0]), None)
+                if twin is None:
+                    edges[edge] = base + slot
+                else:
+                    nb[base + slot] = twin // 3
+                    nb[twin] = new
+
+        for t in star:
+            v[3 * t] = -1
+        self.free.extend(star)
+        self.last = new
+        return True
+
+    def load(self, triangles):
+        """Reconstruit l'adjacence à partir de triangles déjà calculés.
+
+        Les triangles (supposés de Delaunay) sont remis dans le sens
+        trigonométrique ; chaque arête de l'enveloppe reçoit son triangle
+        fantôme. Lève ValueError si les triangles ne forment pas un
+        maillage valide.
+        """
+        xs, ys, v, nb = self.xs, self.ys, self.vertices, self.neighbors
+        n = self.n_points
+
+        # ETAPE 1 : les triangles réels, chaque arête orientée repérée
+        edges = {}
+        for a, b, c in triangles:
+            if not (0 <= a < n and 0 <= b < n and 0 <= c < n):
+                raise ValueError("Triangles invalides : indice hors limites")
+            if orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) < 0:
+                b, c = c, b
+            t = self._new_triangle()
+            base = 3 * t
+            v[base], v[base + 1], v[base + 2] = a, b, c
+            for slot, edge in enumerate(((b, c), (c, a), (a, b))):
+                if edge in edges:
+                    raise ValueError("Triangles invalides : arête en double")
+                edges[edge] = base + slot
+
+        # ETAPE 2 : voisins, et un triangle fantôme par arête d'enveloppe
+        inf = self.infinite
+        by_first, by_second = {}, {}
+        for (p, q), slot in edges.items():
+            twin = edges.get((q, p))
+            if twin is not None:
+                nb[slot] = twin // 3
+                continue
+            g = self._new_triangle()
+            v[3 * g], v[3 * g + 1], v[3 * g + 2] = q, p, inf
+            nb[3 * g + 2] = slot // 3
+            nb[slot] = g
+            if q in by_first or p in by_second:
+                raise ValueError("Triangles invalides : enveloppe non simple")
+            by_first[q] = by_second[p] = g
+
+        # Fantôme (q, p, inf) : en face de q, le fantôme qui commence par p ;
+        # en face de p, celui dont q est le second sommet
+        for g in by_first.values():
+            q, p = v[3 * g], v[3 * g + 1]
+            if p not in by_first or q not in by_second:
+                raise ValueError("Triangles invalides : enveloppe ouverte")
+            nb[3 * g] = by_first[p]
+            nb[3 * g + 1] = by_second[q]
+        self.last = 0
+
+    def triangles(self):
+        """Renvoie les triangles réels (sans les triangles fantômes)."""
+        v = self.vertices
+        result = []
+        for t in range(self.count):
+            a, b, c = v[3 * t], v[3 * t + 1], v[3 * t + 2]
+            # Triangle supprimé (a == -1), ou relié au sommet infini (< 0)
+            if a < 0 or b < 0 or c < 0:
+                continue
+            # On fait commencer le triplet par le plus petit indice
+            # (l'orientation est conservée)
+            if a < b and a < c:
+                result.append((a, b, c))
+            elif b < c:
+                result.append((b, c, a))
+            else:
+                result.append((c, a, b))
+        return result
+
+
+def insertion_order(xs, ys):
+    """Ordre d'insertion : ordre d'entrée pour les petits jeux, BRIO sinon."""
+    if len(xs) < SPATIAL_SORT_THRESHOLD:
+        return range(len(xs))
+    return brio_order(xs, ys)
+
+
+def triangulate(xs, ys):
+    """Triangule les points (xs, ys) et renvoie des triplets d'indices."""
+    order = insertion_order(xs, ys)
+    mesh = IncrementalDelaunay(xs, ys)
+    seeds = mesh.start(order)
+    if seeds is None:
+        # Moins de 3 points distincts, ou tous alignés
+        return []
+    for i in order:
+        if i not in seeds:
+            mesh.insert(i)
+    if REGISTRY.enabled:
+        REGISTRY.circumcircle_tests.inc(mesh.incircle_tests)
+    return mesh.triangles()
@@ -0,0 +1,264 @@
+"""Moteur de triangulation de Delaunay "diviser pour régner" (Guibas-Stolfi).
+
+Les points sont triés par x (puis y), coupés en deux moitiés triangulées
+récursivement, puis les deux triangulations sont recousues par le bas en
+remontant (boucle "basel"). Le coût est en O(n log n) même dans le pire cas,
+y compris sur des entrées adverses pour l'insertion incrémentale.
+
+La triangulation est stockée dans une structure quad-edge : chaque arête non
+orientée occupe 4 numéros consécutifs `4q + r` (r = 0, 2 : les deux sens de
+l'arête ; r = 1, 3 : l'arête duale). `onext[e]` est l'arête suivante autour
+de l'origine de `e` (sens trigonométrique) et `org[e]` son origine.
+
+Notations : sym(e) = e ^ 2 (même arête, sens opposé), dest(e) = org[e ^ 2],
+rot(e) = (e & ~3) | ((e + 1) & 3) (arête duale, un quart de tour plus loin).
+Ces opérations sont écrites en ligne : ce sont les boucles chaudes.
+"""
+from array import array
+
+from .metrics import REGISTRY
+from .predicates import incircle, orient2d
+
+
+class QuadEdgeDelaunay:
+    """Triangulation de Delaunay par diviser pour régner sur des quad-edges."""
+
+    def __init__(self, xs, ys):
+        """Trie les points (sans doublons) et prépare la structure vide."""
+        self.xs = xs
+        self.ys = ys
+        # Tri par x puis y ; à coordonnées égales, on garde le premier indice
+        # (un doublon est ignoré, comme dans le moteur incrémental)
+        order = sorted(range(len(xs)), key=lambda i: (xs[i], ys[i], i))
+        self.sites = []
+        for i in order:
+            if (self.sites and xs[i] == xs[self.sites[-1]]
+                    and ys[i] == ys[self.sites[-1]]):
+                continue
+            self.sites.append(i)
+
+        # Stockage compact : 4 octets par case, aucun objet Python par arête
+        self.onext = array('i')
+        self.org = array('i')
+        self.deleted = bytearray()
+
+        # Nombre de tests de cercle circonscrit (métriques)
+        self.incircle_tests = 0
+
+    # Opérations élémentaires sur les quad-edges
+
+    def _lnext(self, e):
+        """Arête suivante autour de la face gauche."""
+        f = self.onext[(e & ~3) | ((e + 3) & 3)]
+        return (f & ~3) | ((f + 1) & 3)
+
+    def _oprev(self, e):
+        """Arête précédente autour de l'origine."""
+        f = self.onext[(e & ~3) | ((e + 1) & 3)]
+        return (f & ~3) | ((f + 1) & 3)
+
+    def make_edge(self, a, b):
+        """Crée une arête isolée de a vers b."""
+        e = len(self.onext)
+        self.onext.extend((e, e + 3, e + 2, e + 1))
+        self.org.extend((a, -1, b, -1))
+        self.deleted.append(0)
+        return e
+
+    def splice(self, a, b):
+        """Relie ou sépare les anneaux d'arêtes de a et b."""
+        onext = self.onext
+        na, nb = onext[a], onext[b]
+        # alpha = rot(onext(a)), beta = rot(onext(b))
+        alpha = (na & ~3) | ((na + 1) & 3)
+        beta = (nb & ~3) | ((nb + 1) & 3)
+        onext[a], onext[b] = nb, na
+        onext[alpha], onext[beta] = onext[beta], onext[alpha]
+
+    def connect(self, a, b):
+        """Ajoute une arête de dest(a) vers org(b) ; renvoie cette arête."""
+        e = self.make_edge(self.org[a ^ 2], self.org[b])
+        self.splice(e, self._lnext(a))
+        self.splice(e ^ 2, b)
+        return e
+
+    def delete_edge(self, e):
+        """Retire une arête de la triangulation."""
+        self.splice(e, self._oprev(e))
+        self.splice(e ^ 2, self._oprev(e ^ 2))
+        self.deleted[e >> 2] = 1
+
+    # Prédicats exprimés sur les indices de points
+
+    def _ccw(self, a, b, c):
+        """orient2d robuste sur trois indices de points."""
+        xs, ys = self.xs, self.ys
+        return orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c])
+
+    # Algorithme
+
+    def _build(self, lo, hi):
+        """Triangule sites[lo:hi] → (arête gauche, arête droite) de l'enveloppe.
+
+        L'arête gauche part du point le plus à gauche et suit l'enveloppe dans
+        le sens trigonométrique ; l'arête droite part du point le plus à
+        droite et la suit dans le sens horaire.
+        """
+        sites = self.sites
+        n = hi - lo
+
+        # ETAPE 1 : cas de base (2 ou 3 points)
+        if n == 2:
+            a = self.make_edge(sites[lo], sites[lo + 1])
+            return a, a ^ 2
+
+        if n == 3:
+            s1, s2, s3 = sites[lo], sites[lo + 1], sites[lo + 2]
+            a = self.make_edge(s1, s2)
+            b = self.make_edge(s2, s3)
+            self.splice(a ^ 2, b)
+            orient = self._ccw(s1, s2, s3)
+            if orient > 0:
+                self.connect(b, a)
+                return a, b ^ 2
+            if orient < 0:
+                c = self.connect(b, a)
+                return c ^ 2, c
+            # Trois points alignés : une simple chaîne
+            return a, b ^ 2
+
+        # ETAPE 2 : les deux moitiés
+        mid = lo + n // 2
+        ldo, ldi = self._build(lo, mid)
+        rdi, rdo = self._build(mid, hi)
+
+        # ETAPE 3 : tangente inférieure commune aux deux enveloppes
+        xs, ys, org, onext = self.xs, self.ys, self.org, self.onext
+        while True:
+            a, b, c = org[rdi], org[ldi], org[ldi ^ 2]
+            if orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) > 0:
+                # ldi = lnext(ldi)
+                r = (ldi & ~3) | ((ldi + 3) & 3)
+                ldi = (onext[r] & ~3) | ((onext[r] + 1) & 3)
+                continue
+            a, b, c = org[ldi], org[rdi ^ 2], org[rdi]
+            if orient2d(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c]) > 0:
+                # rdi = rprev(rdi)
+                rdi = onext[rdi ^ 2]
+                continue
+            break
+
+        basel = self.connect(rdi ^ 2, ldi)
+        if org[ldi] == org[ldo]:
+            ldo = basel ^ 2
+        if org[rdi] == org[rdo]:
+            rdo = basel
+
+        # ETAPE 4 : couture de bas en haut
+        tests = 0
+        while True:
+            b_org, b_dest = org[basel], org[basel ^ 2]
+            ox, oy = xs[b_org], ys[b_org]
+            dx, dy = xs[b_dest], ys[b_dest]
+
+            # Candidat gauche : on retire les arêtes qui ne sont plus Delaunay
+            lcand = onext[basel ^ 2]
+            c = org[lcand ^ 2]
+            l_valid = orient2d(xs[c], ys[c], dx, dy, ox, oy) > 0
+            if l_valid:
+                while True:
+                    nxt = onext[lcand]
+                    d = org[nxt ^ 2]
+                    # Quatrième point confondu avec la base : pas de test
+                    if d in (b_dest, b_org):
+                        break
+                    tests += 1
+                    if incircle(dx, dy, ox, oy, xs[c], ys[c], xs[d], ys[d]) <= 0:
+                        break
+                    self.delete_edge(lcand)
+                    lcand = nxt
+                    c = d
+
+            # Candidat droit, symétriquement
+            r = (basel & ~3) | ((basel + 1) & 3)
+            rcand = (onext[r] & ~3) | ((onext[r] + 1) & 3)
+            c = org[rcand ^ 2]
+            r_valid = orient2d(xs[c], ys[c], dx, dy, ox, oy) > 0
+            if r_valid:
+                while True:
+                    r = (rcand & ~3) | ((rcand + 1) & 3)
+                    nxt = (onext[r] & ~3) | ((onext[r] + 1) & 3)
+                    d = org[nxt ^ 2]
+                    if d in (b_dest, b_org):
+                        break
+                    tests += 1
+                    if incircle(dx, dy, ox, oy, xs[c], ys[c], xs[d], ys[d]) <= 0:
+                        break
+                    self.delete_edge(rcand)
+                    rcand = nxt
+                    c = d
+
+            l_dest, r_dest = org[lcand ^ 2], org[rcand ^ 2]
+            l_valid = orient2d(xs[l_dest], ys[l_dest], dx, dy, ox, oy) > 0
+            r_valid = orient2d(xs[r_dest], ys[r_dest], dx, dy, ox, oy) > 0
+            if not l_valid and not r_valid:
+                # Plus de candidat : on a atteint la tangente supérieure
+                break
+
+            tests += l_valid and r_valid
+            if not l_valid or (r_valid and incircle(
+                    xs[l_dest], ys[l_dest], xs[org[lcand]], ys[org[lcand]],
+                    xs[org[rcand]], ys[org[rcand]], xs[r_dest], ys[r_dest]) > 0):
+                basel = self.connect(rcand, basel ^ 2)
+            else:
+                basel = self.connect(basel ^ 2, lcand ^ 2)
+
+        self.incircle_tests += tests
+        return ldo, rdo
+
+    def triangulate(self):
+        """Construit la triangulation ; renvoie False si moins de 2 points."""
+        if len(self.sites) < 2:
+            return False
+        self._build(0, len(self.sites))
+        return True
+
+    def triangles(self):
+        """Renvoie les triangles (sens trigonométrique, plus petit indice d'abord)."""
+        org, deleted = self.org, self.deleted
+        seen = bytearray(len(self.onext))
+        result = []
+        for q, is_deleted in enumerate(deleted):
+            if is_deleted:
+                continue
+            for e in (4 * q, 4 * q + 2):
+                if seen[e]:
+                    continue
+                # Face à gauche de e : un triangle si elle a 3 arêtes
+                e2 = self._lnext(e)
+                e3 = self._lnext(e2)
+                seen[e] = seen[e2] = seen[e3] = 1
+                if self._lnext(e3) != e:
+                    continue
+                a, b, c = org[e], org[e2], org[e3]
+                # La face extérieure d'une enveloppe à 3 sommets est
+                # elle aussi un triangle, mais dans le sens horaire
+                if self._ccw(a, b, c) <= 0:
+                    continue
+                if a < b and a < c:
+                    result.append((a, b, c))
+                elif b < c:
+                    result.append((b, c, a))
+                else:
+                    result.append((c, a, b))
+        return result
+
+
+def triangulate(xs, ys):
+    """Triangule les points (xs, ys) et renvoie des triplets d'indices."""
+    mesh = QuadEdgeDelaunay(xs, ys)
+    if not mesh.triangulate():
+        return []
+    if REGISTRY.enabled:
+        REGISTRY.circumcircle_tests.inc(mesh.incircle_tests)
+    return mesh.triangles()
@@ -0,0 +1,136 @@
+"""Exécution de la triangulation dans un pool de processus.
+
+Sous le GIL, un gros PointSet triangulé dans le thread de la requête bloque
+toutes les autres requêtes du worker Flask. Au-delà d'un seuil de taille, on
+confie donc le calcul à un pool de processus :
+
+- le binaire du PointSet est transmis par mémoire partagée
+  (`multiprocessing.shared_memory`) plutôt que par pickle d'une liste de tuples,
+- la file d'attente est bornée : au-delà, la requête est refusée (503),
+- chaque calcul a un délai maximum (TimeoutError -> 503),
+- une erreur de triangulation (ValueError) remonte telle quelle (500).
+"""
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from . import codec
+from .triangulator import DEFAULT_ENGINE, Triangulator
+
+# Ouverture du segment dans un processus du pool : sans suivi à partir de
+# Python 3.13 ; avant, le ré-enregistrement auprès du tracker partagé est
+# sans effet (même nom)
+_ATTACH = {"track": False} if sys.version_info >= (3, 13) else {}
+
+
+class ExecutorBusy(Exception):
+    """Levée quand la file d'attente du pool de processus est pleine."""
+
+
+def _triangulate_shared(name: str, size: int, engine: str) -> bytes:
+    """Tâche exécutée dans un processus du pool : renvoie les indices encodés."""
+    # Le segment appartient au processus parent, seul à le libérer. Les
+    # processus "spawn" partagent son resource tracker : ils ne doivent pas
+    # y retirer l'enregistrement du segment (le parent le fait à l'unlink)
+    shm = shared_memory.SharedMemory(name=name, **_ATTACH)
+    view = shm.buf[:size]
+    points = codec.PointSet(view)
+    try:
+        triangles = Triangulator(engine=engine).triangulate(points)
+    finally:
+        # Les vues doivent être relâchées avant de fermer le segment
+        points.release()
+        view.release()
+        shm.close()
+    return codec.encode_indices(triangles)
+
+
+class TriangulationExecutor:
+    """Pool de processus borné pour les gros PointSets."""
+
+    def __init__(self, max_workers: int = None, max_pending: int = None,
+                 timeout: float = 60.0, inline_threshold: int = 20_000,
+                 start_method: str = "spawn"):
+        """Configure le pool ; les processus démarrent au premier calcul."""
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.inline_threshold = inline_threshold
+        self._context = multiprocessing.get_context(start_method)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Calculs en cours ou en attente (file bornée)
+        self._slots = threading.BoundedSemaphore(
+            max_pending or 2 * self.max_workers)
+
+    @classmethod
+    def from_env(cls):
+        """Crée le pool si TRIANGULATOR_PROCESS_WORKERS > 0 (sinon None)."""
+        env = os.environ
+        workers = int(env.get("TRIANGULATOR_PROCESS_WORKERS", 0))
+        if workers <= 0:
+            return None
+        return cls(
+            max_workers=workers,
+            max_pending=int(env.get("TRIANGULATOR_PROCESS_QUEUE", 2 * workers)),
+            timeout=float(env.get("TRIANGULATOR_PROCESS_TIMEOUT", 60.0)),
+            inline_threshold=int(env.get("TRIANGULATOR_PROCESS_THRESHOLD",
+                                         20_000)),
+        )
+
+    def _get_pool(self):
+        """Crée le pool de processus à la demande."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=self._context)
+            return self._pool
+
+    def accepts(self, n_points: int) -> bool:
+        """Vrai si un PointSet de cette taille doit partir dans le pool."""
+        return n_points >= self.inline_threshold
+
+    def triangulate(self, points, engine: str = DEFAULT_ENGINE):
+        """Triangule `points` dans un processus du pool (liste de triplets)."""
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusy("File de triangulation pleine")
+
+        # Le binaire d'origine est recopié une seule fois, en mémoire partagée
+        if isinstance(points, codec.PointSet):
+            binary = points.vertex_section
+        else:
+            binary = codec.encode_pointset(points)
+        size = len(binary)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            shm.buf[:size] = binary
+            future = self._get_pool().submit(_triangulate_shared, shm.name, size,
+                                            engine)
+        except BaseException:
+            self._slots.release()
+            shm.close()
+            shm.unlink()
+            raise
+        # La place dans la file n'est rendue qu'à la fin réelle du calcul,
+        # même si on a cessé de l'attendre (délai dépassé)
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            indices = future.result(timeout=self.timeout)
+        except TimeoutError as e:
+            future.cancel()
+            raise TimeoutError(
+                f"Triangulation trop longue (> {self.timeout} s)") from e
+        finally:
+            shm.close()
+            shm.unlink()
+        return list(codec.TRIANGLE.iter_unpack(indices))
+
+    def shutdown(self):
+        """Arrête les processus du pool."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,211 @@
+"""Générateur de charge de bout en bout pour le Triangulator.
+
+1. Des PointSets sont générés (distributions du banc de mesure) et déposés
+   dans le PSM par `POST /pointset` (le PSM de substitution fait l'affaire),
+2. `GET /triangulation/{id}` est envoyé au Triangulator à un débit cible
+   pendant une durée donnée, en tournant sur ces PointSets,
+3. le rapport donne le débit atteint, les codes de réponse et les latences
+   (p50, p90, p99, max).
+
+La charge est en boucle ouverte : chaque requête part à son heure prévue,
+que les précédentes aient répondu ou non. La latence est comptée depuis
+cette heure prévue : une requête retardée faute de worker libre compte son
+attente (pas d'omission coordonnée, qui masquerait la saturation).
+
+Utilisation :
+    python -m src.triangulator.psm_stub --port 8080 &
+    python -m src.triangulator.loadgen --rps 20 --duration 30 --points 1000
+
+(Triangulator sur localhost:5000 et PSM sur localhost:8080 par défaut.)
+"""
+import argparse
+import http.client
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from . import codec
+from .benchmark import DISTRIBUTIONS
+from .triangulator import DEFAULT_ENGINE, ENGINES
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_TIMEOUT = 30.0
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, q: float) -> float:
+    """Renvoie le q-ième centile (rang le plus proche) de valeurs triées."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+def _connection(url: str, timeout: float):
+    """Ouvre une connexion HTTP(S) vers l'hôte d'une URL → (connexion, préfixe)."""
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError(f"URL invalide: {url}")
+    factory = (http.client.HTTPSConnection if parsed.scheme == "https"
+               else http.client.HTTPConnection)
+    return factory(parsed.hostname, parsed.port, timeout=timeout), \
+        parsed.path.rstrip("/")
+
+
+def upload_pointsets(psm_url: str, binaries, timeout: float = DEFAULT_TIMEOUT):
+    """Dépose des PointSets dans le PSM ; renvoie leurs identifiants."""
+    connection, prefix = _connection(psm_url, timeout)
+    identifiers = []
+    try:
+        for binary in binaries:
+            connection.request("POST", f"{prefix}/pointset", body=binary,
+                               headers={"Content-Type":
+                                        "application/octet-stream"})
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 201:
+                raise ConnectionError(
+                    f"Dépôt refusé par le PSM ({response.status}): {body!r}")
+            identifiers.append(json.loads(body)["pointSetId"])
+    finally:
+        connection.close()
+    return identifiers
+
+
+class LoadGenerator:
+    """Envoie des requêtes de triangulation à débit fixe et les mesure."""
+
+    def __init__(self, url: str, pointset_ids, engine: str = DEFAULT_ENGINE,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """Configure la cible ; une connexion keep-alive par worker."""
+        if not pointset_ids:
+            raise ValueError("Aucun PointSet à demander")
+        self.url = url
+        self.pointset_ids = list(pointset_ids)
+        self.engine = engine
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._statuses = {}
+        self._bytes = 0
+
+    def _path(self, pointset_id: str) -> str:
+        """Renvoie le chemin de la requête (moteur en paramètre si besoin)."""
+        path = f"/triangulation/{urllib.parse.quote(pointset_id)}"
+        if self.engine != DEFAULT_ENGINE:
+            path += f"?engine={self.engine}"
+        return path
+
+    def _send(self, pointset_id: str, scheduled: float):
+        """Envoie une requête et enregistre sa latence depuis l'heure prévue."""
+        local = self._local
+        if getattr(local, "connection", None) is None:
+            local.connection, local.prefix = _connection(self.url, self.timeout)
+        try:
+            local.connection.request("GET",
+                                     local.prefix + self._path(pointset_id))
+            response = local.connection.getresponse()
+            size = len(response.read())
+            status = str(response.status)
+        except (OSError, http.client.HTTPException) as error:
+            # Connexion à rouvrir pour la requête suivante de ce worker
+            local.connection.close()
+            local.connection = None
+            size = 0
+            status = type(error).__name__
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            self._latencies.append(latency)
+            self._statuses[status] = self._statuses.get(status, 0) + 1
+            self._bytes += size
+
+    def run(self, rps: float, duration: float):
+        """Envoie rps × duration requêtes en boucle ouverte ; renvoie le rapport."""
+        total = max(1, int(rps * duration))
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="loadgen") as pool:
+            start = time.perf_counter()
+            for index in range(total):
+                scheduled = start + index / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._send,
+                            self.pointset_ids[index % len(self.pointset_ids)],
+                            scheduled)
+        elapsed = time.perf_counter() - start
+        return self.report(rps, elapsed)
+
+    def report(self, rps: float, elapsed: float):
+        """Renvoie le résumé des requêtes terminées (latences en ms)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            statuses = dict(sorted(self._statuses.items()))
+            size = self._bytes
+        report = {
+            "target_rps": rps,
+            "requests": len(latencies),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+            "received_bytes": size,
+            "statuses": statuses,
+        }
+        for q in PERCENTILES:
+            report[f"p{q}_ms"] = round(percentile(latencies, q) * 1000, 3)
+        report["max_ms"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+        return report
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande ; renvoie 1 si une requête a échoué."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000",
+                        help="URL du Triangulator")
+    parser.add_argument("--psm-url", default="http://localhost:8080",
+                        help="URL du PSM où déposer les PointSets")
+    parser.add_argument("--ids", nargs="+",
+                        help="PointSetIDs existants (aucun dépôt dans le PSM)")
+    parser.add_argument("--pointsets", type=int, default=10,
+                        help="nombre de PointSets à déposer")
+    parser.add_argument("--points", type=int, default=1000,
+                        help="points par PointSet déposé")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS,
+                        default="uniform")
+    parser.add_argument("--engine", choices=ENGINES, default=DEFAULT_ENGINE)
+    parser.add_argument("--rps", type=float, default=10.0,
+                        help="débit cible (requêtes par seconde)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="durée de la charge (s)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--output", help="fichier JSON du rapport")
+    args = parser.parse_args(argv)
+
+    pointset_ids = args.ids
+    if not pointset_ids:
+        rng = random.Random(0)
+        binaries = [codec.encode_pointset(
+                        DISTRIBUTIONS[args.distribution](args.points, rng))
+                    for _ in range(args.pointsets)]
+        pointset_ids = upload_pointsets(args.psm_url, binaries, args.timeout)
+
+    generator = LoadGenerator(args.url, pointset_ids, args.engine,
+                              args.concurrency, args.timeout)
+    report = generator.run(args.rps, args.duration)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    return 0 if set(report["statuses"]) <= {"200"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
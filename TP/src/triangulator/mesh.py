@@ -0,0 +1,171 @@
+"""Triangulation de Delaunay modifiable (ajout et retrait de points).
+
+Un `DelaunayMesh` est construit une fois à partir d'un PointSet (ou relu
+depuis une structure Triangles déjà calculée), puis modifié sur place :
+
+- `insert(points)` ajoute des points : seule la cavité de chaque point est
+  re-triangulée (comme dans le moteur incrémental),
+- `remove(indices)` retire des points : seule l'étoile de chaque sommet
+  retiré est re-triangulée.
+
+Les indices des points restent stables tant que l'objet vit. `to_bytes`
+produit une structure Triangles où les points retirés sont omis (les
+indices y sont donc renumérotés).
+"""
+import random
+from array import array
+from itertools import chain
+
+from . import codec, delaunay
+
+
+class DelaunayMesh:
+    """Maillage de Delaunay conservé entre deux modifications."""
+
+    def __init__(self, points, triangles=None):
+        """Triangule les points, ou reprend des triangles déjà calculés."""
+        # Coordonnées arrondies en float32, comme dans le format binaire :
+        # to_bytes / from_bytes redonnent exactement le même maillage
+        coords = array('f', chain.from_iterable(points))
+        self.xs = array('d', coords[0::2])
+        self.ys = array('d', coords[1::2])
+        self.alive = bytearray(b'\x01') * len(self.xs)
+        self._rng = random.Random(0)
+        if triangles:
+            self._load(triangles)
+        else:
+            self._build()
+
+    @classmethod
+    def from_bytes(cls, binary):
+        """Relit une structure Triangles (sans refaire la triangulation)."""
+        return cls(codec.decode_pointset(binary), codec.decode_triangles(binary))
+
+    def __len__(self) -> int:
+        """Nombre de points présents (retirés non comptés)."""
+        return sum(self.alive)
+
+    def _build(self):
+        """(Re)triangule tous les points présents."""
+        xs, ys = self.xs, self.ys
+        engine = delaunay.IncrementalDelaunay(xs, ys)
+        self.engine = engine
+        self.xs, self.ys = engine.xs, engine.ys
+        # Doublons d'un sommet du maillage : (x, y) → indices en attente
+        self._hidden = {}
+        order = [i for i in delaunay.insertion_order(xs, ys) if self.alive[i]]
+        seeds = engine.start(order)
+        # Moins de 3 points non alignés : pas encore de triangle
+        self.started = seeds is not None
+        if self.started:
+            for i in order:
+                if i not in seeds:
+                    self._insert_vertex(i)
+
+    def _load(self, triangles):
+        """Reprend des triangles calculés ; insère les points non utilisés."""
+        engine = delaunay.IncrementalDelaunay(self.xs, self.ys)
+        self.engine = engine
+        self.xs, self.ys = engine.xs, engine.ys
+        self._hidden = {}
+        engine.load(triangles)
+        self.started = True
+        used = bytearray(len(self.xs))
+        for triangle in triangles:
+            for i in triangle:
+                used[i] = 1
+        for i, is_used in enumerate(used):
+            if not is_used:
+                self._insert_vertex(i)
+
+    def _insert_vertex(self, i):
+        """Insère le point i ; un doublon est mis de côté."""
+        if not self.engine.insert(i):
+            self._hidden.setdefault((self.xs[i], self.ys[i]), []).append(i)
+
+    def _hint(self, x, y):
+        """Choisit le départ de la marche : le plus proche d'un échantillon.
+
+        Sans cela, la marche partirait du dernier triangle modifié, qui peut
+        être à l'autre bout du nuage (O(√n) pas au lieu de quelques-uns).
+        """
+        engine, xs, ys = self.engine, self.xs, self.ys
+        v = engine.vertices
+        best, best_distance = None, None
+        for _ in range(int(engine.count ** (1 / 3)) + 1):
+            t = self._rng.randrange(engine.count)
+            a = v[3 * t]
+            # Triangle libre ou commençant par le sommet infini
+            if a < 0:
+                continue
+            distance = (xs[a] - x) ** 2 + (ys[a] - y) ** 2
+            if best is None or distance < best_distance:
+                best, best_distance = t, distance
+        if best is not None:
+            engine.last = best
+
+    def insert(self, points):
+        """Ajoute des points (x, y) ; renvoie leurs indices."""
+        first = len(self.xs)
+        coords = array('f', chain.from_iterable(points))
+        self.xs.extend(array('d', coords[0::2]))
+        self.ys.extend(array('d', coords[1::2]))
+        self.alive.extend(b'\x01' * (len(self.xs) - first))
+        self.engine.n_points = len(self.xs)
+        added = range(first, len(self.xs))
+
+        if not self.started:
+            self._build()
+            return added
+        for i in added:
+            self._hint(self.xs[i], self.ys[i])
+            self._insert_vertex(i)
+        return added
+
+    def remove(self, indices):
+        """Retire les points d'indices donnés (IndexError si absent)."""
+        indices = sorted(set(indices))
+        for i in indices:
+            if not 0 <= i < len(self.alive) or not self.alive[i]:
+                raise IndexError(f"Point {i} absent du maillage")
+
+        for i in indices:
+            self.alive[i] = 0
+            if not self.started:
+                continue
+            key = (self.xs[i], self.ys[i])
+            hidden = self._hidden.get(key)
+            if hidden and i in hidden:
+                # Doublon jamais inséré : rien à re-trianguler
+                hidden.remove(i)
+                continue
+
+            self._hint(*key)
+            if not self.engine.remove(i):
+                # Nuage restant dégénéré : on repart de zéro
+                self._build()
+                continue
+            if hidden:
+                # Un doublon du point retiré prend sa place
+                self._insert_vertex(hidden.pop())
+
+    def triangles(self):
+        """Renvoie les triangles (indices stables, plus petit indice d'abord)."""
+        if not self.started:
+            return []
+        return self.engine.triangles()
+
+    def to_bytes(self) -> bytes:
+        """Encode le maillage au format Triangles (points retirés omis)."""
+        xs, ys, alive = self.xs, self.ys, self.alive
+        number = array('i', [-1]) * len(alive)
+        points = []
+        for i, is_alive in enumerate(alive):
+            if is_alive:
+                number[i] = len(points)
+                points.append((xs[i], ys[i]))
+        # La renumérotation est croissante : le plus petit indice reste
+        # en tête de chaque triangle
+        triangles = [(number[a], number[b], number[c])
+                     for a, b, c in self.triangles()]
+        return codec.encode_triangles(points, triangles)
@@ -0,0 +1,249 @@
+"""Métriques du service au format texte Prometheus.
+
+- un histogramme de durée par étape du pipeline (cache, store, fetch,
+  decode, triangulate, reorder pour `?order=spatial`, encode, region pour
+  les requêtes `?bbox=`, compress pour les réponses compressées),
+- des compteurs : requêtes, points et triangles traités, tests de cercle
+  circonscrit, erreurs par catégorie, réponses HTTP par code,
+- les compteurs du cache de résultats et du stockage sur disque, lus au
+  moment de l'export.
+
+Chaque mesure coûte un appel à `perf_counter` et une addition sous verrou.
+Avec TRIANGULATOR_METRICS=0, le pipeline ne mesure plus rien et
+`/metrics` répond 404.
+
+Les tests de cercle circonscrit sont comptés dans le processus qui calcule :
+ceux des pools de processus (gros PointSets) n'apparaissent pas ici.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes des histogrammes de durée (secondes)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                    1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(names, values) -> str:
+    """Renvoie la partie `{a="x",b="y"}` d'une ligne d'export."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"'
+                     for name, value in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Compteur croissant, éventuellement découpé par étiquettes."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        """Crée un compteur vide."""
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *values):
+        """Ajoute `amount` à la série des étiquettes `values`."""
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def value(self, *values):
+        """Renvoie la valeur d'une série (0 si jamais incrémentée)."""
+        return self._values.get(values, 0)
+
+    def samples(self):
+        """Renvoie les lignes d'export de toutes les séries."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            yield f"{self.name}{_labels(self.labels, values)} {total}"
+
+
+class Histogram:
+    """Histogramme cumulatif (bornes fixes), par étiquettes."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(),
+                 buckets=DURATION_BUCKETS):
+        """Crée un histogramme vide."""
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # étiquettes → [compte par borne (+Inf compris), somme]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *values):
+        """Enregistre une mesure."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = [[0] * (len(self.buckets) + 1),
+                                                 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *values) -> int:
+        """Renvoie le nombre de mesures d'une série."""
+        series = self._series.get(values)
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self):
+        """Renvoie les lignes d'export (_bucket cumulés, _sum, _count)."""
+        with self._lock:
+            items = sorted((values, (list(counts), total))
+                           for values, (counts, total) in self._series.items())
+        for values, (counts, total) in items:
+            cumulated = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts,
+                                    strict=True):
+                cumulated += count
+                labels = _labels((*self.labels, "le"), (*values, bound))
+                yield f"{self.name}_bucket{labels} {cumulated}"
+            labels = _labels(self.labels, values)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulated}"
+
+
+class Registry:
+    """Ensemble des métriques d'un processus."""
+
+    def __init__(self, enabled: bool = True):
+        """Déclare les métriques du service."""
+        self.enabled = enabled
+        self.stage_duration = Histogram(
+            "triangulator_stage_duration_seconds",
+            "Durée de chaque étape du pipeline", ("stage",))
+        self.requests = Counter(
+            "triangulator_requests_total", "PointSets triangulés")
+        self.points = Counter(
+            "triangulator_points_total", "Points reçus dans les PointSets")
+        self.triangles = Counter(
+            "triangulator_triangles_total", "Triangles produits")
+        self.circumcircle_tests = Counter(
+            "triangulator_circumcircle_tests_total",
+            "Tests de cercle circonscrit effectués")
+        self.errors = Counter(
+            "triangulator_errors_total", "Erreurs du pipeline par catégorie",
+            ("code",))
+        self.responses = Counter(
+            "triangulator_http_responses_total", "Réponses HTTP par code",
+            ("status",))
+        self._metrics = [self.stage_duration, self.requests, self.points,
+                         self.triangles, self.circumcircle_tests, self.errors,
+                         self.responses]
+        # Sources lues à chaque export, par nom (une seule par nom)
+        self._collectors = {}
+
+    @classmethod
+    def from_env(cls):
+        """Crée le registre ; TRIANGULATOR_METRICS=0 désactive les mesures."""
+        return cls(enabled=os.environ.get("TRIANGULATOR_METRICS", "1") != "0")
+
+    def add_collector(self, name: str, collector):
+        """Ajoute une source lue à chaque export → (nom, type, aide, valeur)."""
+        self._collectors[name] = collector
+
+    def request_metrics(self):
+        """Renvoie les mesures d'une nouvelle requête (None si désactivé)."""
+        return RequestMetrics(self) if self.enabled else None
+
+    def render(self) -> str:
+        """Renvoie toutes les métriques au format texte Prometheus."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collector in self._collectors.values():
+            for name, kind, help, value in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def cache_collector(cache):
+    """Renvoie une source de métriques lisant les compteurs d'un ResultCache."""
+    def collect():
+        stats = cache.stats()
+        return [
+            ("triangulator_cache_hits_total", "counter",
+             "Résultats trouvés par PointSetID", stats["hits"]),
+            ("triangulator_cache_content_hits_total", "counter",
+             "Résultats trouvés par contenu", stats["content_hits"]),
+            ("triangulator_cache_misses_total", "counter",
+             "PointSetIDs absents du cache", stats["misses"]),
+            ("triangulator_cache_evictions_total", "counter",
+             "Résultats évincés", stats["evictions"]),
+            ("triangulator_cache_entries", "gauge",
+             "Résultats en cache", stats["entries"]),
+            ("triangulator_cache_bytes", "gauge",
+             "Taille du cache en octets", stats["bytes"]),
+        ]
+    return collect
+
+
+def store_collector(store):
+    """Renvoie une source de métriques lisant les compteurs d'un ResultStore."""
+    def collect():
+        stats = store.stats()
+        return [
+            ("triangulator_store_hits_total", "counter",
+             "Résultats lus sur disque par PointSetID", stats["hits"]),
+            ("triangulator_store_content_hits_total", "counter",
+             "Résultats lus sur disque par contenu", stats["content_hits"]),
+            ("triangulator_store_misses_total", "counter",
+             "PointSetIDs absents du stockage sur disque", stats["misses"]),
+            ("triangulator_store_evictions_total", "counter",
+             "Résultats supprimés du disque", stats["evictions"]),
+            ("triangulator_store_bytes", "gauge",
+             "Taille du stockage sur disque en octets", stats["bytes"]),
+        ]
+    return collect
+
+
+class RequestMetrics:
+    """Mesures d'une requête : durées par étape et taille du résultat."""
+
+    def __init__(self, registry):
+        """Prépare les mesures d'une requête."""
+        self.registry = registry
+        self.durations = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Chronomètre une étape (histogramme + en-tête Server-Timing)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + duration
+            self.registry.stage_duration.observe(duration, name)
+
+    def record_result(self, n_points: int, n_triangles: int):
+        """Compte un PointSet triangulé."""
+        self.registry.requests.inc()
+        self.registry.points.inc(n_points)
+        self.registry.triangles.inc(n_triangles)
+
+    def server_timing(self) -> str:
+        """Renvoie la valeur de l'en-tête Server-Timing (durées en ms)."""
+        return ", ".join(f"{name};dur={duration * 1000:.3f}"
+                         for name, duration in self.durations.items())
+
+
+# Registre du processus, partagé par les points d'entrée Flask et ASGI
+REGISTRY = Registry.from_env()
@@ -0,0 +1,245 @@
+"""Triangulation parallèle d'un très gros PointSet, par bandes verticales.
+
+Un seul processus Python ne peut utiliser qu'un cœur. Pour un très gros
+PointSet, on découpe le nuage en bandes verticales d'effectifs égaux, une par
+worker, et on recolle les morceaux :
+
+1. chaque bande est triangulée dans son processus. Un triangle dont le
+   cercle circonscrit tient strictement dans la bande est définitif : aucun
+   point d'une autre bande ne peut être dans ce cercle.
+2. les sommets des autres triangles, et ceux de l'enveloppe de chaque
+   bande, forment la "couture". Tout triangle de Delaunay global qui
+   n'est pas définitif a ses trois sommets dans la couture. On triangule
+   donc la couture (petite) dans le processus principal.
+3. parmi ces triangles, on garde ceux dont le cercle ne contient aucun
+   point du nuage. La vérification se fait bande par bande, en parallèle,
+   avec un index par grille.
+
+Le résultat est la même triangulation de Delaunay qu'en série (aux choix de
+diagonales près pour des points cocycliques).
+"""
+import bisect
+import math
+import multiprocessing
+import os
+import random
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .predicates import incircle, orient2d
+from .spatial import GridIndex
+from .triangulator import ENGINES
+
+# Taille de l'échantillon utilisé pour placer les limites des bandes
+SAMPLE_SIZE = 10_000
+
+# Marge relative sur les cercles calculés en flottants : un cercle proche
+# d'une limite de bande est traité comme non définitif (jamais l'inverse)
+SLACK = 1e-9
+
+
+def circumcircle(ax, ay, bx, by, cx, cy):
+    """Centre et rayon du cercle circonscrit → (x, y, r)."""
+    bx, by, cx, cy = bx - ax, by - ay, cx - ax, cy - ay
+    d = 2 * (bx * cy - by * cx)
+    if d == 0:
+        # Triangle trop plat pour les flottants : cercle "infini"
+        return ax, ay, math.inf
+    b2 = bx * bx + by * by
+    c2 = cx * cx + cy * cy
+    ux = (cy * b2 - by * c2) / d
+    uy = (bx * c2 - cx * b2) / d
+    return ax + ux, ay + uy, math.hypot(ux, uy)
+
+
+def inside_strip(x, r, lo, hi) -> bool:
+    """Vrai si un cercle (abscisse du centre x, rayon r) tient dans ]lo, hi[."""
+    slack = SLACK * (abs(x) + r)
+    return x - r - slack > lo and x + r + slack < hi
+
+
+def _normalized(a, b, c):
+    """Fait commencer le triangle par son plus petit indice (même orientation)."""
+    if a < b and a < c:
+        return a, b, c
+    if b < c:
+        return b, c, a
+    return c, a, b
+
+
+def _hull(xs, ys):
+    """Points du bord de l'enveloppe convexe, alignés compris (points triés)."""
+    lower, upper = [], []
+    for k in range(len(xs)):
+        while len(lower) >= 2 and orient2d(xs[lower[-2]], ys[lower[-2]],
+                                           xs[lower[-1]], ys[lower[-1]],
+                                           xs[k], ys[k]) < 0:
+            lower.pop()
+        lower.append(k)
+        while len(upper) >= 2 and orient2d(xs[upper[-2]], ys[upper[-2]],
+                                           xs[upper[-1]], ys[upper[-1]],
+                                           xs[k], ys[k]) > 0:
+            upper.pop()
+        upper.append(k)
+    return set(lower) | set(upper)
+
+
+def _triangulate_strip(engine, indices, xs, ys, lo, hi):
+    """Tâche d'un worker : triangule une bande → (définitifs, couture)."""
+    # Tri par (x, y) ; pour des doublons, on garde le plus petit indice
+    order = sorted(range(len(xs)), key=lambda k: (xs[k], ys[k], indices[k]))
+    kept = []
+    for k in order:
+        if kept and xs[k] == xs[kept[-1]] and ys[k] == ys[kept[-1]]:
+            continue
+        kept.append(k)
+    sx = [xs[k] for k in kept]
+    sy = [ys[k] for k in kept]
+    ids = [indices[k] for k in kept]
+
+    triangles = ENGINES[engine](sx, sy)
+
+    final = array('I')
+    seam = _hull(sx, sy) if triangles else set(range(len(kept)))
+    for a, b, c in triangles:
+        x, _, r = circumcircle(sx[a], sy[a], sx[b], sy[b], sx[c], sy[c])
+        if inside_strip(x, r, lo, hi):
+            final.extend(_normalized(ids[a], ids[b], ids[c]))
+        else:
+            seam.update((a, b, c))
+    return final, array('I', sorted(ids[k] for k in seam))
+
+
+def _reject_in_strip(xs, ys, candidates):
+    """Tâche d'un worker : numéros des candidats dont le cercle contient un point.
+
+    `candidates` enchaîne, pour chaque candidat : son numéro, les trois
+    sommets (x, y) et le cercle (x, y, r) du triangle.
+    """
+    grid = GridIndex(xs, ys)
+    rejected = array('I')
+    for start in range(0, len(candidates), 10):
+        number, ax, ay, bx, by, cx, cy, x, y, r = candidates[start:start + 10]
+        for k in grid.near_disk(x, y, r):
+            if incircle(ax, ay, bx, by, cx, cy, xs[k], ys[k]) > 0:
+                rejected.append(int(number))
+                break
+    return rejected
+
+
+class ParallelTriangulator:
+    """Triangulation d'un gros PointSet sur plusieurs processus."""
+
+    def __init__(self, workers: int = None, min_points: int = 200_000,
+                 timeout: float = 600.0, start_method: str = "spawn"):
+        """Configure le mode parallèle ; les processus démarrent au premier calcul."""
+        self.workers = workers or os.cpu_count() or 1
+        self.min_points = min_points
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Active le mode si TRIANGULATOR_PARALLEL_WORKERS > 1 (sinon None)."""
+        env = os.environ
+        workers = int(env.get("TRIANGULATOR_PARALLEL_WORKERS", 0))
+        if workers <= 1:
+            return None
+        return cls(
+            workers=workers,
+            min_points=int(env.get("TRIANGULATOR_PARALLEL_THRESHOLD", 200_000)),
+            timeout=float(env.get("TRIANGULATOR_PARALLEL_TIMEOUT", 600.0)),
+        )
+
+    def _get_pool(self):
+        """Crée le pool de processus à la demande."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=self._context)
+            return self._pool
+
+    def accepts(self, n_points: int) -> bool:
+        """Vrai si un PointSet de cette taille doit être découpé."""
+        return n_points >= self.min_points
+
+    def bounds(self, xs):
+        """Limites des bandes : quantiles de x, estimés sur un échantillon."""
+        sample = sorted(random.Random(0).sample(xs, min(len(xs), SAMPLE_SIZE)))
+        cuts = {sample[len(sample) * s // self.workers]
+                for s in range(1, self.workers)}
+        return sorted(cuts)
+
+    def triangulate(self, xs, ys, engine: str):
+        """Triangule (xs, ys) par bandes → triplets d'indices."""
+        pool = self._get_pool()
+
+        # ETAPE 1 : découpage en bandes, x dans [limits[s], limits[s + 1][
+        bounds = self.bounds(xs)
+        limits = [-math.inf, *bounds, math.inf]
+        members = [array('I') for _ in limits[1:]]
+        for i, x in enumerate(xs):
+            members[bisect.bisect_right(bounds, x)].append(i)
+        strips = [
+            (s, indices, array('d', (xs[i] for i in indices)),
+             array('d', (ys[i] for i in indices)))
+            for s, indices in enumerate(members) if indices
+        ]
+
+        # ETAPE 2 : chaque bande dans son processus
+        futures = [
+            pool.submit(_triangulate_strip, engine, indices, sx, sy,
+                        limits[s], limits[s + 1])
+            for s, indices, sx, sy in strips
+        ]
+        triangles = []
+        seam = set()
+        for future in futures:
+            final, seam_vertices = future.result(timeout=self.timeout)
+            triangles.extend(zip(final[0::3], final[1::3], final[2::3],
+                                 strict=True))
+            seam.update(seam_vertices)
+
+        # ETAPE 3 : triangulation de la couture
+        seam = sorted(seam)
+        candidates = []
+        for a, b, c in ENGINES[engine]([xs[i] for i in seam],
+                                       [ys[i] for i in seam]):
+            a, b, c = seam[a], seam[b], seam[c]
+            x, y, r = circumcircle(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c])
+            # Cercle dans une seule bande : triangle déjà produit par elle
+            s = bisect.bisect_right(bounds, x)
+            if inside_strip(x, r, limits[s], limits[s + 1]):
+                continue
+            candidates.append((a, b, c, x, y, r))
+
+        # ETAPE 4 : on écarte les candidats dont le cercle contient un point,
+        # chaque bande vérifiant ses propres points
+        futures = []
+        for s, _, sx, sy in strips:
+            lo, hi = limits[s], limits[s + 1]
+            batch = array('d')
+            for number, (a, b, c, x, y, r) in enumerate(candidates):
+                if x - r <= hi and x + r >= lo:
+                    batch.extend((number, xs[a], ys[a], xs[b], ys[b],
+                                  xs[c], ys[c], x, y, r))
+            if batch:
+                futures.append(pool.submit(_reject_in_strip, sx, sy, batch))
+        rejected = set()
+        for future in futures:
+            rejected.update(future.result(timeout=self.timeout))
+
+        triangles.extend(_normalized(a, b, c)
+                         for number, (a, b, c, _, _, _) in enumerate(candidates)
+                         if number not in rejected)
+        return triangles
+
+    def shutdown(self):
+        """Arrête les processus du pool."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
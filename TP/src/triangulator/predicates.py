@@ -0,0 +1,85 @@
+"""Prédicats géométriques robustes : orientation et cercle circonscrit.
+
+Chaque prédicat est d'abord évalué en flottants, avec une borne d'erreur
+(filtre de Shewchuk, "stage A"). Si le résultat est plus grand que cette
+borne, son signe est sûr et on le renvoie directement : c'est le cas courant,
+quasiment aussi rapide que le calcul flottant seul. Sinon (points presque
+alignés ou presque cocycliques), on refait le calcul exactement avec des
+fractions, ce qui est lent mais rare.
+
+Seul le signe du résultat a un sens.
+"""
+from fractions import Fraction
+
+# Epsilon machine pour les doubles (arrondi au plus proche) : 2^-53
+EPSILON = 2.0 ** -53
+
+# Bornes d'erreur relatives du calcul flottant (Shewchuk, 1997)
+CCW_ERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+ICC_ERRBOUND = (10.0 + 96.0 * EPSILON) * EPSILON
+
+
+def _sign(value) -> float:
+    """Renvoie -1.0, 0.0 ou 1.0 selon le signe d'une valeur exacte."""
+    return float((value > 0) - (value < 0))
+
+
+def orient2d_exact(ax, ay, bx, by, cx, cy) -> float:
+    """Signe exact de orient2d (calcul en fractions)."""
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return _sign((ax - cx) * (by - cy) - (ay - cy) * (bx - cx))
+
+
+def orient2d(ax, ay, bx, by, cx, cy) -> float:
+    """> 0 si a, b, c tournent dans le sens trigonométrique, < 0 sinon, 0 si alignés."""
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    det = detleft - detright
+    errbound = CCW_ERRBOUND * (abs(detleft) + abs(detright))
+    if det > errbound or -det > errbound:
+        return det
+    return orient2d_exact(ax, ay, bx, by, cx, cy)
+
+
+def incircle_exact(ax, ay, bx, by, cx, cy, dx, dy) -> float:
+    """Signe exact de incircle (calcul en fractions)."""
+    ax, ay, bx, by, cx, cy, dx, dy = map(Fraction, (ax, ay, bx, by, cx, cy, dx, dy))
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    return _sign((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+                 + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+                 + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def incircle(ax, ay, bx, by, cx, cy, dx, dy) -> float:
+    """> 0 si d est strictement dans le cercle de a, b, c (sens trigonométrique).
+
+    Le signe est inversé si a, b, c sont dans le sens horaire.
+    """
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+
+    bdxcdy = bdx * cdy
+    cdxbdy = cdx * bdy
+    alift = adx * adx + ady * ady
+
+    cdxady = cdx * ady
+    adxcdy = adx * cdy
+    blift = bdx * bdx + bdy * bdy
+
+    adxbdy = adx * bdy
+    bdxady = bdx * ady
+    clift = cdx * cdx + cdy * cdy
+
+    det = (alift * (bdxcdy - cdxbdy)
+           + blift * (cdxady - adxcdy)
+           + clift * (adxbdy - bdxady))
+    permanent = ((abs(bdxcdy) + abs(cdxbdy)) * alift
+                 + (abs(cdxady) + abs(adxcdy)) * blift
+                 + (abs(adxbdy) + abs(bdxady)) * clift)
+    errbound = ICC_ERRBOUND * permanent
+    if det > errbound or -det > errbound:
+        return det
+    return incircle_exact(ax, ay, bx, by, cx, cy, dx, dy)
@@ -0,0 +1,162 @@
+"""Profilage à la demande d'une requête de triangulation.
+
+Désactivé tant que TRIANGULATOR_PROFILE_DIR n'est pas défini : aucun coût.
+Une fois configuré, un appel à `triangulate_from_id` est profilé (cProfile)
+si la requête porte le jeton d'administration (en-tête `X-Profile-Token`
+ou paramètre `?profile=`, comparé à TRIANGULATOR_PROFILE_TOKEN), ou tiré au
+sort avec la probabilité TRIANGULATOR_PROFILE_RATE.
+
+Le nom du profil n'est renvoyé (en-tête `X-Profile`) qu'à l'administrateur
+qui a présenté le jeton ; pour une requête tirée au sort, il n'apparaît que
+dans le journal.
+
+Chaque profil produit trois fichiers de même nom dans le répertoire :
+
+- `.prof` : statistiques cProfile (pstats, snakeviz, gprof2dot...),
+- `.collapsed` : piles "a;b;c durée_µs" pour flamegraph.pl / speedscope,
+- `.json` : PointSetID, N, T, moteur et durées des étapes.
+
+cProfile ne garde que les arcs appelant → appelé : les piles du fichier
+`.collapsed` suivent, pour chaque fonction, son appelant principal. C'est
+une approximation, suffisante pour repérer où part le temps.
+"""
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+
+from . import codec
+
+logger = logging.getLogger(__name__)
+
+
+def _label(function) -> str:
+    """Renvoie le nom court d'une fonction pstats (fichier:ligne(nom))."""
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def collapsed_stacks(stats: pstats.Stats):
+    """Renvoie les lignes "pile durée_µs" du temps propre de chaque fonction."""
+    # Appelant principal de chaque fonction : celui qui y passe le plus de temps
+    parent = {}
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        if callers:
+            parent[function] = max(callers, key=lambda c: callers[c][3])
+
+    lines = []
+    for function, (_, _, own_time, _, _) in stats.stats.items():
+        microseconds = int(own_time * 1e6)
+        if microseconds == 0:
+            continue
+        stack = [function]
+        seen = {function}
+        while stack[-1] in parent and parent[stack[-1]] not in seen:
+            stack.append(parent[stack[-1]])
+            seen.add(stack[-1])
+        lines.append(";".join(_label(f) for f in reversed(stack))
+                     + f" {microseconds}")
+    return sorted(lines)
+
+
+class RequestProfiler:
+    """Profile une requête choisie et écrit les fichiers du profil."""
+
+    def __init__(self, directory: str, token: str = "", rate: float = 0.0):
+        """Configure le répertoire, le jeton d'administration et le taux."""
+        self.directory = directory
+        self.token = token
+        self.rate = rate
+        self._random = random.Random()
+        # Un seul profil à la fois : les autres requêtes passent normalement
+        self._busy = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Active le profilage si TRIANGULATOR_PROFILE_DIR est défini (sinon None)."""
+        env = os.environ
+        directory = env.get("TRIANGULATOR_PROFILE_DIR")
+        if not directory:
+            return None
+        return cls(
+            directory=directory,
+            token=env.get("TRIANGULATOR_PROFILE_TOKEN", ""),
+            rate=float(env.get("TRIANGULATOR_PROFILE_RATE", 0.0)),
+        )
+
+    def authorized(self, token) -> bool:
+        """Vrai si `token` est le jeton d'administration."""
+        return bool(token and self.token
+                    and hmac.compare_digest(token, self.token))
+
+    def wants(self, token) -> bool:
+        """Vrai si la requête doit être profilée (jeton valide ou tirage)."""
+        if self.authorized(token):
+            return True
+        return self.rate > 0 and self._random.random() < self.rate
+
+    def run(self, pointset_id: str, engine: str, metrics, call):
+        """Exécute `call()` sous cProfile → (résultat, nom du profil ou None).
+
+        Si un autre profil est en cours, l'appel n'est pas profilé. Une
+        erreur d'écriture du profil (disque plein, droits) est journalisée
+        sans faire échouer la requête, dont le résultat est déjà calculé.
+        """
+        if not self._busy.acquire(blocking=False):
+            return call(), None
+        try:
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                result = call()
+            finally:
+                profile.disable()
+                duration = time.perf_counter() - start
+            try:
+                name = self._write(profile, pointset_id, engine, metrics,
+                                   duration, result)
+            except OSError:
+                logger.exception("Profil de %s non écrit dans %s",
+                                 pointset_id, self.directory)
+                return result, None
+            logger.info("Profil de %s écrit : %s", pointset_id, name)
+            return result, name
+        finally:
+            self._busy.release()
+
+    def _write(self, profile, pointset_id, engine, metrics, duration, result):
+        """Écrit les fichiers .prof, .collapsed et .json ; renvoie leur nom."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{pointset_id}"
+        base = os.path.join(self.directory, name)
+
+        profile.dump_stats(base + ".prof")
+        stats = pstats.Stats(profile)
+        with open(base + ".collapsed", "w", encoding="utf-8") as file:
+            file.write("\n".join(collapsed_stacks(stats)) + "\n")
+
+        # N et T se lisent dans les en-têtes de la réponse Triangles
+        n = codec.HEADER.unpack_from(result)[0]
+        t = codec.HEADER.unpack_from(result, codec.HEADER.size
+                                     + n * codec.POINT.size)[0]
+        durations = metrics.durations if metrics is not None else {}
+        summary = {
+            "pointSetId": pointset_id,
+            "engine": engine,
+            "points": n,
+            "triangles": t,
+            "duration_ms": round(duration * 1000, 3),
+            "stages_ms": {stage: round(d * 1000, 3)
+                          for stage, d in durations.items()},
+        }
+        with open(base + ".json", "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+        return name
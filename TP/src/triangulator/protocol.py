@@ -0,0 +1,96 @@
+"""Éléments communs aux points d'entrée HTTP (Flask et ASGI)."""
+
+import uuid
+
+from .content_encoding import TRANSFORMS
+from .metrics import REGISTRY
+from .reorder import ORDERS
+from .triangulator import ENGINES
+
+BAD_REQUEST = {
+    "code": "BAD_REQUEST",
+    "message": "Invalid ID format"
+}
+
+
+def is_valid_uuid(value: str) -> bool:
+    """Vérifie si une chaîne est un UUID valide."""
+    try:
+        uuid.UUID(value)
+        return True
+    except ValueError:
+        return False
+
+
+def unknown_engine(engine: str) -> dict:
+    """Corps d'erreur 400 pour un paramètre `engine` inconnu."""
+    return {
+        "code": "BAD_REQUEST",
+        "message": f"Unknown engine '{engine}', expected one of: "
+                   + ", ".join(ENGINES)
+    }
+
+
+def unknown_order(order: str) -> dict:
+    """Corps d'erreur 400 pour un paramètre `order` inconnu."""
+    return {
+        "code": "BAD_REQUEST",
+        "message": f"Unknown order '{order}', expected one of: "
+                   + ", ".join(ORDERS)
+    }
+
+
+def invalid_bbox(bbox: str) -> dict:
+    """Corps d'erreur 400 pour un paramètre `bbox` mal formé."""
+    return {
+        "code": "BAD_REQUEST",
+        "message": f"Invalid bbox '{bbox}', expected minx,miny,maxx,maxy "
+                   "with min <= max"
+    }
+
+
+def unknown_transform(transform: str) -> dict:
+    """Corps d'erreur 400 pour un en-tête `X-Triangles-Transform` inconnu."""
+    return {
+        "code": "BAD_REQUEST",
+        "message": f"Unknown transform '{transform}', expected one of: "
+                   + ", ".join(TRANSFORMS)
+    }
+
+
+def invalid_batch(max_items: int) -> dict:
+    """Corps d'erreur 400 pour un corps de requête batch invalide."""
+    return {
+        "code": "BAD_REQUEST",
+        "message": "Expected a JSON array of at most "
+                   f"{max_items} PointSetIDs"
+    }
+
+
+NOT_FOUND_ROUTE = {
+    "code": "NOT_FOUND",
+    "message": "Unknown route"
+}
+
+
+def error_payload(error: Exception):
+    """Associe une erreur du pipeline à (code HTTP, corps JSON d'erreur)."""
+    if isinstance(error, FileNotFoundError):
+        status, payload = 404, {
+            "code": "NOT_FOUND",
+            "message": "PointSet not found"
+        }
+    elif isinstance(error, ValueError):
+        status, payload = 500, {
+            "code": "TRIANGULATION_FAILED",
+            "message": str(error)
+        }
+    else:
+        status, payload = 503, {
+            "code": "SERVICE_UNAVAILABLE",
+            "message": f"Unexpected error: {error}"
+        }
+
+    if REGISTRY.enabled:
+        REGISTRY.errors.inc(1, payload["code"])
+    return status, payload
@@ -0,0 +1,372 @@
+"""Client HTTP du PointSetManager (PSM).
+
+Le client garde un pool de connexions keep-alive partagé entre les requêtes
+et les threads : on évite d'ouvrir une nouvelle connexion TCP par PointSet.
+
+Correspondance des erreurs (inchangée) :
+- 404            -> FileNotFoundError
+- 503 / réseau   -> ConnectionError (après quelques essais avec backoff),
+  y compris un corps tronqué par rapport au N annoncé
+- autres codes   -> ValueError
+"""
+import asyncio
+import http.client
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+from .codec import HEADER, POINT
+
+DEFAULT_BASE_URL = "http://localhost:8080"
+
+# Taille des lectures quand la taille du corps n'est pas confirmée
+READ_CHUNK = 1 << 16
+
+
+def read_pointset(response) -> bytearray:
+    """Lit un PointSet binaire au fil de l'eau depuis une réponse HTTP.
+
+    Le header donne N. Si le Content-Length le confirme, on préalloue
+    directement header + N * 8 octets et on remplit ce tampon avec `readinto`
+    pendant que le réseau livre les données, sans copie intermédiaire. Sans
+    Content-Length (réponse chunked), N n'est pas vérifiable : le tampon
+    grandit au rythme des données reçues, jamais d'après N seul. Un corps
+    tronqué est rejeté dès que possible.
+    """
+    header = response.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise http.client.IncompleteRead(header, HEADER.size - len(header))
+    size = HEADER.size + HEADER.unpack(header)[0] * POINT.size
+
+    # Le Content-Length annoncé permet de détecter une troncature avant lecture
+    length = response.getheader("Content-Length")
+    if length is not None:
+        if int(length) < size:
+            raise http.client.IncompleteRead(header, size - HEADER.size)
+        if int(length) > size:
+            raise ValueError("Taille du PointSet incohérente avec son header")
+    else:
+        buffer = bytearray(header)
+        while len(buffer) < size:
+            chunk = response.read(min(size - len(buffer), READ_CHUNK))
+            if not chunk:
+                raise http.client.IncompleteRead(b"", size - len(buffer))
+            buffer += chunk
+        return buffer
+
+    buffer = bytearray(size)
+    buffer[:HEADER.size] = header
+    view = memoryview(buffer)
+    position = HEADER.size
+    while position < size:
+        received = response.readinto(view[position:])
+        if not received:
+            raise http.client.IncompleteRead(b"", size - position)
+        position += received
+    return buffer
+
+
+class PSMClient:
+    """Client du PSM avec pool de connexions, timeouts et reprises."""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = 8,
+                 connect_timeout: float = 2.0, read_timeout: float = 10.0,
+                 retries: int = 2, backoff: float = 0.1):
+        """Configure le client ; les connexions sont ouvertes à la demande."""
+        parsed = urllib.parse.urlsplit(base_url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"URL du PSM invalide: {base_url}")
+        self.base_url = base_url
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._prefix = parsed.path.rstrip("/")
+
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        # Connexions libres, réutilisées en priorité (LIFO = les plus chaudes)
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    @classmethod
+    def from_env(cls):
+        """Crée un client configuré par les variables d'environnement PSM_*."""
+        env = os.environ
+        return cls(
+            base_url=env.get("PSM_BASE_URL", DEFAULT_BASE_URL),
+            pool_size=int(env.get("PSM_POOL_SIZE", 8)),
+            connect_timeout=float(env.get("PSM_CONNECT_TIMEOUT", 2.0)),
+            read_timeout=float(env.get("PSM_READ_TIMEOUT", 10.0)),
+            retries=int(env.get("PSM_RETRIES", 2)),
+            backoff=float(env.get("PSM_BACKOFF", 0.1)),
+        )
+
+    def _acquire(self):
+        """Prend une connexion libre dans le pool ou en ouvre une nouvelle."""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            connection_class = (http.client.HTTPSConnection if self._https
+                                else http.client.HTTPConnection)
+            return connection_class(self._host, self._port,
+                                    timeout=self.connect_timeout)
+
+    def _release(self, connection):
+        """Rend une connexion au pool (ou la ferme si le pool est plein)."""
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        """Ferme toutes les connexions du pool."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _request(self, path: str):
+        """Fait un GET et renvoie (statut, raison, corps)."""
+        connection = self._acquire()
+        try:
+            if connection.sock is None:
+                # Le timeout de connexion s'applique ici,
+                # celui de lecture pour la suite des échanges
+                connection.connect()
+                connection.sock.settimeout(self.read_timeout)
+            connection.request("GET", path,
+                               headers={"Accept": "application/octet-stream"})
+            response = connection.getresponse()
+            if response.status == 200:
+                body = read_pointset(response)
+            else:
+                body = response.read()
+        except BaseException:
+            # Réponse lue à moitié : la connexion n'est plus réutilisable
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        return response.status, response.reason, body
+
+    def get_pointset(self, pointset_id: str) -> bytes:
+        """Récupère le PointSet binaire `pointset_id` auprès du PSM."""
+        path = f"{self._prefix}/pointset/{urllib.parse.quote(pointset_id)}"
+
+        for attempt in range(self.retries + 1):
+            last_try = attempt == self.retries
+            try:
+                status, reason, body = self._request(path)
+            except (OSError, http.client.HTTPException) as e:
+                # Connexion refusée, coupée ou keep-alive expiré : on réessaie
+                if last_try:
+                    raise ConnectionError(
+                        f"Impossible de joindre le PSM: {e}") from e
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            if status == 200:
+                return body
+            if status == 404:
+                raise FileNotFoundError(f"PointSet {pointset_id} introuvable")
+            if status == 503:
+                if last_try:
+                    raise ConnectionError("PointSetManager en maintenance")
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            raise ValueError(f"Erreur HTTP {status}: {reason}")
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> PSMClient:
+    """Renvoie le client partagé du processus (configuré par l'environnement)."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = PSMClient.from_env()
+        return _default_client
+
+
+# Erreurs réseau / protocole qui justifient une reprise
+_NETWORK_ERRORS = (OSError, EOFError, http.client.HTTPException)
+
+
+async def _read_head(reader):
+    """Lit la ligne de statut et les en-têtes d'une réponse HTTP/1.1."""
+    status_line = (await reader.readline()).decode("latin-1").strip()
+    parts = status_line.split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise http.client.BadStatusLine(status_line)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), parts[2] if len(parts) > 2 else "", headers
+
+
+async def _read_chunked(reader) -> bytearray:
+    """Lit un corps en Transfer-Encoding: chunked."""
+    body = bytearray()
+    while True:
+        size = int((await reader.readline()).split(b";")[0], 16)
+        if size == 0:
+            await reader.readline()
+            return body
+        body += await reader.readexactly(size)
+        await reader.readline()
+
+
+async def _read_body(reader, status: int, headers: dict):
+    """Lit le corps ; pour un PointSet, vérifie la taille dès le header."""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = await _read_chunked(reader)
+    elif "content-length" in headers:
+        length = int(headers["content-length"])
+        if status != 200 or length < HEADER.size:
+            body = await reader.readexactly(length)
+        else:
+            # Même contrôle que read_pointset : N est connu dès le header
+            header = await reader.readexactly(HEADER.size)
+            size = HEADER.size + HEADER.unpack(header)[0] * POINT.size
+            if length < size:
+                raise http.client.IncompleteRead(header, size - HEADER.size)
+            if length > size:
+                raise ValueError("Taille du PointSet incohérente avec son header")
+            body = bytearray(header)
+            body += await reader.readexactly(size - HEADER.size)
+    else:
+        body = await reader.read()
+
+    if status == 200:
+        if len(body) < HEADER.size:
+            raise http.client.IncompleteRead(bytes(body), HEADER.size)
+        size = HEADER.size + HEADER.unpack_from(body)[0] * POINT.size
+        if len(body) != size:
+            raise http.client.IncompleteRead(b"", size - len(body))
+    return body
+
+
+class AsyncPSMClient:
+    """Client non bloquant du PSM (asyncio) avec connexions keep-alive.
+
+    Même correspondance des erreurs que `PSMClient`. Les requêtes en attente
+    du PSM ne consomment qu'une coroutine, pas un thread.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_connections: int = 64,
+                 connect_timeout: float = 2.0, read_timeout: float = 10.0,
+                 retries: int = 2, backoff: float = 0.1):
+        """Configure le client ; les connexions sont ouvertes à la demande."""
+        parsed = urllib.parse.urlsplit(base_url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"URL du PSM invalide: {base_url}")
+        self.base_url = base_url
+        self._https = parsed.scheme == "https"
+        self._host = parsed.hostname
+        self._port = parsed.port or (443 if self._https else 80)
+        self._prefix = parsed.path.rstrip("/")
+
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self._idle = []
+        self._limit = None
+
+    @classmethod
+    def from_env(cls):
+        """Crée un client configuré par les variables d'environnement PSM_*."""
+        env = os.environ
+        return cls(
+            base_url=env.get("PSM_BASE_URL", DEFAULT_BASE_URL),
+            max_connections=int(env.get("PSM_MAX_CONNECTIONS", 64)),
+            connect_timeout=float(env.get("PSM_CONNECT_TIMEOUT", 2.0)),
+            read_timeout=float(env.get("PSM_READ_TIMEOUT", 10.0)),
+            retries=int(env.get("PSM_RETRIES", 2)),
+            backoff=float(env.get("PSM_BACKOFF", 0.1)),
+        )
+
+    async def _request(self, path: str):
+        """Fait un GET et renvoie (statut, raison, corps)."""
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_connections)
+
+        async with self._limit:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host, self._port,
+                                            ssl=self._https or None),
+                    self.connect_timeout)
+            try:
+                writer.write(
+                    f"GET {path} HTTP/1.1\r\n"
+                    f"Host: {self._host}:{self._port}\r\n"
+                    "Accept: application/octet-stream\r\n"
+                    "\r\n".encode("latin-1"))
+                await writer.drain()
+                status, reason, headers = await asyncio.wait_for(
+                    _read_head(reader), self.read_timeout)
+                body = await asyncio.wait_for(
+                    _read_body(reader, status, headers), self.read_timeout)
+            except BaseException:
+                writer.close()
+                raise
+
+            reusable = (headers.get("connection", "").lower() != "close"
+                        and ("content-length" in headers
+                             or "transfer-encoding" in headers))
+            if reusable:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, reason, bytes(body) if status != 200 else body
+
+    async def get_pointset(self, pointset_id: str):
+        """Récupère le PointSet binaire `pointset_id` auprès du PSM."""
+        path = f"{self._prefix}/pointset/{urllib.parse.quote(pointset_id)}"
+
+        for attempt in range(self.retries + 1):
+            last_try = attempt == self.retries
+            try:
+                status, reason, body = await self._request(path)
+            except _NETWORK_ERRORS as e:
+                if last_try:
+                    raise ConnectionError(
+                        f"Impossible de joindre le PSM: {e}") from e
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            if status == 200:
+                return body
+            if status == 404:
+                raise FileNotFoundError(f"PointSet {pointset_id} introuvable")
+            if status == 503:
+                if last_try:
+                    raise ConnectionError("PointSetManager en maintenance")
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+            raise ValueError(f"Erreur HTTP {status}: {reason}")
+
+    async def close(self):
+        """Ferme les connexions inactives."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
@@ -0,0 +1,216 @@
+"""PointSetManager de substitution, en local (voir point_set_manager.yml).
+
+- `POST /pointset` enregistre un PointSet binaire → 201 {"pointSetId": ...},
+- `GET /pointset/{pointSetId}` le renvoie (400 identifiant invalide,
+  404 inconnu).
+
+Les PointSets sont gardés en mémoire, ou dans un répertoire (un fichier par
+PointSet) pour survivre à un redémarrage. Pour les mesures de bout en bout,
+on peut injecter une latence (fixe + aléatoire) et une proportion de
+réponses 503. Les connexions sont keep-alive (HTTP/1.1), comme celles du
+`PSMClient`.
+
+Lancement :
+    python -m src.triangulator.psm_stub --port 8080 --latency 0.02 --error-rate 0.01
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .codec import HEADER, POINT
+from .protocol import is_valid_uuid
+
+ROUTE = "/pointset"
+
+
+def _error(code: str, message: str) -> bytes:
+    """Renvoie un corps d'erreur JSON au format du PSM."""
+    return json.dumps({"code": code, "message": message}).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Répond aux requêtes du PSM de substitution."""
+
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps partent en deux écritures : sans cela, Nagle et
+    # l'ACK retardé ajoutent ~40 ms à chaque réponse
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802 - nom imposé par http.server
+        """Renvoie le PointSet demandé."""
+        stub = self.server.stub
+        if not self.path.startswith(ROUTE + "/"):
+            self._reply(404, _error("NOT_FOUND", "Unknown route"))
+            return
+        pointset_id = urllib.parse.unquote(self.path[len(ROUTE) + 1:])
+        if not is_valid_uuid(pointset_id):
+            self._reply(400, _error("BAD_REQUEST", "Invalid ID format"))
+            return
+        if stub.inject():
+            self._reply(503, _error("SERVICE_UNAVAILABLE", "Injected failure"))
+            return
+        binary = stub.get(pointset_id)
+        if binary is None:
+            self._reply(404, _error("NOT_FOUND", "PointSet not found"))
+            return
+        self._reply(200, binary, "application/octet-stream")
+
+    def do_POST(self):  # noqa: N802 - nom imposé par http.server
+        """Enregistre un nouveau PointSet."""
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path != ROUTE:
+            self._reply(404, _error("NOT_FOUND", "Unknown route"))
+            return
+        if (len(body) < HEADER.size
+                or len(body) != HEADER.size
+                + HEADER.unpack_from(body)[0] * POINT.size):
+            self._reply(400, _error("BAD_REQUEST", "Invalid PointSet format"))
+            return
+        if stub.inject():
+            self._reply(503, _error("SERVICE_UNAVAILABLE", "Injected failure"))
+            return
+        pointset_id = str(uuid.uuid4())
+        stub.add(pointset_id, body)
+        self._reply(201, json.dumps({"pointSetId": pointset_id}).encode())
+
+    def _reply(self, status: int, body: bytes,
+               content_type: str = "application/json"):
+        """Envoie une réponse complète."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Pas de journal par requête (les mesures seraient faussées)."""
+
+
+class StubPSM:
+    """Serveur PSM local, démarré dans un thread."""
+
+    def __init__(self, pointsets=None, host: str = "127.0.0.1", port: int = 0,
+                 directory: str = None, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed=None):
+        """Prépare le serveur ; port 0 = port libre choisi par le système.
+
+        `latency` + un tirage uniforme dans [0, `jitter`] secondes est
+        ajouté à chaque requête ; `error_rate` est la proportion de 503.
+        """
+        self.host = host
+        self.port = port
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pointsets = {}
+        self._server = None
+        self._thread = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for pointset_id, binary in (pointsets or {}).items():
+            self.add(pointset_id, binary)
+
+    @property
+    def base_url(self) -> str:
+        """URL à donner au `PSMClient` (PSM_BASE_URL)."""
+        return f"http://{self.host}:{self.port}"
+
+    def _path(self, pointset_id: str) -> str:
+        """Fichier d'un PointSet dans le répertoire de stockage."""
+        return os.path.join(self.directory, f"{pointset_id}.bin")
+
+    def add(self, pointset_id: str, binary: bytes):
+        """Ajoute (ou remplace) un PointSet servi."""
+        if not self.directory:
+            self._pointsets[pointset_id] = bytes(binary)
+            return
+        # Écriture atomique : un lecteur ne voit jamais un fichier partiel
+        temporary = self._path(pointset_id) + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(binary)
+        os.replace(temporary, self._path(pointset_id))
+
+    def get(self, pointset_id: str):
+        """Renvoie le binaire d'un PointSet (None si inconnu)."""
+        if not self.directory:
+            return self._pointsets.get(pointset_id)
+        try:
+            with open(self._path(pointset_id), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def inject(self) -> bool:
+        """Applique la latence ; renvoie True si la requête doit échouer (503)."""
+        with self._lock:
+            delay = self.latency + self._random.random() * self.jitter
+            failed = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    def start(self):
+        """Démarre le serveur en arrière-plan ; renvoie self."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        """Démarre le serveur (bloc `with`)."""
+        return self.start()
+
+    def __exit__(self, *exc):
+        """Arrête le serveur à la sortie du bloc."""
+        self.stop()
+
+
+def main(argv=None):
+    """Lance le PSM de substitution au premier plan (Ctrl-C pour arrêter)."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--directory", help="stockage sur disque (sinon mémoire)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="latence fixe ajoutée (s)")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="latence aléatoire ajoutée, au plus (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="proportion de réponses 503")
+    args = parser.parse_args(argv)
+
+    stub = StubPSM(host=args.host, port=args.port, directory=args.directory,
+                   latency=args.latency, jitter=args.jitter,
+                   error_rate=args.error_rate).start()
+    print(f"PSM de substitution sur {stub.base_url}")
+    try:
+        stub._thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
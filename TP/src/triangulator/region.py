@@ -0,0 +1,154 @@
+"""Extraction d'une sous-région (`?bbox=`) d'une triangulation.
+
+Un client cartographique n'affiche que les triangles de sa fenêtre : au
+lieu de la triangulation complète, on renvoie une structure Triangles
+compacte, réduite aux triangles qui touchent le rectangle demandé et aux
+seuls sommets qu'ils utilisent (renumérotés).
+
+L'index (`TriangleGrid` sur les boîtes englobantes des triangles) est
+construit une fois par triangulation, puis gardé dans un petit cache LRU
+borné en octets (taille estimée de chaque index) : les déplacements
+successifs de la fenêtre ne coûtent qu'une requête dans la grille. Un index
+plus gros que tout le cache sert à une seule extraction, sans être gardé.
+"""
+import math
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from . import codec
+from .spatial import TriangleGrid
+
+DEFAULT_MAX_INDEXES = 8
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def parse_bbox(value: str):
+    """Lit "minx,miny,maxx,maxy" → (min_x, min_y, max_x, max_y) (ValueError sinon)."""
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError(f"Invalid bbox '{value}'")
+    min_x, min_y, max_x, max_y = (float(part) for part in parts)
+    if not all(math.isfinite(v) for v in (min_x, min_y, max_x, max_y)):
+        raise ValueError(f"Invalid bbox '{value}'")
+    if min_x > max_x or min_y > max_y:
+        raise ValueError(f"Invalid bbox '{value}'")
+    return min_x, min_y, max_x, max_y
+
+
+def _meets_box(xa, ya, xb, yb, xc, yc, min_x, min_y, max_x, max_y) -> bool:
+    """Vrai si le triangle touche le rectangle (théorème de l'axe séparateur)."""
+    if (max(xa, xb, xc) < min_x or min(xa, xb, xc) > max_x
+            or max(ya, yb, yc) < min_y or min(ya, yb, yc) > max_y):
+        return False
+    corners = ((min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y))
+    for px, py, qx, qy, rx, ry in ((xa, ya, xb, yb, xc, yc),
+                                   (xb, yb, xc, yc, xa, ya),
+                                   (xc, yc, xa, ya, xb, yb)):
+        # Côté pq : le triangle est du côté de r ; si les quatre coins sont
+        # strictement de l'autre côté, ce côté sépare les deux formes
+        side = (qx - px) * (ry - py) - (qy - py) * (rx - px)
+        if all(side * ((qx - px) * (y - py) - (qy - py) * (x - px)) < 0
+               for x, y in corners):
+            return False
+    return True
+
+
+class RegionIndex:
+    """Index des triangles d'une structure Triangles déjà encodée."""
+
+    def __init__(self, binary):
+        """Relit sommets et triangles, puis range les triangles dans la grille."""
+        n = codec.HEADER.unpack_from(binary)[0]
+        position = codec.HEADER.size + n * codec.POINT.size
+        t = codec.HEADER.unpack_from(binary, position)[0]
+        coords = array("f", bytes(memoryview(binary)[codec.HEADER.size:position]))
+        triangles = array("I")
+        start = position + codec.HEADER.size
+        triangles.frombytes(
+            memoryview(binary)[start:start + t * codec.TRIANGLE.size])
+        if sys.byteorder != "little":  # pragma: no cover - machines big-endian
+            coords.byteswap()
+            triangles.byteswap()
+        self.xs = coords[0::2]
+        self.ys = coords[1::2]
+        self.triangles = triangles
+        self.grid = TriangleGrid(self.xs, self.ys, triangles)
+        self.nbytes = self._estimate_size()
+
+    def _estimate_size(self) -> int:
+        """Estime la mémoire occupée par l'index (tableaux et grille), en octets."""
+        cells = self.grid.cells
+        size = sum(a.buffer_info()[1] * a.itemsize
+                   for a in (self.xs, self.ys, self.triangles))
+        size += sys.getsizeof(cells)
+        # Une liste et une clé entière par cellule, puis un entier par triangle
+        size += sum(sys.getsizeof(bucket) for bucket in cells.values())
+        size += len(cells) * sys.getsizeof(2**40)
+        size += len(self.triangles) // 3 * sys.getsizeof(2**40)
+        return size
+
+    def extract(self, bbox) -> bytes:
+        """Renvoie la structure Triangles réduite au rectangle (renumérotée)."""
+        xs, ys, triangles = self.xs, self.ys, self.triangles
+        selected = []
+        for k in sorted(self.grid.in_box(*bbox)):
+            a, b, c = triangles[3 * k], triangles[3 * k + 1], triangles[3 * k + 2]
+            if _meets_box(xs[a], ys[a], xs[b], ys[b], xs[c], ys[c], *bbox):
+                selected.append((a, b, c))
+
+        # Renumérotation croissante : l'ordre des sommets de chaque triangle
+        # (et donc son orientation) est conservé
+        used = sorted({i for triangle in selected for i in triangle})
+        number = {i: k for k, i in enumerate(used)}
+        points = [(xs[i], ys[i]) for i in used]
+        return codec.encode_triangles(
+            points, [(number[a], number[b], number[c]) for a, b, c in selected])
+
+
+class RegionCache:
+    """Cache LRU des index de région, par clé de résultat, borné en octets."""
+
+    def __init__(self, max_indexes: int = DEFAULT_MAX_INDEXES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """Garde au plus `max_indexes` index, et `max_bytes` octets estimés."""
+        self.max_indexes = max_indexes
+        self.max_bytes = max_bytes
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+
+    @classmethod
+    def from_env(cls):
+        """Crée le cache (TRIANGULATOR_REGION_INDEXES / _REGION_MAX_BYTES)."""
+        return cls(
+            max_indexes=int(os.environ.get("TRIANGULATOR_REGION_INDEXES",
+                                           DEFAULT_MAX_INDEXES)),
+            max_bytes=int(os.environ.get("TRIANGULATOR_REGION_MAX_BYTES",
+                                         DEFAULT_MAX_BYTES)),
+        )
+
+    def extract(self, key: str, bbox, compute) -> bytes:
+        """Extrait la région ; `compute()` fournit la triangulation si besoin."""
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+        if index is None:
+            # Construction hors verrou : les autres régions restent servies
+            index = RegionIndex(compute())
+            # Trop gros pour le cache : il ne sert qu'à cette extraction
+            if index.nbytes <= self.max_bytes:
+                with self._lock:
+                    previous = self._indexes.pop(key, None)
+                    if previous is not None:
+                        self.size -= previous.nbytes
+                    self._indexes[key] = index
+                    self.size += index.nbytes
+                    while (len(self._indexes) > self.max_indexes
+                           or self.size > self.max_bytes):
+                        _, evicted = self._indexes.popitem(last=False)
+                        self.size -= evicted.nbytes
+        return index.extract(bbox)
@@ -0,0 +1,167 @@
+"""Réordonnancement du maillage produit, pour les traitements en aval.
+
+Les moteurs numérotent les sommets comme le PointSet d'entrée (souvent au
+hasard) et rendent les triangles dans l'ordre de leur structure interne.
+Un client qui parcourt le maillage (calcul de normales, d'aires, rendu)
+saute alors partout en mémoire, et les indices compressent mal.
+
+L'ordre "spatial" (`?order=spatial`) :
+1. renumérote les sommets le long d'une courbe de Hilbert (mêmes clés que
+   l'ordre d'insertion BRIO) : des sommets proches ont des numéros proches,
+2. ordonne les triangles par localité des sommets (Tipsify, Sander et al.
+   2007, de la famille de l'algorithme de Forsyth) : on « tourne » autour
+   d'un sommet tant que ses voisins sont encore dans un cache simulé de
+   `cache_size` sommets, puis on repart d'un sommet récemment vu,
+3. fait commencer chaque triangle par son plus petit indice (orientation
+   conservée).
+
+Le format Triangles est inchangé : seuls la numérotation des sommets et
+l'ordre des triangles changent.
+"""
+import os
+
+from .delaunay import hilbert_keys
+
+ORDERS = ("none", "spatial")
+DEFAULT_ORDER = "none"
+
+# Taille du cache de sommets simulé (ordre de grandeur des caches post-
+# transformation des GPU, et de quelques lignes de cache CPU)
+CACHE_SIZE = 16
+
+
+def hilbert_order(xs, ys):
+    """Renvoie les indices des points triés le long d'une courbe de Hilbert."""
+    keys = hilbert_keys(xs, ys)
+    # Tri stable : les doublons gardent leur ordre d'entrée
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
+def _rotate(a: int, b: int, c: int):
+    """Fait commencer le triangle par son plus petit indice (même sens)."""
+    if a < b and a < c:
+        return a, b, c
+    if b < c:
+        return b, c, a
+    return c, a, b
+
+
+def tipsify(triangles, n_vertices: int, cache_size: int = CACHE_SIZE):
+    """Renvoie l'ordre des triangles (indices) qui maximise la localité."""
+    # ETAPE 1 : triangles adjacents à chaque sommet (tableau compact)
+    live = [0] * n_vertices
+    for triangle in triangles:
+        for v in triangle:
+            live[v] += 1
+    offsets = [0] * (n_vertices + 1)
+    for v in range(n_vertices):
+        offsets[v + 1] = offsets[v] + live[v]
+    fill = offsets[:-1]
+    adjacency = [0] * offsets[-1]
+    for t, triangle in enumerate(triangles):
+        for v in triangle:
+            adjacency[fill[v]] = t
+            fill[v] += 1
+
+    # ETAPE 2 : parcours en éventails autour d'un sommet « courant »
+    emitted = bytearray(len(triangles))
+    stamps = [0] * n_vertices
+    clock = cache_size + 1
+    dead_end = []
+    cursor = 0
+    order = []
+    current = 0 if n_vertices else -1
+    while current >= 0:
+        candidates = []
+        for k in range(offsets[current], offsets[current + 1]):
+            t = adjacency[k]
+            if emitted[t]:
+                continue
+            emitted[t] = 1
+            order.append(t)
+            for v in triangles[t]:
+                dead_end.append(v)
+                candidates.append(v)
+                live[v] -= 1
+                # Sommet absent du cache simulé : il y entre
+                if clock - stamps[v] > cache_size:
+                    stamps[v] = clock
+                    clock += 1
+
+        # Sommet suivant : un voisin encore utile et encore dans le cache
+        # après ses propres triangles, le plus ancien d'abord
+        current, best = -1, -1
+        for v in candidates:
+            if live[v] > 0:
+                age = clock - stamps[v]
+                priority = age if age + 2 * live[v] <= cache_size else 0
+                if priority > best:
+                    current, best = v, priority
+
+        # Impasse : sommet récemment vu, sinon prochain sommet non traité
+        while current < 0 and dead_end:
+            v = dead_end.pop()
+            if live[v] > 0:
+                current = v
+        while current < 0 and cursor < n_vertices:
+            if live[cursor] > 0:
+                current = cursor
+            cursor += 1
+    return order
+
+
+def cache_miss_ratio(triangles, cache_size: int = CACHE_SIZE) -> float:
+    """Renvoie le nombre moyen de défauts de cache FIFO par triangle (ACMR)."""
+    if not triangles:
+        return 0.0
+    cache = [-1] * cache_size
+    cached = set()
+    position = 0
+    misses = 0
+    for triangle in triangles:
+        for v in triangle:
+            if v in cached:
+                continue
+            misses += 1
+            cached.discard(cache[position])
+            cache[position] = v
+            cached.add(v)
+            position = (position + 1) % cache_size
+    return misses / len(triangles)
+
+
+def spatial(points, triangles, cache_size: int = CACHE_SIZE):
+    """Renvoie (points, triangles) renumérotés et réordonnés (ordre spatial)."""
+    if not triangles:
+        return points, triangles
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+
+    # ETAPE 1 : nouvelle numérotation des sommets (courbe de Hilbert)
+    order = hilbert_order(xs, ys)
+    rank = [0] * len(order)
+    for new, old in enumerate(order):
+        rank[old] = new
+    renumbered = [_rotate(rank[a], rank[b], rank[c]) for a, b, c in triangles]
+
+    # ETAPE 2 : ordre des triangles
+    sequence = tipsify(renumbered, len(order), cache_size)
+    return ([(xs[i], ys[i]) for i in order],
+            [renumbered[t] for t in sequence])
+
+
+def apply(order: str, points, triangles):
+    """Applique l'ordre demandé → (points, triangles)."""
+    if order not in ORDERS:
+        raise ValueError(f"Ordre inconnu: {order}")
+    if order == "spatial":
+        return spatial(points, triangles)
+    return points, triangles
+
+
+def order_from_env() -> str:
+    """Renvoie l'ordre par défaut des réponses (TRIANGULATOR_ORDER)."""
+    order = os.environ.get("TRIANGULATOR_ORDER", DEFAULT_ORDER)
+    if order not in ORDERS:
+        raise ValueError(f"Ordre inconnu: {order}")
+    return order
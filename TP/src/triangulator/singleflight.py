@@ -0,0 +1,223 @@
+"""Regroupement des calculs concurrents pour un même PointSetID (single-flight).
+
+Quand plusieurs requêtes demandent en même temps le même PointSet, seule la
+première (le "leader") exécute le pipeline ; les autres attendent son
+résultat, ou son erreur, de la même catégorie (404 / 500 / 503).
+
+- Entre threads d'un même processus : un événement par clé.
+- Entre processus d'une même machine (workers gunicorn...) : un fichier
+  verrou par clé (`flock`) dans un répertoire partagé. Le leader écrit le
+  résultat à côté du verrou ; les processus qui attendaient le relisent.
+  Les fichiers plus vieux que `ttl` secondes sont supprimés par les leaders
+  (au plus un balayage par `ttl`) : le répertoire reste borné.
+
+Désactivé par défaut : la réponse partagée est alors encodée en entier
+avant d'être envoyée, au lieu d'être produite en flux (voir
+`Triangulator.triangulate_stream_from_id`). Activé par
+TRIANGULATOR_SINGLEFLIGHT=1 (entre threads) ou
+TRIANGULATOR_SINGLEFLIGHT_DIR (aussi entre processus).
+"""
+import builtins
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - pas de flock (Windows)
+    fcntl = None
+
+# En-tête du fichier résultat : type ('R' résultat, 'E' erreur) et longueurs
+_OUTCOME = struct.Struct('<cII')
+
+# Durée de vie des fichiers verrou / résultat (secondes) : un processus qui
+# attend relit le résultat dès que le verrou est libéré, bien avant
+DEFAULT_TTL = 60.0
+
+
+def _rebuild_error(name: str, message: str) -> Exception:
+    """Recrée une exception du même type (builtin) que celle du leader."""
+    cls = getattr(builtins, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, Exception)):
+        # Type inconnu : RuntimeError tombe dans la même catégorie (503)
+        cls = RuntimeError
+    return cls(message)
+
+
+class _Call:
+    """Calcul en cours pour une clé, partagé entre les threads."""
+
+    def __init__(self):
+        """Prépare l'attente du résultat."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Exécute une seule fois les appels concurrents ayant la même clé."""
+
+    def __init__(self, lock_dir: str = None, ttl: float = DEFAULT_TTL):
+        """Active aussi le regroupement entre processus si `lock_dir` est donné."""
+        self.lock_dir = lock_dir if fcntl is not None else None
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self.ttl = ttl
+        self._swept = 0.0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    @classmethod
+    def from_env(cls):
+        """Crée le regroupement s'il est configuré, sinon renvoie None.
+
+        TRIANGULATOR_SINGLEFLIGHT_DIR active aussi le regroupement entre
+        processus ; TRIANGULATOR_SINGLEFLIGHT=1 seulement entre threads.
+        """
+        lock_dir = os.environ.get("TRIANGULATOR_SINGLEFLIGHT_DIR") or None
+        if lock_dir is None and os.environ.get("TRIANGULATOR_SINGLEFLIGHT") != "1":
+            return None
+        ttl = float(os.environ.get("TRIANGULATOR_SINGLEFLIGHT_TTL", DEFAULT_TTL))
+        return cls(lock_dir=lock_dir, ttl=ttl)
+
+    def do(self, key: str, fn):
+        """Renvoie fn(), ou le résultat du calcul déjà en cours pour `key`."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lock_dir:
+                call.result = self._do_across_processes(key, fn)
+            else:
+                call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _paths(self, key: str):
+        """Chemins du verrou et du résultat associés à une clé."""
+        name = hashlib.sha1(key.encode()).hexdigest()
+        base = os.path.join(self.lock_dir, name)
+        return base + ".lock", base + ".out"
+
+    def _do_across_processes(self, key: str, fn):
+        """Regroupement entre processus par verrou fichier."""
+        lock_path, outcome_path = self._paths(key)
+        started = time.time()
+        fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Un autre processus calcule : on attend qu'il ait fini
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                outcome = self._read_outcome(outcome_path, started)
+                if outcome is not None:
+                    return outcome()
+
+            # On est le leader : on calcule et on publie le résultat
+            try:
+                result = fn()
+            except Exception as e:
+                self._write_outcome(outcome_path, b"E", type(e).__name__, str(e))
+                raise
+            self._write_outcome(outcome_path, b"R", "", result)
+            return result
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+            self._maybe_sweep()
+
+    def _maybe_sweep(self):
+        """Lance un balayage si le dernier date de plus de `ttl` secondes."""
+        now = time.time()
+        with self._lock:
+            if now - self._swept < self.ttl:
+                return
+            self._swept = now
+        self._sweep(now - self.ttl)
+
+    def _sweep(self, expiry: float):
+        """Supprime les fichiers verrou / résultat modifiés avant `expiry`."""
+        with os.scandir(self.lock_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime > expiry:
+                        continue
+                    if entry.name.endswith((".out", ".tmp")):
+                        os.unlink(entry.path)
+                    elif entry.name.endswith(".lock"):
+                        self._unlink_lock(entry.path)
+                except FileNotFoundError:
+                    continue
+
+    @staticmethod
+    def _unlink_lock(path: str):
+        """Supprime un fichier verrou, seulement si personne ne le tient."""
+        # Un processus qui vient de l'ouvrir peut encore le verrouiller après
+        # la suppression : au pire, le calcul est fait une fois de plus
+        fd = os.open(path, os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return
+        try:
+            os.unlink(path)
+        finally:
+            os.close(fd)
+
+    def _write_outcome(self, path: str, kind: bytes, name: str, payload):
+        """Écrit le résultat (ou l'erreur) du leader de façon atomique."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        encoded_name = name.encode()
+        fd, tmp = tempfile.mkstemp(dir=self.lock_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_OUTCOME.pack(kind, len(encoded_name), len(payload)))
+                f.write(encoded_name)
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read_outcome(self, path: str, since: float):
+        """Relit le résultat publié après `since` → fonction qui le rend."""
+        try:
+            if os.path.getmtime(path) < since:
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        kind, name_length, payload_length = _OUTCOME.unpack_from(data)
+        start = _OUTCOME.size
+        name = data[start:start + name_length].decode()
+        payload = data[start + name_length:start + name_length + payload_length]
+        if kind == b"E":
+            error = _rebuild_error(name, payload.decode())
+
+            def fail():
+                raise error
+            return fail
+        return lambda: payload
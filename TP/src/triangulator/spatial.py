@@ -0,0 +1,168 @@
+"""Index spatiaux par grille uniforme.
+
+Les points (`GridIndex`), ou les boîtes englobantes des triangles
+(`TriangleGrid`), sont rangés dans des cellules carrées. Une requête ne
+parcourt que les cellules qui touchent la zone cherchée, au lieu de tout le
+nuage.
+"""
+import math
+
+
+class GridIndex:
+    """Grille uniforme sur un nuage de points (xs, ys)."""
+
+    def __init__(self, xs, ys, points_per_cell: float = 1.0):
+        """Range chaque point dans sa cellule."""
+        self.xs = xs
+        self.ys = ys
+        n = len(xs)
+        if n == 0:
+            self.x0 = self.y0 = 0.0
+            self.size = 1.0
+            self.nx = self.ny = 0
+            self.cells = {}
+            return
+
+        self.x0, self.y0 = min(xs), min(ys)
+        width = max(xs) - self.x0
+        height = max(ys) - self.y0
+        # Côté de cellule : environ `points_per_cell` points par cellule
+        area = width * height
+        if area > 0:
+            size = math.sqrt(area * points_per_cell / n)
+        else:
+            size = max(width, height) * points_per_cell / n
+        self.size = size or 1.0
+        self.nx = int(width / self.size) + 1
+        self.ny = int(height / self.size) + 1
+
+        cells = {}
+        x0, y0, inv, nx = self.x0, self.y0, 1.0 / self.size, self.nx
+        for k, (x, y) in enumerate(zip(xs, ys, strict=True)):
+            key = int((y - y0) * inv) * nx + int((x - x0) * inv)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [k]
+            else:
+                bucket.append(k)
+        self.cells = cells
+
+    def _column(self, x):
+        """Colonne de la cellule contenant l'abscisse x (bornée à la grille)."""
+        return min(max(int((x - self.x0) / self.size), 0), self.nx - 1)
+
+    def _row(self, y):
+        """Ligne de la cellule contenant l'ordonnée y (bornée à la grille)."""
+        return min(max(int((y - self.y0) / self.size), 0), self.ny - 1)
+
+    def near_disk(self, x, y, r):
+        """Renvoie les points des cellules qui touchent le disque (x, y, r).
+
+        Les points de la cellule du centre sortent en premier : pour un
+        grand disque, un point à l'intérieur est trouvé tout de suite.
+        C'est un sur-ensemble : le test exact reste à faire par l'appelant.
+        """
+        if not self.cells:
+            return
+        if not math.isfinite(r):
+            for bucket in self.cells.values():
+                yield from bucket
+            return
+
+        # Légère marge : les points proches du bord ne doivent pas manquer
+        r = r * (1 + 1e-9) + 1e-300
+        nx, size, cells = self.nx, self.size, self.cells
+        center = None
+        if (self.x0 <= x < self.x0 + nx * size
+                and self.y0 <= y < self.y0 + self.ny * size):
+            center = self._row(y) * nx + self._column(x)
+            yield from cells.get(center, ())
+
+        if y + r < self.y0 or y - r > self.y0 + self.ny * size:
+            return
+        for j in range(self._row(y - r), self._row(y + r) + 1):
+            # Demi-largeur de la corde du disque dans cette ligne de cellules
+            bottom = self.y0 + j * size
+            dy = max(bottom - y, y - (bottom + size), 0.0)
+            if dy > r:
+                continue
+            half = math.sqrt(r * r - dy * dy)
+            if x + half < self.x0 or x - half > self.x0 + nx * size:
+                continue
+            for i in range(self._column(x - half), self._column(x + half) + 1):
+                key = j * nx + i
+                if key != center:
+                    yield from cells.get(key, ())
+
+
+class TriangleGrid:
+    """Grille uniforme sur les boîtes englobantes de triangles.
+
+    Chaque triangle est rangé dans toutes les cellules que touche sa boîte
+    englobante : une requête par rectangle ne lit que les cellules qu'il
+    recouvre.
+    """
+
+    def __init__(self, xs, ys, triangles, triangles_per_cell: float = 2.0):
+        """Range chaque triangle ; `triangles` est plat (a0, b0, c0, a1, ...)."""
+        t = len(triangles) // 3
+        self.cells = {}
+        if t == 0:
+            self.x0 = self.y0 = 0.0
+            self.size = 1.0
+            self.nx = self.ny = 0
+            return
+
+        self.x0, self.y0 = min(xs), min(ys)
+        width = max(xs) - self.x0
+        height = max(ys) - self.y0
+        # Des triangles existent : les points ne sont pas alignés (aire > 0)
+        self.size = math.sqrt(width * height * triangles_per_cell / t) or 1.0
+        self.nx = int(width / self.size) + 1
+        self.ny = int(height / self.size) + 1
+
+        cells = self.cells
+        x0, y0, inv, nx = self.x0, self.y0, 1.0 / self.size, self.nx
+        for k in range(t):
+            a, b, c = triangles[3 * k], triangles[3 * k + 1], triangles[3 * k + 2]
+            xa, xb, xc = xs[a], xs[b], xs[c]
+            ya, yb, yc = ys[a], ys[b], ys[c]
+            i0 = int((min(xa, xb, xc) - x0) * inv)
+            i1 = int((max(xa, xb, xc) - x0) * inv)
+            j0 = int((min(ya, yb, yc) - y0) * inv)
+            j1 = int((max(ya, yb, yc) - y0) * inv)
+            for j in range(j0, j1 + 1):
+                for i in range(i0, i1 + 1):
+                    key = j * nx + i
+                    bucket = cells.get(key)
+                    if bucket is None:
+                        cells[key] = [k]
+                    else:
+                        bucket.append(k)
+
+    def in_box(self, min_x, min_y, max_x, max_y):
+        """Renvoie les triangles des cellules qui touchent le rectangle.
+
+        Chaque triangle sort une seule fois. C'est un sur-ensemble : le test
+        exact reste à faire par l'appelant.
+        """
+        if not self.cells:
+            return set()
+        if (max_x < self.x0 or min_x > self.x0 + self.nx * self.size
+                or max_y < self.y0 or min_y > self.y0 + self.ny * self.size):
+            return set()
+        found = set()
+        cells, nx = self.cells, self.nx
+        columns = range(self._column(min_x), self._column(max_x) + 1)
+        for j in range(self._row(min_y), self._row(max_y) + 1):
+            for i in columns:
+                found.update(cells.get(j * nx + i, ()))
+        return found
+
+    def _column(self, x):
+        """Colonne de la cellule contenant l'abscisse x (bornée à la grille)."""
+        return min(max(int((x - self.x0) / self.size), 0), self.nx - 1)
+
+    def _row(self, y):
+        """Ligne de la cellule contenant l'ordonnée y (bornée à la grille)."""
+        return min(max(int((y - self.y0) / self.size), 0), self.ny - 1)
@@ -0,0 +1,271 @@
+"""Stockage sur disque des réponses Triangles, partagé entre processus.
+
+Le cache en mémoire (`ResultCache`) est propre à un worker et se vide à
+chaque redémarrage : après un déploiement, tous les PointSets déjà vus
+seraient recalculés. Ce stockage garde le binaire exact produit par
+`encode_triangles` dans un répertoire commun à tous les workers de la
+machine :
+
+- `content/<empreinte>` : la réponse Triangles (clé secondaire, comme le
+  cache en mémoire),
+- `ids/<clé>` : lien symbolique vers le fichier de contenu (clé principale,
+  le PointSetID).
+
+Chaque fichier est écrit à côté puis renommé (`os.replace`) : un lecteur ne
+voit jamais de fichier partiel. Un succès est servi par `mmap` (le contenu
+reste dans le cache de pages du noyau, sans copie en mémoire Python) et le
+fichier peut partir tel quel vers le client (`sendfile` côté serveur WSGI).
+
+La taille totale est bornée pour tous les workers ensemble : le total
+occupé est tenu dans un compteur commun (`size`), mis à jour sous un verrou
+fichier (`flock` sur `lock`) en même temps que chaque écriture. Au-delà de
+`max_bytes`, les fichiers les moins récemment utilisés (date de
+modification, mise à jour à chaque succès) sont supprimés, toujours sous ce
+verrou, jusqu'à redescendre à 90 % de la limite ; le compteur est alors
+recalculé d'après le disque.
+"""
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from . import codec
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - pas de flock (Windows)
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Après une éviction, on redescend sous cette fraction de la limite pour ne
+# pas parcourir le répertoire à chaque écriture
+LOW_WATER = 0.9
+
+# Compteur commun de la taille occupée (octets)
+_SIZE = struct.Struct('<Q')
+
+
+class StoredResult(mmap.mmap):
+    """Réponse Triangles projetée en mémoire depuis le stockage sur disque.
+
+    S'utilise comme un `bytes` en lecture (taille, tranches, buffer) ;
+    `open()` rouvre le fichier pour l'envoyer tel quel au client.
+    """
+
+    path = None
+
+    def open(self):
+        """Renvoie le fichier de la réponse, ouvert (None s'il a été évincé)."""
+        try:
+            return open(self.path, "rb")  # noqa: SIM115 - fermé par l'appelant
+        except FileNotFoundError:
+            return None
+
+
+def _name(key: str) -> str:
+    """Renvoie un nom de fichier sûr pour une clé quelconque."""
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class ResultStore:
+    """Réponses Triangles sur disque, par PointSetID et par empreinte."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Prépare le répertoire ; la taille occupée est relue sur disque."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._contents = os.path.join(directory, "content")
+        self._ids = os.path.join(directory, "ids")
+        os.makedirs(self._contents, exist_ok=True)
+        os.makedirs(self._ids, exist_ok=True)
+        self._lock_path = os.path.join(directory, "lock")
+        self._size_path = os.path.join(directory, "size")
+        self._lock = threading.Lock()
+
+        # Compteurs exposés (propres au processus)
+        self.hits = 0
+        self.content_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Taille commune à tous les processus, lue au dernier accès
+        with self._shared():
+            self.size = self._read_size()
+
+    @classmethod
+    def from_env(cls):
+        """Active le stockage si TRIANGULATOR_STORE_DIR est défini (sinon None)."""
+        directory = os.environ.get("TRIANGULATOR_STORE_DIR")
+        if not directory:
+            return None
+        return cls(directory, max_bytes=int(os.environ.get(
+            "TRIANGULATOR_STORE_MAX_BYTES", DEFAULT_MAX_BYTES)))
+
+    def _scan(self):
+        """Renvoie les fichiers de contenu → [(chemin, date, taille)]."""
+        entries = []
+        with os.scandir(self._contents) as it:
+            for entry in it:
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Évincé entre-temps par un autre processus
+                    continue
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    @contextlib.contextmanager
+    def _shared(self):
+        """Verrou exclusif entre processus sur le répertoire du stockage."""
+        fd = os.open(self._lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Fermer le descripteur libère aussi le verrou
+            os.close(fd)
+
+    def _read_size(self) -> int:
+        """Lit le compteur commun (sous verrou) ; recalculé s'il est absent."""
+        try:
+            with open(self._size_path, "rb") as file:
+                return _SIZE.unpack(file.read())[0]
+        except (FileNotFoundError, struct.error):
+            # Premier démarrage, ou compteur illisible : état du disque
+            size = sum(size for _, _, size in self._scan())
+            self._write_size(size)
+            return size
+
+    def _write_size(self, size: int):
+        """Écrit le compteur commun (sous verrou)."""
+        with open(self._size_path, "wb") as file:
+            file.write(_SIZE.pack(size))
+
+    def _open(self, path: str):
+        """Projette une réponse en mémoire (None si absente ou invalide)."""
+        try:
+            with open(path, "rb") as file:
+                result = StoredResult(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # Absente, ou vide (mmap refuse une taille nulle)
+            return None
+        if not self._is_complete(result):
+            # Fichier tronqué (arrêt brutal) : traité comme absent
+            result.close()
+            return None
+        result.path = path
+        # Date de modification = dernier usage, pour l'éviction LRU
+        os.utime(path)
+        return result
+
+    @staticmethod
+    def _is_complete(result) -> bool:
+        """Vrai si la taille du fichier correspond aux N et T annoncés."""
+        size = len(result)
+        if size < codec.HEADER.size:
+            return False
+        n = codec.HEADER.unpack_from(result)[0]
+        position = codec.HEADER.size + n * codec.POINT.size
+        if size < position + codec.HEADER.size:
+            return False
+        t = codec.HEADER.unpack_from(result, position)[0]
+        return size == codec.triangles_size(n, t)
+
+    def get(self, pointset_id: str):
+        """Cherche le résultat d'un PointSetID (None si absent)."""
+        result = self._open(os.path.join(self._ids, _name(pointset_id)))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def get_by_content(self, pointset_id: str, digest: str):
+        """Cherche un résultat par empreinte et l'associe au PointSetID."""
+        result = self._open(os.path.join(self._contents, _name(digest)))
+        if result is not None:
+            with self._lock:
+                self.content_hits += 1
+            self._link(pointset_id, digest)
+        return result
+
+    def _link(self, pointset_id: str, digest: str):
+        """Fait pointer le PointSetID vers le fichier de contenu (atomique)."""
+        link = os.path.join(self._ids, _name(pointset_id))
+        temporary = f"{link}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.symlink(os.path.join("..", "content", _name(digest)), temporary)
+        os.replace(temporary, link)
+
+    def put(self, pointset_id: str, digest: str, result):
+        """Enregistre un résultat, en évinçant les plus anciens si besoin."""
+        size = len(result)
+        # Un résultat plus gros que tout le stockage n'est pas conservé
+        if size > self.max_bytes:
+            return
+        path = os.path.join(self._contents, _name(digest))
+        if os.path.exists(path):
+            # Même contenu déjà écrit (par ce processus ou un autre)
+            self._link(pointset_id, digest)
+            return
+        # Écriture hors verrou ; seuls le renommage et le compteur sont
+        # faits sous verrou, pour que le total compte chaque fichier une fois
+        descriptor, temporary = tempfile.mkstemp(dir=self._contents,
+                                                 suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(result)
+            with self._lock, self._shared():
+                if os.path.exists(path):
+                    os.unlink(temporary)
+                else:
+                    os.replace(temporary, path)
+                    self.size = self._read_size() + size
+                    if self.size > self.max_bytes:
+                        self._evict()
+                    self._write_size(self.size)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temporary)
+            raise
+        self._link(pointset_id, digest)
+
+    def _evict(self):
+        """Supprime les réponses les plus anciennes (sous les deux verrous)."""
+        # D'autres processus écrivent aussi : on repart de l'état du disque
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        self.size = sum(size for _, _, size in entries)
+        target = self.max_bytes * LOW_WATER
+        for path, _, size in entries:
+            if self.size <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            self.size -= size
+            self.evictions += 1
+
+        # Liens vers des contenus évincés
+        with os.scandir(self._ids) as it:
+            for entry in it:
+                if not os.path.exists(entry.path):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(entry.path)
+
+    def stats(self) -> dict:
+        """Renvoie les compteurs du stockage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "content_hits": self.content_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self.size,
+            }
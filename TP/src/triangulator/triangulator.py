@@ -1,82 +1,81 @@
 """Module de triangulation."""
-import math
-import struct
-import urllib.error
-import urllib.request
+from contextlib import nullcontext
+
+from . import (
+    codec,
+    delaunay,
+    divide_conquer,
+    predicates,
+    psm_client,
+    reorder,
+    validation,
+)
+from .cache import content_key
+from .store import StoredResult
+
+# Moteurs de triangulation disponibles : (xs, ys) → triplets d'indices
+ENGINES = {
+    "incremental": delaunay.triangulate,
+    "divide_conquer": divide_conquer.triangulate,
+}
+DEFAULT_ENGINE = "incremental"
 
 
 class Triangulator:
     """Classe responsable de la triangulation d'un ensemble de points."""
 
+    def __init__(self, cache=None, client=None, executor=None, flight=None,
+                 engine: str = DEFAULT_ENGINE, parallel=None, metrics=None,
+                 store=None, order: str = reorder.DEFAULT_ORDER):
+        """Crée un Triangulator (caches, client PSM, pools, single-flight)."""
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur de triangulation inconnu: {engine}")
+        if order not in reorder.ORDERS:
+            raise ValueError(f"Ordre inconnu: {order}")
+        self.cache = cache
+        self.client = client
+        self.executor = executor
+        self.flight = flight
+        self.engine = engine
+        self.parallel = parallel
+        # Mesures de la requête (RequestMetrics), None = pas de mesure
+        self.metrics = metrics
+        # Réponses conservées sur disque (ResultStore), partagées entre workers
+        self.store = store
+        # Numérotation des sommets et ordre des triangles de la réponse
+        self.order = order
+
+    def stage(self, name: str):
+        """Chronomètre une étape si les mesures sont actives."""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.stage(name)
+
+    def cache_key(self, key: str) -> str:
+        """Clé de cache (ou de regroupement) propre au moteur et à l'ordre."""
+        # Sur des points cocycliques, deux moteurs peuvent choisir des
+        # diagonales différentes : leurs résultats ne sont pas partagés
+        if self.engine != DEFAULT_ENGINE:
+            key = f"{key}#{self.engine}"
+        # Même triangulation, mais binaire différent une fois réordonnée
+        if self.order != reorder.DEFAULT_ORDER:
+            key = f"{key}#{self.order}"
+        return key
+
     def encode_pointset(self, points) -> bytes:
         """Encode un PointSet au format binaire."""
-        N = len(points)
-
-        # I signifie unsigned long (4 octets)
-        # f signifie float (4 octets)
-        # < signifie little-endian (le moins significatif est stocké en premier)
-        # > signifie big-endian (le plus significatif est stocké en premier)
-        
-        # Le but ici est d'écrire le header 
-        # ( qui est censer représenter le nombre de points)
-        # struct.pack('<I', N) va créer 4 octets représentant cet espace et y ajouter N
-        binary_pointSet = struct.pack('<I', N)
-        
-        # Ici on boucle pour écrire les points dans binary_pointSet
-        for point in points:
-            # On s'assure que ce sont des floats (x, y)
-            x, y = point
-            # struct.pack('<ff', float(x), float(y)) 
-            # va créer 8 octets représentant cet espace et y ajouter x et y
-            binary_pointSet += struct.pack('<ff', float(x), float(y))
-            
-        return binary_pointSet
+        return codec.encode_pointset(points)
 
     def fetch_pointset(self, pointset_id: str) -> bytes:
         """Récupère le PointSet binaire depuis le PointSetManager."""
-        # 1. On construit l'URL (ex: /pointset/123-abc...)
-        url = f"http://localhost:8080/pointset/{pointset_id}"
-        
-        try:
-            # 2. On ouvre la connexion
-            with urllib.request.urlopen(url) as response:
-                # 3. Si ça marche (code 200), on lit tout le contenu binaire
-                return response.read() # Ceci retourne des 'bytes'
-
-        except urllib.error.HTTPError as e:
-            # Le serveur a répondu, mais avec une erreur (404, 500...)
-            if e.code == 404:
-                raise FileNotFoundError(f"PointSet {pointset_id} introuvable") from e
-            elif e.code == 503:
-                raise ConnectionError("PointSetManager en maintenance") from e
-            else:
-                raise ValueError(f"Erreur HTTP {e.code}: {e.reason}") from e
-                
-        except urllib.error.URLError as e:
-            # Le serveur n'est même pas accessible (éteint, pas de wifi...)
-            # Ton app.py attrapera cette exception générique et renverra une 503.
-            raise ConnectionError(f"Impossible de joindre le PSM: {e.reason}") from e
-
-    def decode_pointset(self, binary: bytes):
-        """Décode le PointSet au format binaire → liste de points."""
-        # Vérification minimale de la taille (4 bytes pour N)
-        if len(binary) < 4:
-            raise ValueError("Données binaires invalides ou incomplètes")
-
-        # Ici on va lire N
-        N = struct.unpack('<I', binary[:4])[0]
-        points = []
-        position = 4
-        
-        # Ici on va lire les points
-        for _ in range(N):
-            # on va prendre 8 octets
-            chunk = binary[position : position + 8]
-            x, y = struct.unpack('<ff', chunk)
-            points.append((x, y))
-            position += 8
+        # Le client garde des connexions ouvertes vers le PSM et applique
+        # la correspondance des erreurs (404, 503, autres codes HTTP)
+        client = self.client or psm_client.default_client()
+        return client.get_pointset(pointset_id)
 
-        return points
+    def decode_pointset(self, binary: bytes, exact: bool = False):
+        """Décode le PointSet au format binaire → vue PointSet (sans copie)."""
+        return codec.decode_pointset(binary, exact)
 
     def is_in_circumcircle(self, point, triangle, points):
         """Vérifie si un point est dans le cercle circonscrit d'un triangle."""
@@ -85,21 +84,18 @@ class Triangulator:
         b = points[triangle[1]]
         c = points[triangle[2]]
 
-        # 2. On simplifie en ramenant 'p' à l'origine (0,0)
-        ax, ay = a[0] - point[0], a[1] - point[1]
-        bx, by = b[0] - point[0], b[1] - point[1]
-        cx, cy = c[0] - point[0], c[1] - point[1]
-
-        # 3. On calcule le déterminant
-        det = ( (ax*ax + ay*ay) * (bx*cy - cx*by) -
-                (bx*bx + by*by) * (ax*cy - cx*ay) +
-                (cx*cx + cy*cy) * (ax*by - bx*ay) )
-                
-        # 4. On retourne True si le déterminant est positif
+        # 2. Prédicat robuste (filtre flottant + calcul exact si besoin)
+        det = predicates.incircle(a[0], a[1], b[0], b[1], c[0], c[1],
+                                  point[0], point[1])
+
+        # 3. Le signe dépend de l'orientation du triangle : on le corrige
+        # pour accepter aussi les triangles dans le sens horaire
+        if predicates.orient2d(a[0], a[1], b[0], b[1], c[0], c[1]) < 0:
+            det = -det
         return det > 0
 
     def triangulate(self, points):
-        """Triangulation d'un nuage de points en triangles (Bowyer-Watson)."""
+        """Triangulation d'un nuage de points en triangles (moteur choisi)."""
         # ETAPE 1 : VERIFICATIONS DE BASE
         
         # Si la liste est vide, on ne peut rien faire
@@ -113,171 +109,189 @@ class Triangulator:
         if n_points < 3:
             raise ValueError("Impossible de trianguler moins de 3 points")
 
-        # ETAPE 2 : ANALYSE DES DONNEES (BOUNDING BOX)
-
-        # On extrait toutes les coordonnées X et Y pour trouver les limites
-        x = [p[0] for p in points]
-        y = [p[1] for p in points]
-        min_x, max_x = min(x), max(x)
-        min_y, max_y = min(y), max(y)
-
-        # ETAPE 3 : CREATION DU SUPER-TRIANGLE
-
-        # On calcule les dimensions de la zone
-        dx = max_x - min_x
-        dy = max_y - min_y
-        # On prend la plus grande dimension pour faire un triangle assez grand
-        delta_max = max(dx, dy) if max(dx, dy) > 0 else 1.0
-        
-        # On calcule le centre du nuage de points
-        mid_x = (min_x + max_x) / 2
-        mid_y = (min_y + max_y) / 2
-
-        # On crée 3 points virtuels géants qui englobent tout le nuage
-        # La multiplication par 20 permet d'être sur qu'il englobe tout le nuage
-        p1 = (mid_x - 20 * delta_max, mid_y - delta_max)
-        p2 = (mid_x, mid_y + 20 * delta_max)
-        p3 = (mid_x + 20 * delta_max, mid_y - delta_max)
-
-        # On crée une liste de travail qui contient
-        # les vrais points + les 3 points virtuels
-        working_points = points + [p1, p2, p3]
-        
-        # Les indices des points du Super-Triangle sont à la fin de la liste
-        st1 = n_points
-        st2 = n_points + 1
-        st3 = n_points + 2
-
-        # On initialise la liste des triangles avec ce Super-Triangle unique
-        triangles = [(st1, st3, st2)]
-
-        # ETAPE 4 : LA BOUCLE PRINCIPALE (INCREMENTALE)
-
-        # On insère chaque point un par un dans la triangulation existante
-        for i, point in enumerate(points):
-            
-            # Liste des triangles qui ne respectent
-            # plus la condition de Delaunay (à supprimer)
-            bad_triangles = []
-            
-            # Liste temporaire pour garder les bons triangles
-            temp_triangles = []
-
-            # Identification des mauvais triangles
-            for tri in triangles:
-                # Si le nouveau point est dans le cercle circonscrit de ce triangle
-                if self.is_in_circumcircle(point, tri, working_points):
-                    # alors ce triangle est a enlever
-                    bad_triangles.append(tri)
-                else:
-                    # sinon, on le garde pour la prochaine étape
-                    temp_triangles.append(tri)
-            
-            # On met à jour la liste principale en ne gardant que les bons
-            triangles = temp_triangles
-
-            # Calcul du Polygone de Bowyer-Watson ( un gros trou )
-            # Le but est de trouver le contour extérieur du trou
-            # formé par les bad_triangles.
-            # On doit trouver une arête interne est partagée par 2 bad_triangles.
-            # Une arête frontière n'appartient qu'à 1 seul bad_triangle.
-            boundary_edges = set()
-            
-            for tri in bad_triangles:
-                # On liste les 3 arêtes du triangle : (A,B), (B,C), (C,A)
-                edges = [(tri[0], tri[1]), (tri[1], tri[2]), (tri[2], tri[0])]
-                
-                for edge in edges:
-                    # On calcule l'arête inverse (B,A)
-                    reversed_edge = (edge[1], edge[0])
-                    
-                    # Si l'inverse est déjà dans le set, c'est que l'arête est partagée
-                    if reversed_edge in boundary_edges:
-                        # Donc c'est une arête interne, on la supprime
-                        # (elles s'annulent)
-                        boundary_edges.remove(reversed_edge)
-                    else:
-                        # Sinon, c'est potentiellement une frontière, on l'ajoute
-                        boundary_edges.add(edge)
-
-            # Re-bouchage du trou
-            # Pour chaque arête du contour,
-            # on crée un nouveau triangle avec le point 'i'
-            for edge in boundary_edges:
-                # On forme le triangle (Point1, Point2, NouveauPoint)
-                new_tri = (edge[0], edge[1], i)
-                # On l'ajoute à la liste principale
-                triangles.append(new_tri)
-
-        # Nettoyage final
-        
-        final_triangles = []
-        
-        # On parcourt tous les triangles créés
-        for tri in triangles:
-            # Si indice sommets >= n_points, c'est un sommet du Super-Triangle
-            if tri[0] >= n_points or tri[1] >= n_points or tri[2] >= n_points:
-                # On ne garde pas ce triangle car il est connecté à rien
-                continue
-            
-            # Sinon, c'est un triangle valide
-            final_triangles.append(tri)
-
-        # sécurité finale
-        
-        # cas d'une ligne droite
-        if not final_triangles and n_points >= 3:
-             raise ValueError("Erreur triangulation (potentiellement colinéaires)")
+        # ETAPE 2 : ANALYSE DES DONNEES
+
+        # On extrait toutes les coordonnées X et Y
+        if isinstance(points, codec.PointSet):
+            # Lecture directe dans le binaire, sans passer par des tuples
+            x, y = points.xs(), points.ys()
+        else:
+            x = [p[0] for p in points]
+            y = [p[1] for p in points]
+
+        # Pré-passe en O(n) : coordonnées non finies, moins de 3 points
+        # distincts ou points tous alignés échouent ici, sans calcul ; les
+        # doublons sont retirés (index = indices d'origine des points gardés)
+        x, y, index = validation.prepare(x, y)
+
+        # ETAPE 3 : TRIANGULATION
+
+        # - "incremental" : insère les points dans un ordre spatial
+        #   (BRIO / Hilbert) en localisant chaque point par une marche de
+        #   voisin en voisin (rapide en moyenne),
+        # - "divide_conquer" : Guibas-Stolfi, O(n log n) même dans le pire cas.
+        # Un très gros nuage est découpé en bandes triangulées en parallèle.
+        if self.parallel is not None and self.parallel.accepts(n_points):
+            final_triangles = self.parallel.triangulate(x, y, self.engine)
+        else:
+            final_triangles = ENGINES[self.engine](x, y)
+
+        # Invariant des moteurs : des points distincts non tous alignés
+        # (garantis par la pré-passe) donnent toujours au moins un triangle
+        assert final_triangles, "aucun triangle pour des points non alignés"
+
+        # Retour aux indices du PointSet d'origine (croissants : le plus petit
+        # indice reste en tête de chaque triangle)
+        if index is not None:
+            final_triangles = [(index[a], index[b], index[c])
+                               for a, b, c in final_triangles]
 
         # On retourne la liste finale
         return final_triangles
 
     def encode_triangles(self, points, triangles) -> bytes:
         """Encode la réponse Triangles au format binaire."""
-        # On réutilise l'encodeur de points
-        pointSet = self.encode_pointset(points)
-
-        # On encode la partie triangles
-        T = len(triangles)
-        
-        nombreDeTriangle = struct.pack('<I', T)
-        
-        trianglesEncodees = bytearray()
-        for t in triangles:
-            # Chaque triangle est un tuple (i1, i2, i3)
-            # On encode 3 unsigned int ('<III') soit 12 octets
-            trianglesEncodees += struct.pack('<III', t[0], t[1], t[2])
-
-        # On colle tout ensemble
-        return pointSet + nombreDeTriangle + trianglesEncodees
+        return codec.encode_triangles(points, triangles)
 
     def decode_triangles(self, binary: bytes):
         """Décode réponse Triangles depuis format binaire."""
-        # On lit les points
-        points = self.decode_pointset(binary)
-        
-        # On calcule où la partie Triangles commence
-        # Taille partie 1 = 4 bytes (N) + N * 8 bytes
-        N = len(points)
-        position = 4 + (N * 8)
-        
-        # Lecture du nombre de triangles T
-        T = struct.unpack('<I', binary[position : position + 4])[0]
-        position += 4
-        
-        triangles = []
-        for _ in range(T):
-            # Lecture du triplet d'indices (3 * 4 bytes)
-            chunk = binary[position : position + 12]
-            i1, i2, i3 = struct.unpack('<III', chunk)
-            triangles.append((i1, i2, i3))
-            position += 12
-            
-        return triangles
+        return codec.decode_triangles(binary)
     
+    def _prepare(self, pointset_id: str):
+        """Étapes communes : caches → fetch → decode → triangulate.
+
+        Renvoie (résultat en cache, empreinte, points, triangles) : soit le
+        résultat déjà encodé est connu, soit les points et triangles calculés.
+        """
+        # Les PointSets sont immuables : un résultat en cache reste valable
+        if self.cache is not None:
+            with self.stage("cache"):
+                cached = self.cache.get(self.cache_key(pointset_id))
+            if cached is not None:
+                return cached, None, None, None
+        # Résultat écrit sur disque par ce worker ou un autre (même avant
+        # un redémarrage)
+        if self.store is not None:
+            with self.stage("store"):
+                cached = self.store.get(self.cache_key(pointset_id))
+            if cached is not None:
+                return cached, None, None, None
+
+        with self.stage("fetch"):
+            binary = self.fetch_pointset(pointset_id)
+
+        # Même contenu déjà triangulé sous un autre identifiant ?
+        digest = None
+        if self.cache is not None:
+            with self.stage("cache"):
+                digest = self.cache_key(content_key(binary))
+                cached = self.cache.get_by_content(self.cache_key(pointset_id),
+                                                   digest)
+            if cached is not None:
+                return cached, None, None, None
+        if self.store is not None:
+            with self.stage("store"):
+                if digest is None:
+                    digest = self.cache_key(content_key(binary))
+                cached = self.store.get_by_content(self.cache_key(pointset_id),
+                                                   digest)
+            if cached is not None:
+                return cached, None, None, None
+
+        points, triangles = self.triangulate_pointset(binary)
+        return None, digest, points, triangles
+
+    def triangulate_pointset(self, binary):
+        """Décode un PointSet binaire et le triangule → (points, triangles)."""
+        with self.stage("decode"):
+            # Le PSM doit renvoyer exactement 4 + 8N octets
+            points = self.decode_pointset(binary, exact=True)
+        n_points = len(points)
+        # Les très gros PointSets sont découpés entre plusieurs processus ;
+        # les gros partent entiers dans le pool de processus pour ne pas
+        # bloquer les autres requêtes sous le GIL
+        with self.stage("triangulate"):
+            if self.parallel is not None and self.parallel.accepts(n_points):
+                triangles = self.triangulate(points)
+            elif self.executor is not None and self.executor.accepts(n_points):
+                triangles = self.executor.triangulate(points, self.engine)
+            else:
+                triangles = self.triangulate(points)
+        # Réordonnancement optionnel pour les traitements en aval
+        if self.order != reorder.DEFAULT_ORDER:
+            with self.stage("reorder"):
+                points, triangles = reorder.apply(self.order, points, triangles)
+        if self.metrics is not None:
+            self.metrics.record_result(n_points, len(triangles))
+        return points, triangles
+
     def triangulate_from_id(self, pointset_id: str):
         """Récupère un PointSet → le triangule → renvoie la structure resultante."""
-        binary = self.fetch_pointset(pointset_id)
-        points = self.decode_pointset(binary)
-        triangles = self.triangulate(points)
-        return self.encode_triangles(points, triangles)
+        # Requêtes simultanées pour le même PointSet : un seul calcul
+        if self.flight is not None:
+            return self.flight.do(self.cache_key(pointset_id),
+                                  lambda: self._triangulate_from_id(pointset_id))
+        return self._triangulate_from_id(pointset_id)
+
+    def _triangulate_from_id(self, pointset_id: str):
+        """Pipeline complet, sans regroupement des requêtes simultanées."""
+        cached, digest, points, triangles = self._prepare(pointset_id)
+        if cached is not None:
+            return cached
+
+        with self.stage("encode"):
+            result = self.encode_triangles(points, triangles)
+        self._keep(pointset_id, digest, result)
+        return result
+
+    def _keep(self, pointset_id: str, digest: str, result):
+        """Conserve un résultat calculé (cache en mémoire et sur disque)."""
+        if self.cache is not None:
+            self.cache.put(self.cache_key(pointset_id), digest, result)
+        if self.store is not None:
+            with self.stage("store"):
+                self.store.put(self.cache_key(pointset_id), digest, result)
+
+    def _keeps(self, size: int) -> bool:
+        """Vrai si un résultat de cette taille sera conservé quelque part."""
+        return any(keeper is not None and size <= keeper.max_bytes
+                   for keeper in (self.cache, self.store))
+
+    @staticmethod
+    def _chunks(result, chunk_size: int):
+        """Renvoie (taille, morceaux) d'un résultat déjà encodé.
+
+        Un résultat lu sur disque est rendu sous forme de fichier ouvert :
+        le serveur WSGI peut l'envoyer sans le recopier (sendfile).
+        """
+        if isinstance(result, StoredResult):
+            file = result.open()
+            if file is not None:
+                return len(result), file
+        return len(result), codec.iter_chunks(result, chunk_size)
+
+    def triangulate_stream_from_id(self, pointset_id: str,
+                                   chunk_size: int = codec.CHUNK_SIZE):
+        """Comme triangulate_from_id, mais renvoie (taille, générateur).
+
+        Les erreurs (PSM, triangulation) sont levées avant le premier
+        morceau. La taille exacte permet de fixer le Content-Length.
+        Avec le single-flight, le résultat est partagé entre les requêtes :
+        il est donc encodé d'un bloc avant d'être découpé.
+        Un résultat lu sur disque est rendu sous forme de fichier ouvert.
+        """
+        if self.flight is not None:
+            return self._chunks(self.triangulate_from_id(pointset_id),
+                                chunk_size)
+
+        cached, digest, points, triangles = self._prepare(pointset_id)
+        if cached is None:
+            size = codec.triangles_size(len(points), len(triangles))
+            # Si le résultat sera conservé, on l'encode d'un bloc ; sinon il
+            # part en flux sans être matérialisé
+            if not self._keeps(size):
+                return size, codec.iter_triangles(points, triangles, chunk_size)
+            with self.stage("encode"):
+                cached = self.encode_triangles(points, triangles)
+            self._keep(pointset_id, digest, cached)
+        return self._chunks(cached, chunk_size)
@@ -0,0 +1,128 @@
+"""Pré-passe de validation des points, en O(n), avant la triangulation.
+
+Les cas dégénérés coûtaient autant qu'une vraie triangulation avant
+d'échouer (tri spatial, insertions, prédicats exacts point par point) :
+
+- coordonnées NaN ou infinies : rejetées d'emblée (ValueError),
+- doublons : retirés, avec la table des indices d'origine (le premier
+  point de chaque groupe de doublons est gardé, dans l'ordre d'entrée) ;
+  un PointSet fait surtout de doublons est triangulé sur ses seuls points
+  distincts,
+- moins de 3 points distincts, ou tous alignés : ValueError après un seul
+  balayage d'orientation par rapport à une droite de référence.
+
+Avec NumPy, chaque étape est vectorisée ; sinon, une boucle Python.
+L'orientation est d'abord calculée en flottants avec la borne d'erreur de
+Shewchuk : un seul signe sûr suffit à écarter l'alignement. Sinon, il est
+confirmé en arithmétique entière exacte (toujours en O(n)).
+"""
+import math
+
+from .predicates import CCW_ERRBOUND
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    np = None
+
+
+def check_finite(xs, ys):
+    """Lève ValueError si une coordonnée est NaN ou infinie."""
+    if np is not None:
+        finite = np.isfinite(np.asarray(xs, dtype=float)).all() \
+            and np.isfinite(np.asarray(ys, dtype=float)).all()
+    else:
+        finite = all(map(math.isfinite, xs)) and all(map(math.isfinite, ys))
+    if not finite:
+        raise ValueError("Coordonnées invalides (NaN ou infini)")
+
+
+def unique_indices(xs, ys):
+    """Renvoie les indices des premiers points distincts, dans l'ordre d'entrée.
+
+    Renvoie None s'il n'y a aucun doublon.
+    """
+    n = len(xs)
+    if np is not None:
+        # Un point = un complexe : np.unique compare (x, y) d'un bloc ;
+        # + 0.0 confond -0.0 et 0.0
+        keys = np.asarray(xs, dtype=float) + 0.0 \
+            + 1j * (np.asarray(ys, dtype=float) + 0.0)
+        _, first = np.unique(keys, return_index=True)
+        if len(first) == n:
+            return None
+        first.sort()
+        return first.tolist()
+
+    first = {}
+    for i, point in enumerate(zip(xs, ys, strict=True)):
+        first.setdefault(point, i)
+    if len(first) == n:
+        return None
+    return list(first.values())
+
+
+def _exact_offsets(xs, ys, a: int, b: int, candidates):
+    """Vrai si un des points candidats est hors de la droite (a, b), en exact."""
+    # Les flottants sont des entiers × 2^k : à une échelle commune près,
+    # l'orientation se calcule en entiers Python, sans arrondi
+    ratios = [v.as_integer_ratio() for i in (a, b, *candidates)
+              for v in (xs[i], ys[i])]
+    scale = max(q for _, q in ratios)
+    values = [p * (scale // q) for p, q in ratios]
+    ax, ay, bx, by = values[:4]
+    dx, dy = bx - ax, by - ay
+    return any(dx * (values[k + 1] - ay) != dy * (values[k] - ax)
+               for k in range(4, len(values), 2))
+
+
+def all_collinear(xs, ys) -> bool:
+    """Vrai si tous les points sont alignés (points distincts, n >= 2)."""
+    n = len(xs)
+    if n < 3:
+        return True
+    # Droite de référence : le premier point et le plus éloigné de lui
+    # (une base courte rendrait beaucoup de points douteux)
+    if np is not None:
+        x = np.asarray(xs, dtype=float)
+        y = np.asarray(ys, dtype=float)
+        b = int(np.argmax((x - x[0]) ** 2 + (y - y[0]) ** 2))
+        left = (x[b] - x[0]) * (y - y[0])
+        right = (y[b] - y[0]) * (x - x[0])
+        det = left - right
+        # Signe sûr : au moins un point est franchement d'un côté
+        if (np.abs(det) > CCW_ERRBOUND * (np.abs(left) + np.abs(right))).any():
+            return False
+        # Aucun signe sûr : l'alignement est confirmé en exact
+        return not _exact_offsets(xs, ys, 0, b, range(n))
+
+    ax, ay = xs[0], ys[0]
+    b = max(range(n), key=lambda i: (xs[i] - ax) ** 2 + (ys[i] - ay) ** 2)
+    dx, dy = xs[b] - ax, ys[b] - ay
+    for x, y in zip(xs, ys, strict=True):
+        left = dx * (y - ay)
+        right = dy * (x - ax)
+        if abs(left - right) > CCW_ERRBOUND * (abs(left) + abs(right)):
+            return False
+    return not _exact_offsets(xs, ys, 0, b, range(n))
+
+
+def prepare(xs, ys):
+    """Renvoie les points validés, sans doublons → (xs, ys, indices d'origine).
+
+    Les indices d'origine valent None s'il n'y avait aucun doublon (les
+    points sont alors renvoyés tels quels). Lève ValueError pour des
+    coordonnées non finies, moins de 3 points distincts ou des points tous
+    alignés.
+    """
+    check_finite(xs, ys)
+    index = unique_indices(xs, ys)
+    if index is not None:
+        xs = [xs[i] for i in index]
+        ys = [ys[i] for i in index]
+    if len(xs) < 3:
+        raise ValueError("Moins de 3 points distincts : aucun triangle "
+                         "(points confondus ou colinéaires)")
+    if all_collinear(xs, ys):
+        raise ValueError("Points tous colinéaires : aucun triangle")
+    return xs, ys, index